@@ -0,0 +1,122 @@
+"""
+JSON backend benchmark on representative raw payloads.
+
+Builds a full-history Alpha Vantage TIME_SERIES_DAILY response and a large
+NewsAPI response, writes them to a scratch directory and, for every installed
+backend of internal_data_automation.utils.json_codec, measures decoding from
+bytes (as ingestion does with HTTP bodies), decoding a file (as the cleaners
+do; memory-mapped where the backend supports it) and encoding. Each number is
+the best of --repeat runs.
+
+Usage:
+    python benchmarks/bench_json_codec.py
+    python benchmarks/bench_json_codec.py --years 20 --articles 20000 --repeat 10
+    python benchmarks/bench_json_codec.py --json codec.json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, Any, Callable
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic import generate_market_payload, generate_news_payload  # noqa: E402
+from internal_data_automation.utils.json_codec import JsonCodec, available_codecs  # noqa: E402
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_codec(codec: JsonCodec, payload: Any, raw: bytes, path: str, repeat: int) -> Dict[str, Any]:
+    # Sanity check: every backend must decode to the same document
+    if codec.loads(raw) != payload or codec.load_file(path) != payload:
+        raise RuntimeError(f"{codec.name} decoded a different document")
+
+    results = {}
+    for operation, func in (
+        ("loads", lambda: codec.loads(raw)),
+        ("load_file", lambda: codec.load_file(path)),
+        ("dumps", lambda: codec.dumps(payload)),
+    ):
+        seconds = best_of(func, repeat)
+        results[operation] = {
+            "seconds": round(seconds, 6),
+            "mb_per_second": round(len(raw) / seconds / 1e6, 1) if seconds else None,
+        }
+    return results
+
+
+def print_summary(results: Dict[str, Dict[str, Any]], sizes: Dict[str, int]):
+    operations = ("loads", "load_file", "dumps")
+    header = f"{'payload':<8} {'backend':<9}" + "".join(f"{op + ' MB/s':>16}" for op in operations)
+    print(header)
+    print("-" * len(header))
+    for payload_name, by_codec in results.items():
+        baseline = by_codec.get("stdlib")
+        for name, stage in by_codec.items():
+            line = f"{payload_name:<8} {name:<9}"
+            for op in operations:
+                cell = f"{stage[op]['mb_per_second']:.1f}"
+                if baseline and name != "stdlib":
+                    cell += f" ({baseline[op]['seconds'] / stage[op]['seconds']:.1f}x)"
+                line += f"{cell:>16}"
+            print(line)
+        print(f"{'':<8} ({sizes[payload_name] / 1e6:.1f} MB)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare JSON backends on synthetic raw payloads")
+    parser.add_argument("--years", type=float, default=20, help="Years of daily history in the market payload")
+    parser.add_argument("--articles", type=int, default=10000, help="Number of articles in the news payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (the best one counts)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Write machine-readable results to this file")
+    args = parser.parse_args(argv)
+
+    codecs = available_codecs()
+    print(f"Installed backends: {', '.join(codecs)}")
+
+    payloads = {
+        "market": generate_market_payload("SPY", args.years, seed=args.seed),
+        "news": generate_news_payload(args.articles, seed=args.seed),
+    }
+
+    workdir = tempfile.mkdtemp(prefix="ida-json-bench-")
+    try:
+        results, sizes = {}, {}
+        for payload_name, payload in payloads.items():
+            # Compact UTF-8, as providers send it
+            raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            path = os.path.join(workdir, f"{payload_name}.json")
+            with open(path, 'wb') as f:
+                f.write(raw)
+            sizes[payload_name] = len(raw)
+            results[payload_name] = {name: bench_codec(codec, payload, raw, path, args.repeat)
+                                     for name, codec in codecs.items()}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_summary(results, sizes)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({"meta": {"years": args.years, "articles": args.articles, "repeat": args.repeat,
+                                "python": sys.version.split()[0], "input_bytes": sizes},
+                       "results": results}, f, indent=2)
+        print(f"Results written to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
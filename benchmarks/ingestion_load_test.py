@@ -0,0 +1,185 @@
+"""
+Load test for the ingestion code against the local mock APIs (mock_api.py).
+
+Starts the mock server in-process, then calls the real fetch_market_data /
+fetch_news_data (and through them fetch_with_retries and the shared HTTP
+session) from a pool of worker threads. Each call writes its raw file into a
+scratch directory; a call counts as succeeded if its file was written.
+
+Reports per API: achieved call and HTTP request rates, end-to-end call latency
+percentiles (including retries and backoff), retry amplification (HTTP
+attempts per call) and the outcomes the server injected.
+
+Usage:
+    python benchmarks/ingestion_load_test.py --calls 200 --concurrency 8
+    python benchmarks/ingestion_load_test.py --latency lognormal:80:0.6 --error-rate 0.1 \\
+        --rate-limit-rate 0.05 --truncate-rate 0.02 --json load.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from mock_api import MockApiServer, add_profile_arguments, profile_from_args  # noqa: E402
+from synthetic import symbol_names  # noqa: E402
+from internal_data_automation.ingestion.market_api import fetch_market_data  # noqa: E402
+from internal_data_automation.ingestion.news_api import fetch_news_data  # noqa: E402
+from internal_data_automation.utils.metrics import MetricsCollector  # noqa: E402
+
+FETCHERS = {
+    "market": (fetch_market_data, "alpha_vantage"),
+    "news": (fetch_news_data, "news_api"),
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `values`."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def build_config(server_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "api": {
+            "timeout_seconds": args.timeout,
+            "max_retries": args.max_retries,
+            "backoff_base_seconds": args.backoff_base,
+        },
+        "alpha_vantage": {"base_url": f"{server_url}/query", "symbol": "SPY"},
+        "news_api": {"base_url": f"{server_url}/v2/everything", "query": "finance", "language": "en"},
+    }
+
+
+def run_call(index: int, source: str, config: Dict[str, Any], symbols: List[str],
+             collector: MetricsCollector, logger: logging.Logger) -> Dict[str, Any]:
+    fetch, _ = FETCHERS[source]
+    # A unique date token per call keeps the raw files of concurrent calls apart
+    token = f"load-{index}"
+    if source == "market":
+        config = dict(config, alpha_vantage=dict(config["alpha_vantage"], symbol=symbols[index % len(symbols)]))
+
+    with collector.stage(source) as stage:
+        start = time.perf_counter()
+        fetch(config, logger, token)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "source": source,
+        "seconds": elapsed,
+        "attempts": stage.http_latency.count,
+        "succeeded": os.path.exists(os.path.join("data", "raw", f"{source}_{token}.json")),
+    }
+
+
+def summarise(source: str, calls: List[Dict[str, Any]], wall_seconds: float,
+              server_stats: Dict[str, int]) -> Dict[str, Any]:
+    latencies = [c["seconds"] for c in calls]
+    attempts = sum(c["attempts"] for c in calls)
+    succeeded = sum(1 for c in calls if c["succeeded"])
+    return {
+        "source": source,
+        "calls": len(calls),
+        "succeeded": succeeded,
+        "failed": len(calls) - succeeded,
+        "http_attempts": attempts,
+        "retry_amplification": round(attempts / len(calls), 3) if calls else 0.0,
+        "calls_per_second": round(len(calls) / wall_seconds, 2) if wall_seconds else 0.0,
+        "requests_per_second": round(attempts / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p90": round(percentile(latencies, 90) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "max": round(max(latencies, default=0.0) * 1000, 1),
+        },
+        "server_outcomes": server_stats,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ingestion load test against the mock APIs")
+    parser.add_argument("--source", choices=["market", "news", "both"], default="both")
+    parser.add_argument("--calls", type=int, default=100, help="Fetch calls per source (default: 100)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Worker threads (default: 8)")
+    parser.add_argument("--timeout", type=float, default=5, help="api.timeout_seconds for the run (default: 5)")
+    parser.add_argument("--max-retries", type=int, default=3, help="api.max_retries for the run (default: 3)")
+    parser.add_argument("--backoff-base", type=float, default=0.05,
+                        help="api.backoff_base_seconds for the run (default: 0.05, the pipeline uses 1)")
+    parser.add_argument("--verbose", action="store_true", help="Show the ingestion code's log output")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this file")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    sources = ["market", "news"] if args.source == "both" else [args.source]
+
+    logger = logging.getLogger("ingestion_load_test")
+    logger.propagate = False
+    if args.verbose:
+        logger.addHandler(logging.StreamHandler(sys.stderr))
+        logger.setLevel(logging.INFO)
+    else:
+        logger.addHandler(logging.NullHandler())
+
+    # The fetchers skip ingestion without keys; the mock server ignores their values
+    os.environ.setdefault("ALPHA_VANTAGE_API_KEY", "load-test")
+    os.environ.setdefault("NEWS_API_KEY", "load-test")
+
+    server = MockApiServer(profile_from_args(args), market_years=args.market_years,
+                           news_articles=args.news_articles, seed=args.seed).start()
+    config = build_config(server.url, args)
+    symbols = symbol_names(max(1, min(args.calls, 500)))
+
+    workdir = tempfile.mkdtemp(prefix="ida-load-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    results = []
+    try:
+        for source in sources:
+            server.reset_stats()
+            collector = MetricsCollector(f"load-{source}")
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                calls = list(pool.map(
+                    lambda i: run_call(i, source, config, symbols, collector, logger),
+                    range(args.calls)
+                ))
+            wall = time.perf_counter() - start
+            api = FETCHERS[source][1]
+            results.append(summarise(source, calls, wall, server.snapshot().get(api, {})))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        server.stop()
+
+    print(f"Profile: {json.dumps(server.profile.to_dict())}")
+    print(f"{'source':<8}{'calls':>7}{'ok':>7}{'failed':>8}{'attempts':>10}{'amplif.':>9}"
+          f"{'calls/s':>9}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for r in results:
+        lat = r["latency_ms"]
+        print(f"{r['source']:<8}{r['calls']:>7}{r['succeeded']:>7}{r['failed']:>8}{r['http_attempts']:>10}"
+              f"{r['retry_amplification']:>9.2f}{r['calls_per_second']:>9.1f}{r['requests_per_second']:>9.1f}"
+              f"{lat['p50']:>9.1f}{lat['p90']:>9.1f}{lat['p99']:>9.1f}{lat['max']:>9.1f}")
+        outcomes = ", ".join(f"{k}={v}" for k, v in r["server_outcomes"].items() if v)
+        print(f"         server outcomes: {outcomes}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({"profile": server.profile.to_dict(), "concurrency": args.concurrency,
+                       "api": build_config("", args)["api"], "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Local stand-in for the Alpha Vantage and NewsAPI endpoints with latency and fault injection.
+
+Serves synthetic payloads (see synthetic.py) on the same paths and in the same
+shapes as the real APIs:
+
+    GET /query?function=TIME_SERIES_DAILY&symbol=...   Alpha Vantage
+    GET /v2/everything?q=...                           NewsAPI
+    GET /__stats                                       Outcome counters (JSON)
+    POST /__reset                                      Reset the counters
+
+Every request draws one outcome from the fault profile: a 5xx error, a 429, an
+Alpha Vantage quota "Note" (HTTP 200 without data, as the real API does), a
+body trickled out slowly, a body cut off before Content-Length, or a normal
+response. A response latency drawn from the latency distribution is applied
+before the status line is sent.
+
+Usage:
+    python benchmarks/mock_api.py --port 8765 --latency lognormal:80:0.6 --error-rate 0.05
+    ALPHA_VANTAGE_API_KEY=x NEWS_API_KEY=x python run_pipeline.py   # with base_url pointed at it
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Optional
+from urllib.parse import urlparse, parse_qs
+
+from synthetic import generate_market_payload, generate_news_payload
+
+OUTCOMES = ("ok", "server_error", "rate_limited", "note", "slow_body", "truncated")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parses a latency distribution into a sampler returning seconds.
+
+    Formats (milliseconds):
+        fixed:MS | uniform:LOW:HIGH | lognormal:MEDIAN:SIGMA | exponential:MEAN
+    A bare number is the same as fixed:MS.
+    """
+    kind, _, rest = spec.partition(":")
+    if not rest:
+        kind, rest = "fixed", spec
+    try:
+        values = [float(v) for v in rest.split(":")]
+        if kind == "fixed" and len(values) == 1:
+            ms = values[0]
+            return lambda rng: ms / 1000
+        if kind == "uniform" and len(values) == 2:
+            low, high = values
+            return lambda rng: rng.uniform(low, high) / 1000
+        if kind == "lognormal" and len(values) == 2:
+            median, sigma = values
+            return lambda rng: median * rng.lognormvariate(0, sigma) / 1000
+        if kind == "exponential" and len(values) == 1:
+            mean = values[0]
+            return lambda rng: rng.expovariate(1 / mean) / 1000 if mean else 0.0
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency distribution: '{spec}'")
+
+
+class FaultProfile:
+    """
+    Probabilities of each injected fault plus the latency distribution.
+
+    Rates are independent slices of [0, 1); whatever is left over is served normally.
+    """
+    def __init__(self, latency: str = "0", error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 note_rate: float = 0.0, slow_body_rate: float = 0.0, truncate_rate: float = 0.0,
+                 slow_body_seconds: float = 2.0, retry_after: int = 1):
+        self.latency_spec = latency
+        self.latency = parse_latency(latency)
+        self.rates = [
+            ("server_error", error_rate),
+            ("rate_limited", rate_limit_rate),
+            ("note", note_rate),
+            ("slow_body", slow_body_rate),
+            ("truncated", truncate_rate),
+        ]
+        if sum(rate for _, rate in self.rates) > 1:
+            raise ValueError("Fault rates add up to more than 1")
+        self.slow_body_seconds = slow_body_seconds
+        self.retry_after = retry_after
+
+    def draw(self, rng: random.Random) -> str:
+        roll = rng.random()
+        for outcome, rate in self.rates:
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return "ok"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.rates, latency=self.latency_spec,
+                    slow_body_seconds=self.slow_body_seconds, retry_after=self.retry_after)
+
+
+class MockApiServer:
+    """
+    Threaded HTTP server serving both APIs, runnable in the background of a load test.
+    """
+    def __init__(self, profile: FaultProfile, host: str = "127.0.0.1", port: int = 0,
+                 market_years: float = 1.0, news_articles: int = 100, seed: int = 0):
+        self.profile = profile
+        self.market_years = market_years
+        self.news_articles = news_articles
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._bodies: Dict[str, bytes] = {}
+        self._bodies_lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so the pipeline's pooled session behaves as against the real APIs
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without TCP_NODELAY, keep-alive
+            # responses stall on Nagle's algorithm plus the client's delayed ACK (~40ms)
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server.handle(self)
+
+            def do_POST(self):
+                if self.path == "/__reset":
+                    server.reset_stats()
+                    self.send_json(200, {"status": "reset"})
+                else:
+                    self.send_json(404, {"error": "not found"})
+
+            def send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.request_queue_size = 128
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockApiServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats = {}
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._stats_lock:
+            return {api: dict(counts) for api, counts in self.stats.items()}
+
+    def _count(self, api: str, outcome: str):
+        with self._stats_lock:
+            counts = self.stats.setdefault(api, dict.fromkeys(OUTCOMES, 0))
+            counts[outcome] += 1
+
+    def _body(self, key: str, build: Callable[[], Dict[str, Any]]) -> bytes:
+        # Payloads are generated once per symbol/query and then served from memory
+        body = self._bodies.get(key)
+        if body is None:
+            body = json.dumps(build()).encode("utf-8")
+            with self._bodies_lock:
+                self._bodies[key] = body
+        return body
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        parsed = urlparse(request.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+        if parsed.path == "/__stats":
+            request.send_json(200, {"profile": self.profile.to_dict(), "stats": self.snapshot()})
+            return
+
+        if parsed.path == "/query":
+            api = "alpha_vantage"
+            symbol = params.get("symbol", "SPY")
+            body_key = f"market:{symbol}"
+            build = lambda: generate_market_payload(symbol, self.market_years, seed=self.seed)
+        elif parsed.path == "/v2/everything":
+            api = "news_api"
+            body_key = f"news:{params.get('q', '')}"
+            build = lambda: generate_news_payload(self.news_articles, seed=self.seed)
+        else:
+            request.send_json(404, {"error": f"unknown path {parsed.path}"})
+            return
+
+        with self._rng_lock:
+            outcome = self.profile.draw(self._rng)
+            delay = self.profile.latency(self._rng)
+            status = self._rng.choice((500, 502, 503))
+        # News has no quota "Note"; NewsAPI reports exhausted quota as a 429
+        if outcome == "note" and api == "news_api":
+            outcome = "rate_limited"
+        self._count(api, outcome)
+
+        if delay > 0:
+            time.sleep(delay)
+
+        if outcome == "server_error":
+            request.send_json(status, {"status": "error", "message": "Injected server error"})
+        elif outcome == "rate_limited":
+            payload = ({"status": "error", "code": "rateLimited", "message": "Injected rate limit"}
+                       if api == "news_api" else {"Information": "Injected rate limit"})
+            request.send_json(429, payload, {"Retry-After": str(self.profile.retry_after)})
+        elif outcome == "note":
+            request.send_json(200, {"Note": "Thank you for using Alpha Vantage! Our standard API call "
+                                            "frequency is 5 calls per minute and 500 calls per day."})
+        else:
+            self._send_body(request, self._body(body_key, build), outcome)
+
+    def _send_body(self, request: BaseHTTPRequestHandler, body: bytes, outcome: str):
+        request.send_response(200)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        try:
+            if outcome == "truncated":
+                # Promise the full body, send half, then drop the connection
+                request.wfile.write(body[:len(body) // 2])
+                request.wfile.flush()
+                request.close_connection = True
+            elif outcome == "slow_body":
+                chunks = 10
+                size = len(body) // chunks + 1
+                for i in range(0, len(body), size):
+                    request.wfile.write(body[i:i + size])
+                    request.wfile.flush()
+                    time.sleep(self.profile.slow_body_seconds / chunks)
+            else:
+                request.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (e.g. read timeout); nothing left to do
+            request.close_connection = True
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """Adds the fault-profile options shared by the server and the load test."""
+    parser.add_argument("--latency", default="0",
+                        help="Latency distribution in ms: fixed:MS, uniform:LO:HI, lognormal:MEDIAN:SIGMA, "
+                             "exponential:MEAN (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 5xx responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument("--note-rate", type=float, default=0.0,
+                        help="Fraction of Alpha Vantage quota 'Note' responses (429 for NewsAPI)")
+    parser.add_argument("--slow-body-rate", type=float, default=0.0, help="Fraction of bodies sent slowly")
+    parser.add_argument("--slow-body-seconds", type=float, default=2.0, help="Time to trickle out a slow body")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Fraction of bodies cut off midway")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After header sent with 429s")
+    parser.add_argument("--market-years", type=float, default=1.0, help="Years of history per market response")
+    parser.add_argument("--news-articles", type=int, default=100, help="Articles per news response")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def profile_from_args(args: argparse.Namespace) -> FaultProfile:
+    return FaultProfile(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        note_rate=args.note_rate,
+        slow_body_rate=args.slow_body_rate,
+        truncate_rate=args.truncate_rate,
+        slow_body_seconds=args.slow_body_seconds,
+        retry_after=args.retry_after,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mock Alpha Vantage / NewsAPI server with fault injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = MockApiServer(profile_from_args(args), args.host, args.port,
+                           market_years=args.market_years, news_articles=args.news_articles, seed=args.seed)
+    print(f"Mock APIs on {server.url}: alpha_vantage base_url {server.url}/query, "
+          f"news_api base_url {server.url}/v2/everything")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.snapshot(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
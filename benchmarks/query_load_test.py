@@ -0,0 +1,222 @@
+"""
+Latency benchmark for the read-only query service (storage/query_service.py).
+
+By default it builds a synthetic database in a scratch directory, starts the
+service in-process on a free port and drives it from several client threads
+over keep-alive connections with a mix of market range, news and symbol
+queries. Use --url to measure an already running service instead.
+
+Reports throughput, p50/p90/p99/max latency per endpoint and the service's
+cache hit ratio. --write-every simulates pipeline storage stages by bumping
+the market_data generation periodically, which invalidates the cache.
+
+Usage:
+    python benchmarks/query_load_test.py --symbols 50 --duration 10 --concurrency 8
+    python benchmarks/query_load_test.py --no-cache --json query.json
+    python benchmarks/query_load_test.py --url http://localhost:8081 --symbols 50   # AAAA..AABX must exist
+"""
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, Any, List, Tuple
+from urllib.parse import urlparse, urlencode
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic import symbol_names, generate_market_payload, generate_articles, NEWS_SOURCES  # noqa: E402
+from internal_data_automation.storage.database import Database  # noqa: E402
+from internal_data_automation.storage.query_service import QueryService, make_server  # noqa: E402
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def build_database(db_path: str, symbols: List[str], years: float, articles: int, logger: logging.Logger):
+    """Fills a fresh database with synthetic bars and articles."""
+    db = Database(db_path, logger, journal_mode="wal")
+    for symbol in symbols:
+        series = generate_market_payload(symbol, years)["Time Series (Daily)"]
+        db.insert_market_data([
+            {"symbol": symbol, "date": day, "open": float(v["1. open"]), "high": float(v["2. high"]),
+             "low": float(v["3. low"]), "close": float(v["4. close"]), "volume": int(v["5. volume"])}
+            for day, v in series.items()
+        ])
+    db.insert_news_data([
+        {"published_at": a["publishedAt"], "source": a["source"]["name"], "title": a["title"],
+         "description": a["description"], "url": a["url"]}
+        for a in generate_articles(articles)
+    ])
+    return db
+
+
+def make_request(rng: random.Random, symbols: List[str], years: float, hot_fraction: float) -> Tuple[str, str]:
+    """
+    Picks a query. A `hot_fraction` of queries come from a small fixed set (dashboards
+    refreshing the same views), the rest are random ranges.
+    """
+    end = date(2026, 1, 2)
+    kind = rng.choices(["market", "news", "symbols"], weights=[70, 25, 5])[0]
+    if kind == "symbols":
+        return kind, "/symbols"
+    hot = rng.random() < hot_fraction
+    if kind == "market":
+        symbol = symbols[0] if hot else rng.choice(symbols)
+        span = 30 if hot else rng.randint(5, int(365 * years))
+        start = end - timedelta(days=span if hot else rng.randint(span, int(365 * years)))
+        params = {"symbol": symbol, "start": start.isoformat(), "end": (start + timedelta(days=span)).isoformat()}
+    else:
+        source = NEWS_SOURCES[0] if hot else rng.choice(NEWS_SOURCES + [None])
+        params = {"since": "2026-01-01", "limit": 50} if hot else {"since": "2026-01-01", "limit": rng.randint(10, 200)}
+        if source:
+            params["source"] = source
+    return kind, f"/{kind}?{urlencode(params)}"
+
+
+def client(base_url: str, deadline: float, seed: int, symbols: List[str], years: float, hot_fraction: float,
+           samples: Dict[str, List[float]], errors: List[str], lock: threading.Lock):
+    parsed = urlparse(base_url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    rng = random.Random(seed)
+    local: Dict[str, List[float]] = {}
+    while time.perf_counter() < deadline:
+        kind, path = make_request(rng, symbols, years, hot_fraction)
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(f"{response.status} {path}")
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(f"{e} {path}")
+            conn.close()
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+            continue
+        local.setdefault(kind, []).append(time.perf_counter() - start)
+    conn.close()
+    with lock:
+        for kind, values in local.items():
+            samples.setdefault(kind, []).extend(values)
+
+
+def fetch_json(base_url: str, path: str) -> Dict[str, Any]:
+    parsed = urlparse(base_url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    try:
+        conn.request("GET", path)
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Query service latency benchmark")
+    parser.add_argument("--url", help="Benchmark a running service instead of an in-process one")
+    parser.add_argument("--symbols", type=int, default=50, help="Synthetic symbols (default: 50)")
+    parser.add_argument("--years", type=float, default=5, help="Years of bars per symbol (default: 5)")
+    parser.add_argument("--articles", type=int, default=20000, help="Synthetic articles (default: 20000)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load (default: 10)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads (default: 8)")
+    parser.add_argument("--hot-fraction", type=float, default=0.5,
+                        help="Share of queries repeating a few popular views (default: 0.5)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the result cache (cache_size 0)")
+    parser.add_argument("--write-every", type=float, default=0,
+                        help="Bump the market_data generation every N seconds, like storage stages do")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logger = logging.getLogger("query_load_test")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    symbols = symbol_names(args.symbols)
+    workdir, server, db = None, None, None
+    base_url = args.url
+    if not base_url:
+        workdir = tempfile.mkdtemp(prefix="ida-query-")
+        db_path = os.path.join(workdir, "internal_data.db")
+        print(f"Building database: {args.symbols} symbols x {args.years} years, {args.articles} articles ...")
+        db = build_database(db_path, symbols, args.years, args.articles, logger)
+        service = QueryService(db_path, logger, cache_size=0 if args.no_cache else 1024)
+        server = make_server(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    samples: Dict[str, List[float]] = {}
+    errors: List[str] = []
+    lock = threading.Lock()
+    stop_writes = threading.Event()
+    try:
+        if args.write_every and db:
+            def writer():
+                while not stop_writes.wait(args.write_every):
+                    db.bump_data_generation("market_data")
+            threading.Thread(target=writer, daemon=True).start()
+
+        deadline = time.perf_counter() + args.duration
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=client, args=(base_url, deadline, args.seed + i, symbols, args.years,
+                                                  args.hot_fraction, samples, errors, lock))
+            for i in range(args.concurrency)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        health = fetch_json(base_url, "/health")
+    finally:
+        stop_writes.set()
+        if server:
+            server.shutdown()
+            server.server_close()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    total = sum(len(v) for v in samples.values())
+    results = {"requests": total, "errors": len(errors), "requests_per_second": round(total / elapsed, 1),
+               "endpoints": {}, "cache": health.get("cache")}
+    print(f"{'endpoint':<10}{'requests':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for kind, values in sorted(samples.items()):
+        stats = {
+            "requests": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p90_ms": round(percentile(values, 90) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+        }
+        results["endpoints"][kind] = stats
+        print(f"{kind:<10}{stats['requests']:>10}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}"
+              f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+    print(f"Total {total} requests in {elapsed:.1f}s ({results['requests_per_second']}/s), {len(errors)} errors")
+    if results["cache"]:
+        print(f"Cache: {json.dumps(results['cache'])}")
+    if errors:
+        print("First errors:", *errors[:5], sep="\n  ")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(dict(results, concurrency=args.concurrency, duration=args.duration,
+                           no_cache=args.no_cache), f, indent=2)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Per-stage throughput benchmark on synthetic Alpha Vantage and NewsAPI payloads.
+
+Generates deterministic raw files in a scratch directory, then measures
+clean_market_data, clean_news_data, Database.insert_market_data,
+Database.insert_news_data and generate_reports. Every stage is timed without
+tracing; peak memory comes from a second tracemalloc pass on a fresh database
+so tracing overhead never distorts the timings.
+
+Usage:
+    python benchmarks/stage_benchmark.py --symbols 50 --years 5 --articles 20000
+    python benchmarks/stage_benchmark.py --preset large --json bench.json
+    python benchmarks/stage_benchmark.py --json new.json --compare bench.json
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic import symbol_names, generate_market_payload, generate_news_payload  # noqa: E402
+from internal_data_automation.processing.market_cleaner import clean_market_data  # noqa: E402
+from internal_data_automation.processing.news_cleaner import clean_news_data  # noqa: E402
+from internal_data_automation.storage.database import Database  # noqa: E402
+from internal_data_automation.reporting.report_generator import generate_reports  # noqa: E402
+
+PRESETS = {
+    "small": {"symbols": 20, "years": 2, "articles": 5000},
+    "medium": {"symbols": 200, "years": 10, "articles": 100000},
+    "large": {"symbols": 5000, "years": 20, "articles": 1000000},
+}
+
+# Run date token of the raw files (market_<symbol>_<key>.json, news_<key>.json)
+RUN_KEY = "bench"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def generate_raw_files(symbols: List[str], years: float, articles: int, seed: int) -> Dict[str, Any]:
+    """Writes the synthetic raw payloads into data/raw/ of the current directory."""
+    raw_dir = os.path.join("data", "raw")
+    os.makedirs(raw_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    market_bytes = 0
+    for symbol in symbols:
+        path = os.path.join(raw_dir, f"market_{symbol}_{RUN_KEY}.json")
+        with open(path, 'w') as f:
+            json.dump(generate_market_payload(symbol, years, seed=seed), f)
+        market_bytes += os.path.getsize(path)
+
+    news_path = os.path.join(raw_dir, f"news_{RUN_KEY}.json")
+    with open(news_path, 'w') as f:
+        json.dump(generate_news_payload(articles, seed=seed), f)
+
+    return {
+        "seconds": time.perf_counter() - start,
+        "market_bytes": market_bytes,
+        "news_bytes": os.path.getsize(news_path),
+    }
+
+
+def measure(func: Callable[[], Tuple[int, Any]], trace_memory: bool) -> Dict[str, Any]:
+    """
+    Runs `func` (returning (records processed, result)) and measures it.
+    """
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    records, result = func()
+    seconds = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"seconds": seconds, "records": records, "peak_bytes": peak, "result": result}
+
+
+def run_pass(symbols: List[str], db_path: str, logger: logging.Logger, trace_memory: bool) -> Dict[str, Dict[str, Any]]:
+    """Runs every stage once against a fresh database."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    shutil.rmtree("reports", ignore_errors=True)
+
+    stages: Dict[str, Dict[str, Any]] = {}
+
+    def clean_market():
+        batches = [clean_market_data(logger, RUN_KEY, symbol=s) for s in symbols]
+        return sum(len(b) for b in batches), batches
+    stages["clean_market"] = measure(clean_market, trace_memory)
+    market_batches = stages["clean_market"].pop("result")
+
+    def clean_news():
+        records = clean_news_data(logger, RUN_KEY)
+        return len(records), records
+    stages["clean_news"] = measure(clean_news, trace_memory)
+    news_records = stages["clean_news"].pop("result")
+
+    db = Database(db_path, logger)
+
+    def insert_market():
+        inserted = sum(db.insert_market_data(batch) for batch in market_batches)
+        return sum(len(b) for b in market_batches), inserted
+    stages["insert_market"] = measure(insert_market, trace_memory)
+    stages["insert_market"]["rows_inserted"] = stages["insert_market"].pop("result")
+
+    def insert_news():
+        return len(news_records), db.insert_news_data(news_records)
+    stages["insert_news"] = measure(insert_news, trace_memory)
+    stages["insert_news"]["rows_inserted"] = stages["insert_news"].pop("result")
+
+    db_size = os.path.getsize(db_path)
+
+    def reports():
+        generated = generate_reports({"storage": {"database_path": db_path}}, logger, RUN_KEY) or []
+        return len(generated), sum(os.path.getsize(p) for p in generated)
+    stages["generate_reports"] = measure(reports, trace_memory)
+    stages["generate_reports"]["bytes_written"] = stages["generate_reports"].pop("result")
+
+    for stage in stages.values():
+        stage["db_size_bytes"] = db_size
+    return stages
+
+
+def summarise(timed: Dict[str, Dict[str, Any]], traced: Dict[str, Dict[str, Any]],
+              input_bytes: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+    summary = {}
+    for name, stage in timed.items():
+        seconds = stage["seconds"]
+        entry = {
+            "seconds": round(seconds, 6),
+            "records": stage["records"],
+            "records_per_second": round(stage["records"] / seconds, 1) if seconds else None,
+            "db_size_bytes": stage["db_size_bytes"],
+        }
+        if name in input_bytes:
+            entry["input_bytes"] = input_bytes[name]
+            entry["mb_per_second"] = round(input_bytes[name] / seconds / 1e6, 2) if seconds else None
+        for key in ("rows_inserted", "bytes_written"):
+            if key in stage:
+                entry[key] = stage[key]
+        if traced:
+            entry["peak_memory_bytes"] = traced[name]["peak_bytes"]
+        summary[name] = entry
+    return summary
+
+
+def print_summary(summary: Dict[str, Dict[str, Any]], baseline: Dict[str, Any] = None):
+    header = f"{'stage':<18}{'seconds':>10}{'records':>12}{'records/s':>14}{'MB/s':>9}{'peak MB':>10}"
+    if baseline:
+        header += f"{'vs base':>10}"
+    print(header)
+    for name, s in summary.items():
+        peak = s.get("peak_memory_bytes")
+        line = (f"{name:<18}{s['seconds']:>10.3f}{s['records']:>12}"
+                f"{(s['records_per_second'] or 0):>14.0f}"
+                f"{(s.get('mb_per_second') or 0):>9.1f}"
+                f"{(peak / 1e6 if peak is not None else float('nan')):>10.1f}")
+        if baseline:
+            base = baseline.get("stages", {}).get(name)
+            if base and base.get("records_per_second") and s["records_per_second"]:
+                ratio = s["records_per_second"] / base["records_per_second"]
+                line += f"{ratio:>9.2f}x"
+            else:
+                line += f"{'n/a':>10}"
+        print(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Synthetic per-stage pipeline benchmark")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--symbols", type=int, help="Number of market symbols (overrides preset)")
+    parser.add_argument("--years", type=float, help="Years of daily history per symbol (overrides preset)")
+    parser.add_argument("--articles", type=int, help="Number of news articles (overrides preset)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass")
+    parser.add_argument("--workdir", help="Scratch directory (default: a temporary directory, removed afterwards)")
+    parser.add_argument("--json", dest="json_path", help="Write machine-readable results to this file")
+    parser.add_argument("--compare", help="Earlier --json output to compare throughput against")
+    args = parser.parse_args(argv)
+
+    scale = dict(PRESETS[args.preset])
+    for key in ("symbols", "years", "articles"):
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+
+    logger = logging.getLogger("stage_benchmark")
+    logger.addHandler(logging.StreamHandler(sys.stderr))
+    logger.setLevel(logging.WARNING)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="ida-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        symbols = symbol_names(scale["symbols"])
+        print(f"Generating {scale['symbols']} symbols x {scale['years']} years and {scale['articles']} articles "
+              f"in {workdir} ...")
+        generated = generate_raw_files(symbols, scale["years"], scale["articles"], args.seed)
+        print(f"Generated {generated['market_bytes'] / 1e6:.1f} MB market and "
+              f"{generated['news_bytes'] / 1e6:.1f} MB news data in {generated['seconds']:.1f}s")
+
+        db_path = os.path.join("data", "bench.db")
+        timed = run_pass(symbols, db_path, logger, trace_memory=False)
+        traced = {} if args.no_memory else run_pass(symbols, db_path, logger, trace_memory=True)
+        summary = summarise(timed, traced, {
+            "clean_market": generated["market_bytes"],
+            "clean_news": generated["news_bytes"],
+        })
+    finally:
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "scale": scale,
+        },
+        "stages": summary,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("scale") != scale:
+            print(f"WARNING: baseline scale {baseline.get('meta', {}).get('scale')} differs from {scale}")
+
+    print_summary(summary, baseline)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
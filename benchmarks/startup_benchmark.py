@@ -0,0 +1,218 @@
+"""
+Cold-start benchmark for run_pipeline.py based on `python -X importtime`.
+
+Each scenario starts a fresh interpreter in a scratch working directory, parses
+the import-time report and checks it against a per-scenario budget and a list
+of modules that must not be imported in that mode (e.g. boto3 in development).
+
+Usage:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --repeat 10 --json startup.json
+    python benchmarks/startup_benchmark.py --budget development=150
+
+Exits with status 1 if any scenario exceeds its budget or imports a forbidden module.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List, Set
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+DEV_CONFIG = """
+app:
+  mode: "development"
+log_level: "WARNING"
+logging:
+  queue: true
+storage:
+  database_path: "data/internal_data.db"
+metrics:
+  prometheus_textfile: null
+"""
+
+# Budgets are the summed cumulative import time (ms) of the top-level imports the
+# pipeline triggers, i.e. excluding what a bare interpreter (site, encodings) imports.
+SCENARIOS: List[Dict[str, Any]] = [
+    {
+        "name": "development-skip-ingestion",
+        "description": "Development run with --skip-ingestion",
+        "argv": ["run_pipeline.py", "--skip-ingestion"],
+        "budget_ms": 120,
+        "forbidden": ["requests", "boto3", "botocore"],
+    },
+    {
+        "name": "development",
+        "description": "Full development run without API keys",
+        "argv": ["run_pipeline.py"],
+        "budget_ms": 120,
+        # Without API keys ingestion returns before any HTTP client is needed
+        "forbidden": ["requests", "boto3", "botocore"],
+    },
+    {
+        "name": "production-imports",
+        "description": "Everything a production run loads (HTTP session, S3 and CloudWatch clients)",
+        "argv": [
+            "-c",
+            "import run_pipeline;"
+            "from internal_data_automation.utils import api_client, aws_utils;"
+            "api_client.get_session();"
+            "import boto3, botocore.exceptions"
+        ],
+        "budget_ms": 600,
+        "forbidden": [],
+        "requires": ["requests", "boto3"],
+    },
+]
+
+
+def parse_importtime(stderr: str, baseline: Set[str] = frozenset()) -> Dict[str, Any]:
+    """
+    Parses `-X importtime` output.
+
+    Args:
+        stderr: Output of the interpreter run with -X importtime.
+        baseline: Top-level modules imported by a bare interpreter, excluded from the total.
+
+    Returns:
+        total_ms: Sum of cumulative times of top-level imports not in `baseline`.
+        modules: Mapping of module name to cumulative time (ms).
+        top_level: Names of the top-level imports.
+    """
+    top_level: Set[str] = set()
+    total_us = 0
+    modules: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        modules[module] = int(cumulative) / 1000
+        # Top-level imports have a single space of indentation
+        if len(indent) == 1:
+            top_level.add(module)
+            if module not in baseline:
+                total_us += int(cumulative)
+    return {"total_ms": total_us / 1000, "modules": modules, "top_level": top_level}
+
+
+def interpreter_baseline(workdir: str, env: Dict[str, str]) -> Set[str]:
+    """Returns the top-level modules a bare interpreter imports on startup."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"],
+                          cwd=workdir, env=env, capture_output=True, text=True)
+    return parse_importtime(proc.stderr)["top_level"]
+
+
+def prepare_workdir() -> str:
+    """Creates a scratch working directory with the code and a development config."""
+    workdir = tempfile.mkdtemp(prefix="ida-startup-")
+    shutil.copy(os.path.join(REPO_ROOT, "run_pipeline.py"), workdir)
+    shutil.copytree(os.path.join(REPO_ROOT, "internal_data_automation"),
+                    os.path.join(workdir, "internal_data_automation"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    with open(os.path.join(workdir, "config.yaml"), 'w') as f:
+        f.write(DEV_CONFIG)
+    return workdir
+
+
+def module_available(name: str) -> bool:
+    import importlib.util
+    return importlib.util.find_spec(name) is not None
+
+
+def scenario_env() -> Dict[str, str]:
+    """Environment without API keys, so development runs never reach the network."""
+    return {k: v for k, v in os.environ.items()
+            if k not in ("ALPHA_VANTAGE_API_KEY", "NEWS_API_KEY", "PYTHONDONTWRITEBYTECODE")}
+
+
+def run_scenario(scenario: Dict[str, Any], workdir: str, repeat: int, baseline: Set[str]) -> Dict[str, Any]:
+    env = scenario_env()
+
+    # Warm-up run so bytecode is compiled; we measure import cost, not compilation
+    subprocess.run([sys.executable] + scenario["argv"], cwd=workdir, env=env, capture_output=True)
+
+    import_totals, wall_times = [], []
+    parsed: Dict[str, Any] = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime"] + scenario["argv"],
+                              cwd=workdir, env=env, capture_output=True, text=True)
+        wall_times.append((time.perf_counter() - start) * 1000)
+        parsed = parse_importtime(proc.stderr, baseline)
+        import_totals.append(parsed["total_ms"])
+
+    # Import times of one sample are noisy; the median is compared against the budget
+    import_ms = statistics.median(import_totals)
+    forbidden = sorted(m for m in scenario["forbidden"] if m in parsed["modules"])
+    heaviest = sorted(parsed["modules"].items(), key=lambda kv: kv[1], reverse=True)[:10]
+
+    return {
+        "scenario": scenario["name"],
+        "description": scenario["description"],
+        "import_ms_median": round(import_ms, 2),
+        "import_ms_min": round(min(import_totals), 2),
+        "wall_ms_median": round(statistics.median(wall_times), 2),
+        "budget_ms": scenario["budget_ms"],
+        "forbidden_imported": forbidden,
+        "heaviest_modules": [{"module": m, "cumulative_ms": ms} for m, ms in heaviest],
+        "passed": import_ms <= scenario["budget_ms"] and not forbidden,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start import-time benchmark for run_pipeline.py")
+    parser.add_argument("--repeat", type=int, default=5, help="Interpreter starts per scenario (default: 5)")
+    parser.add_argument("--budget", action="append", default=[], metavar="SCENARIO=MS",
+                        help="Override the budget of a scenario (repeatable)")
+    parser.add_argument("--scenario", action="append", default=[], help="Only run these scenarios")
+    parser.add_argument("--json", dest="json_path", help="Also write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    overrides = dict(item.split("=", 1) for item in args.budget)
+    workdir = prepare_workdir()
+    results = []
+    try:
+        baseline = interpreter_baseline(workdir, scenario_env())
+        for scenario in SCENARIOS:
+            if args.scenario and scenario["name"] not in args.scenario:
+                continue
+            missing = [m for m in scenario.get("requires", []) if not module_available(m)]
+            if missing:
+                print(f"SKIP {scenario['name']}: {', '.join(missing)} not installed")
+                continue
+            if scenario["name"] in overrides:
+                scenario = dict(scenario, budget_ms=float(overrides[scenario["name"]]))
+
+            result = run_scenario(scenario, workdir, args.repeat, baseline)
+            results.append(result)
+
+            status = "PASS" if result["passed"] else "FAIL"
+            print(f"{status} {result['scenario']:<28} imports {result['import_ms_median']:8.1f} ms "
+                  f"(budget {result['budget_ms']} ms)  wall {result['wall_ms_median']:8.1f} ms")
+            if result["forbidden_imported"]:
+                print(f"     forbidden modules imported: {', '.join(result['forbidden_imported'])}")
+            if not result["passed"]:
+                for entry in result["heaviest_modules"][:5]:
+                    print(f"     {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({"python": sys.version, "results": results}, f, indent=2)
+
+    return 0 if all(r["passed"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Deterministic synthetic payloads in the shape of the Alpha Vantage and NewsAPI responses.
+
+The same seed and scale always produce byte-identical payloads, so benchmark
+results can be compared across commits.
+"""
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Iterator, List
+
+NEWS_SOURCES = [
+    "Reuters", "Bloomberg", "Financial Times", "The Wall Street Journal", "CNBC",
+    "MarketWatch", "Yahoo Finance", "Barron's", "Forbes", "Business Insider",
+]
+
+TITLE_WORDS = [
+    "stocks", "rally", "slump", "earnings", "guidance", "inflation", "rates", "fed",
+    "bond", "yields", "oil", "tech", "banks", "merger", "ipo", "outlook", "record",
+    "shares", "investors", "market", "quarter", "growth", "jobs", "report", "dollar",
+]
+
+
+def symbol_names(count: int) -> List[str]:
+    """Returns `count` distinct ticker-like symbols (AAAA, AAAB, ...)."""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    symbols = []
+    for i in range(count):
+        name = ""
+        n = i
+        for _ in range(4):
+            name = letters[n % 26] + name
+            n //= 26
+        symbols.append(name)
+    return symbols
+
+
+def trading_days(end: date, years: float) -> List[date]:
+    """Returns the weekdays in the `years` before `end`, newest first (like Alpha Vantage)."""
+    days = []
+    current = end
+    start = end - timedelta(days=int(365.25 * years))
+    while current > start:
+        if current.weekday() < 5:
+            days.append(current)
+        current -= timedelta(days=1)
+    return days
+
+
+def generate_market_payload(symbol: str, years: float, seed: int = 0,
+                            end: date = date(2026, 1, 2)) -> Dict[str, Any]:
+    """
+    Generates a TIME_SERIES_DAILY response for one symbol as a geometric random walk.
+
+    Args:
+        symbol: Ticker symbol.
+        years: Years of daily history.
+        seed: Random seed (combined with the symbol).
+        end: Most recent trading day.
+    """
+    rng = random.Random(f"{seed}-{symbol}")
+    days = trading_days(end, years)
+    price = rng.uniform(10, 500)
+    series: Dict[str, Dict[str, str]] = {}
+    # Walk forward in time so prices are continuous, then emit newest first
+    bars = []
+    for day in reversed(days):
+        open_ = price
+        close = max(0.01, open_ * (1 + rng.gauss(0, 0.015)))
+        high = max(open_, close) * (1 + abs(rng.gauss(0, 0.005)))
+        low = min(open_, close) * (1 - abs(rng.gauss(0, 0.005)))
+        volume = int(rng.lognormvariate(14, 1))
+        bars.append((day, open_, high, low, close, volume))
+        price = close
+    for day, open_, high, low, close, volume in reversed(bars):
+        series[day.isoformat()] = {
+            "1. open": f"{open_:.4f}",
+            "2. high": f"{high:.4f}",
+            "3. low": f"{low:.4f}",
+            "4. close": f"{close:.4f}",
+            "5. volume": str(volume),
+        }
+
+    return {
+        "Meta Data": {
+            "1. Information": "Daily Prices (open, high, low, close) and Volumes",
+            "2. Symbol": symbol,
+            "3. Last Refreshed": end.isoformat(),
+            "4. Output Size": "Full size",
+            "5. Time Zone": "US/Eastern",
+        },
+        "Time Series (Daily)": series,
+    }
+
+
+def generate_articles(count: int, seed: int = 0, start: datetime = datetime(2026, 1, 1),
+                      duplicate_ratio: float = 0.0) -> Iterator[Dict[str, Any]]:
+    """
+    Yields NewsAPI article objects.
+
+    Args:
+        count: Number of articles.
+        seed: Random seed.
+        start: Publication time of the first article (articles are a minute apart).
+        duplicate_ratio: Fraction of articles re-using the URL of an earlier article.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        url_id = rng.randrange(i) if i and rng.random() < duplicate_ratio else i
+        title = " ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(6, 12))).capitalize()
+        yield {
+            "source": {"id": None, "name": rng.choice(NEWS_SOURCES)},
+            "author": f"Author {rng.randrange(500)}",
+            "title": title,
+            "description": " ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(20, 40))),
+            "url": f"https://news.example.com/{url_id // 1000}/article-{url_id}",
+            "urlToImage": None,
+            "publishedAt": (start + timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "content": None,
+        }
+
+
+def generate_news_payload(count: int, seed: int = 0, duplicate_ratio: float = 0.0) -> Dict[str, Any]:
+    """Generates a NewsAPI /v2/everything response with `count` articles."""
+    articles = list(generate_articles(count, seed=seed, duplicate_ratio=duplicate_ratio))
+    return {"status": "ok", "totalResults": len(articles), "articles": articles}
@@ -1,12 +1,12 @@
 
-import requests
-import json
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from internal_data_automation.utils import json_codec
 from internal_data_automation.utils.api_client import fetch_with_retries
 
-def fetch_market_data(config: Dict[str, Any], logger: logging.Logger, date_str: str) -> None:
+def fetch_market_data(config: Dict[str, Any], logger: logging.Logger, date_str: str,
+                      symbol: Optional[str] = None) -> None:
     """
     Fetches daily market data from Alpha Vantage and saves it to a JSON file.
 
@@ -14,12 +14,15 @@ def fetch_market_data(config: Dict[str, Any], logger: logging.Logger, date_str:
         config: Configuration dictionary.
         logger: Logger instance.
         date_str: Current date string (YYYY-MM-DD).
+        symbol: Symbol to fetch into market_<symbol>_<date>.json (work-queue mode).
+            Defaults to alpha_vantage.symbol, saved as market_<date>.json.
     """
     alpha_config = config.get("alpha_vantage", {})
     # Get API key from environment variable
     api_key = os.environ.get("ALPHA_VANTAGE_API_KEY")
     base_url = alpha_config.get("base_url")
-    symbol = alpha_config.get("symbol", "SPY")
+    file_key = f"{symbol}_{date_str}" if symbol else date_str
+    symbol = symbol or alpha_config.get("symbol", "SPY")
 
     if not api_key:
         logger.warning("ALPHA_VANTAGE_API_KEY not found in environment. Skipping market data ingestion.")
@@ -33,32 +36,36 @@ def fetch_market_data(config: Dict[str, Any], logger: logging.Logger, date_str:
         "apikey": api_key
     }
 
+    # Imported here so runs without API keys never load requests
+    import requests
+
     try:
-        logger.info(f"Fetching market data for {symbol}...")
+        logger.info("Fetching market data for %s...", symbol)
         response = fetch_with_retries(base_url, params, config, logger)
         
-        data = response.json()
+        data = json_codec.loads(response.content)
 
         # Check if API returned an error message or rate limit note
         if "Error Message" in data:
-            logger.error(f"Alpha Vantage API Error: {data['Error Message']}")
+            logger.error("Alpha Vantage API Error: %s", data['Error Message'])
             return
         if "Note" in data:
-            logger.warning(f"Alpha Vantage API Note: {data['Note']}")
+            logger.warning("Alpha Vantage API Note: %s", data['Note'])
 
         # Ensure raw data directory exists
         output_dir = os.path.join("data", "raw")
         os.makedirs(output_dir, exist_ok=True)
 
-        output_file = os.path.join(output_dir, f"market_{date_str}.json")
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=4)
+        output_file = os.path.join(output_dir, f"market_{file_key}.json")
+        # Saved as received: the body has just been validated, so there is no need to re-encode it
+        with open(output_file, 'wb') as f:
+            f.write(response.content)
         
-        logger.info(f"Market data saved to {output_file}")
+        logger.info("Market data saved to %s", output_file)
 
     except requests.RequestException as e:
-        logger.error(f"HTTP Request failed for market data: {e}")
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to decode JSON response for market data: {e}")
+        logger.error("HTTP Request failed for market data: %s", e)
+    except json_codec.DECODE_ERRORS as e:
+        logger.error("Failed to decode JSON response for market data: %s", e)
     except Exception as e:
-        logger.error(f"Unexpected error in market data ingestion: {e}")
+        logger.error("Unexpected error in market data ingestion: %s", e)
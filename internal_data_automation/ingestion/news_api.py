@@ -1,15 +1,29 @@
 
-import requests
-import json
+import contextvars
 import os
 import logging
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from internal_data_automation.utils import json_codec
 from internal_data_automation.utils.api_client import fetch_with_retries
 
+def news_requests(news_config: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Returns the (query, language) pairs to fetch: every entry of `queries` in every
+    one of `languages`, falling back to the single `query`/`language` settings.
+    """
+    queries = news_config.get("queries") or [news_config.get("query", "finance")]
+    languages = news_config.get("languages") or [news_config.get("language", "en")]
+    return [(query, language) for query in queries for language in languages]
+
 def fetch_news_data(config: Dict[str, Any], logger: logging.Logger, date_str: str) -> None:
     """
     Fetches news data from NewsAPI and saves it to a JSON file.
 
+    Every configured query/language pair is requested concurrently (up to
+    news_api.max_concurrency at a time). The articles are merged into one file,
+    keeping the first copy of an article returned by several queries.
+
     Args:
         config: Configuration dictionary.
         logger: Logger instance.
@@ -19,8 +33,7 @@ def fetch_news_data(config: Dict[str, Any], logger: logging.Logger, date_str: st
     # Get API key from environment variable
     api_key = os.environ.get("NEWS_API_KEY")
     base_url = news_config.get("base_url")
-    query = news_config.get("query", "finance")
-    language = news_config.get("language", "en")
+    pairs = news_requests(news_config)
 
     if not api_key:
         logger.warning("NEWS_API_KEY not found in environment. Skipping news data ingestion.")
@@ -28,37 +41,74 @@ def fetch_news_data(config: Dict[str, Any], logger: logging.Logger, date_str: st
     else:
         logger.info("NewsAPI key loaded from environment.")
 
-    params = {
-        "q": query,
-        "from": date_str,
-        "sortBy": "publishedAt",
-        "apiKey": api_key,
-        "language": language
-    }
+    # Imported here so runs without API keys never load requests
+    import requests
 
-    try:
-        logger.info(f"Fetching news data for '{query}'...")
-        response = fetch_with_retries(base_url, params, config, logger)
-        
-        data = response.json()
+    def fetch(query: str, language: str) -> Optional[Dict[str, Any]]:
+        params = {
+            "q": query,
+            "from": date_str,
+            "sortBy": "publishedAt",
+            "apiKey": api_key,
+            "language": language
+        }
+        try:
+            logger.info("Fetching news data for '%s' (%s)...", query, language)
+            response = fetch_with_retries(base_url, params, config, logger)
+            data = json_codec.loads(response.content)
+        except requests.RequestException as e:
+            logger.error("HTTP Request failed for news data '%s' (%s): %s", query, language, e)
+            return None
+        except json_codec.DECODE_ERRORS as e:
+            logger.error("Failed to decode JSON response for news data '%s' (%s): %s", query, language, e)
+            return None
 
         if data.get("status") != "ok":
-            logger.error(f"NewsAPI Error: {data.get('message', 'Unknown error')}")
+            logger.error("NewsAPI Error for '%s' (%s): %s", query, language, data.get('message', 'Unknown error'))
+            return None
+        return data
+
+    try:
+        max_workers = max(1, min(news_config.get("max_concurrency", 4), len(pairs)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="news-fetch") as pool:
+            # Each request runs in a copy of this context, so HTTP latencies count towards the current stage
+            futures = [pool.submit(contextvars.copy_context().run, fetch, query, language)
+                       for query, language in pairs]
+            responses = [future.result() for future in futures]
+
+        fetched = [(pair, data) for pair, data in zip(pairs, responses) if data is not None]
+        if not fetched:
+            logger.error("No news query succeeded; nothing saved.")
             return
 
+        articles, seen_urls = [], set()
+        for (query, language), data in fetched:
+            for article in data.get("articles", []):
+                url = article.get("url")
+                if url in seen_urls:
+                    continue
+                if url:
+                    seen_urls.add(url)
+                articles.append(article)
+        returned = sum(len(data.get("articles", [])) for _, data in fetched)
+        logger.info("Merged %s articles from %s of %s queries (%s duplicates across queries dropped)",
+                    len(articles), len(fetched), len(pairs), returned - len(articles))
+
+        merged = {
+            "status": "ok",
+            "totalResults": len(articles),
+            "queries": [{"query": query, "language": language} for (query, language), _ in fetched],
+            "articles": articles,
+        }
+
         # Ensure raw data directory exists
         output_dir = os.path.join("data", "raw")
         os.makedirs(output_dir, exist_ok=True)
 
         output_file = os.path.join(output_dir, f"news_{date_str}.json")
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=4)
+        json_codec.dump_file(merged, output_file)
 
-        logger.info(f"News data saved to {output_file}")
+        logger.info("News data saved to %s", output_file)
 
-    except requests.RequestException as e:
-        logger.error(f"HTTP Request failed for news data: {e}")
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to decode JSON response for news data: {e}")
     except Exception as e:
-        logger.error(f"Unexpected error in news data ingestion: {e}")
+        logger.error("Unexpected error in news data ingestion: %s", e)
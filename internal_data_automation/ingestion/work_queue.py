@@ -0,0 +1,577 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
+
+from internal_data_automation.storage.database import Database, BUSY_TIMEOUT_SECONDS, filesystem_type, \
+    NETWORK_FILESYSTEMS
+from internal_data_automation.ingestion.market_api import fetch_market_data
+from internal_data_automation.processing.market_cleaner import clean_market_data
+from internal_data_automation.processing.data_quality import validate_records
+
+class WorkQueue:
+    """
+    Lease-based queue of symbols to ingest per run date, stored in the ingestion_leases table.
+
+    Any number of worker processes on one host, sharing a database on a local disk,
+    claim batches of symbols. A claim sets an expiring lease that the holder extends
+    by heartbeating; when a worker dies its leases expire and the next claim hands
+    them to another worker. Mutual exclusion relies on SQLite's file locking, which
+    is unreliable on network filesystems; workers on several hosts share a
+    DynamoDBWorkQueue instead.
+
+    Row states: PENDING -> LEASED -> DONE, or back to PENDING on failure until
+    `max_attempts` is reached, then FAILED.
+    """
+    # Errors a heartbeat may hit without the lease being lost
+    errors: Tuple[type, ...] = (sqlite3.Error,)
+
+    def __init__(self, db_path: str, logger: logging.Logger, worker_id: str,
+                 lease_seconds: float = 300, max_attempts: int = 3):
+        """
+        Args:
+            db_path: Path to the shared SQLite database (ingestion_leases is created by Database).
+            logger: Logger instance.
+            worker_id: Unique name of this worker, recorded on its leases.
+            lease_seconds: Lease duration granted by a claim or heartbeat.
+            max_attempts: Claims per symbol before it is given up as FAILED.
+        """
+        self.db_path = db_path
+        self.logger = logger
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode, so transactions are opened explicitly with BEGIN IMMEDIATE
+        return sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+
+    def _execute(self, query: str, params: tuple) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute(query, params).rowcount
+        finally:
+            conn.close()
+
+    def enqueue(self, run_date: str, symbols: List[str]) -> int:
+        """
+        Adds the symbols of a run date. Symbols already queued (by any worker) are kept as they are.
+
+        Returns:
+            Number of newly queued symbols.
+        """
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO ingestion_leases (run_date, symbol, updated_at) VALUES (?, ?, ?)",
+                [(run_date, symbol, now) for symbol in symbols]
+            )
+            conn.execute("COMMIT")
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def claim(self, run_date: str, batch_size: int) -> List[str]:
+        """
+        Leases up to `batch_size` symbols that are pending or whose lease has expired.
+
+        BEGIN IMMEDIATE takes the database write lock before reading, so two workers
+        can never claim the same row.
+
+        Returns:
+            The claimed symbols (empty if nothing is claimable right now).
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Expired leases that used up their attempts are given up instead of handed out again
+            expired = conn.execute("""
+                UPDATE ingestion_leases
+                SET status = 'FAILED', last_error = 'Lease expired on final attempt', updated_at = ?
+                WHERE run_date = ? AND status = 'LEASED' AND lease_expires_at < ? AND attempts >= ?
+            """, (datetime.now().isoformat(), run_date, now, self.max_attempts)).rowcount
+            if expired:
+                self.logger.warning("Gave up %s symbols whose final lease expired", expired)
+
+            rows = conn.execute("""
+                SELECT symbol, status, worker_id FROM ingestion_leases
+                WHERE run_date = ?
+                  AND (status = 'PENDING' OR (status = 'LEASED' AND lease_expires_at < ?))
+                ORDER BY attempts, symbol
+                LIMIT ?
+            """, (run_date, now, batch_size)).fetchall()
+
+            symbols = [symbol for symbol, _, _ in rows]
+            conn.executemany("""
+                UPDATE ingestion_leases
+                SET status = 'LEASED', worker_id = ?, lease_expires_at = ?, attempts = attempts + 1,
+                    updated_at = ?
+                WHERE run_date = ? AND symbol = ?
+            """, [(self.worker_id, now + self.lease_seconds, datetime.now().isoformat(), run_date, symbol)
+                  for symbol in symbols])
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        for symbol, status, previous_worker in rows:
+            if status == "LEASED":
+                self.logger.warning("Reclaimed expired lease on %s from worker %s", symbol, previous_worker)
+        return symbols
+
+    def heartbeat(self, run_date: str, symbols: List[str]) -> int:
+        """
+        Extends this worker's leases on `symbols`.
+
+        Returns:
+            Number of leases extended; fewer than len(symbols) means a lease expired
+            and was taken over by another worker.
+        """
+        if not symbols:
+            return 0
+        placeholders = ", ".join("?" for _ in symbols)
+        return self._execute(f"""
+            UPDATE ingestion_leases SET lease_expires_at = ?, updated_at = ?
+            WHERE run_date = ? AND worker_id = ? AND status = 'LEASED' AND symbol IN ({placeholders})
+        """, (time.time() + self.lease_seconds, datetime.now().isoformat(), run_date, self.worker_id, *symbols))
+
+    def complete(self, run_date: str, symbol: str, records: int) -> bool:
+        """
+        Marks a leased symbol as done.
+
+        Returns:
+            False if the lease had been lost to another worker in the meantime.
+        """
+        return self._execute("""
+            UPDATE ingestion_leases
+            SET status = 'DONE', records = ?, lease_expires_at = NULL, last_error = NULL, updated_at = ?
+            WHERE run_date = ? AND symbol = ? AND worker_id = ? AND status = 'LEASED'
+        """, (records, datetime.now().isoformat(), run_date, symbol, self.worker_id)) == 1
+
+    def release(self, run_date: str, symbol: str, error: str) -> bool:
+        """
+        Returns a leased symbol to the queue after a failure, or marks it FAILED once
+        it has used up its attempts.
+
+        Returns:
+            False if the lease had been lost to another worker in the meantime.
+        """
+        return self._execute("""
+            UPDATE ingestion_leases
+            SET status = CASE WHEN attempts >= ? THEN 'FAILED' ELSE 'PENDING' END,
+                lease_expires_at = NULL, last_error = ?, updated_at = ?
+            WHERE run_date = ? AND symbol = ? AND worker_id = ? AND status = 'LEASED'
+        """, (self.max_attempts, error, datetime.now().isoformat(), run_date, symbol, self.worker_id)) == 1
+
+    def progress(self, run_date: str) -> Dict[str, int]:
+        """Returns the number of symbols per status for a run date."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM ingestion_leases WHERE run_date = ? GROUP BY status", (run_date,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {status: count for status, count in rows}
+
+
+class DynamoDBWorkQueue:
+    """
+    The same lease queue in a DynamoDB table, for workers on several hosts.
+
+    Items are keyed by run_date (partition key) and symbol (sort key). Every state
+    change is a conditional write on the state the worker last read (status,
+    attempts and lease expiry) or on holding the lease, so of two workers racing
+    for a symbol exactly one write succeeds. Lease expiry compares wall-clock
+    times of different hosts; keep them NTP-synchronised and `lease_seconds` far
+    above their skew.
+
+    A lease-free item stores lease_expires_at 0 and an empty worker_id.
+    """
+    def __init__(self, table_name: str, logger: logging.Logger, worker_id: str,
+                 lease_seconds: float = 300, max_attempts: int = 3, client: Any = None):
+        """
+        Args:
+            table_name: DynamoDB table with partition key run_date (S) and sort key symbol (S).
+            logger: Logger instance.
+            worker_id: Unique name of this worker, recorded on its leases.
+            lease_seconds: Lease duration granted by a claim or heartbeat.
+            max_attempts: Claims per symbol before it is given up as FAILED.
+            client: DynamoDB client (default: the shared boto3 client).
+        """
+        from botocore.exceptions import BotoCoreError, ClientError
+        if client is None:
+            from internal_data_automation.utils.aws_utils import get_client
+            client = get_client("dynamodb")
+        self.table_name = table_name
+        self.logger = logger
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.client = client
+        self._client_error = ClientError
+        self.errors: Tuple[type, ...] = (ClientError, BotoCoreError)
+
+    @staticmethod
+    def _encode(value: Any) -> Dict[str, str]:
+        if isinstance(value, str):
+            return {"S": value}
+        return {"N": repr(value)}
+
+    @staticmethod
+    def _decode(value: Dict[str, str]) -> Any:
+        if "S" in value:
+            return value["S"]
+        number = value["N"]
+        return float(number) if any(c in number for c in ".eE") else int(number)
+
+    def _items(self, run_date: str) -> List[Dict[str, Any]]:
+        """All items of a run date, read consistently."""
+        items, start_key = [], None
+        while True:
+            request = {
+                "TableName": self.table_name,
+                "KeyConditionExpression": "#pk = :pk",
+                "ExpressionAttributeNames": {"#pk": "run_date"},
+                "ExpressionAttributeValues": {":pk": {"S": run_date}},
+                "ConsistentRead": True,
+            }
+            if start_key:
+                request["ExclusiveStartKey"] = start_key
+            response = self.client.query(**request)
+            items.extend({k: self._decode(v) for k, v in item.items()} for item in response.get("Items", []))
+            start_key = response.get("LastEvaluatedKey")
+            if not start_key:
+                return items
+
+    def _update(self, run_date: str, symbol: str, values: Dict[str, Any],
+                expected: List[Tuple[str, str, Any]]) -> bool:
+        """
+        Sets `values` on an item if every (attribute, operator, value) in `expected` holds.
+
+        Returns:
+            False if the condition failed (another worker changed the item first).
+        """
+        names, attribute_values = {}, {}
+        assignments, conditions = [], []
+        for i, (name, value) in enumerate(values.items()):
+            names[f"#a{i}"] = name
+            attribute_values[f":a{i}"] = self._encode(value)
+            assignments.append(f"#a{i} = :a{i}")
+        for i, (name, operator, value) in enumerate(expected):
+            names[f"#c{i}"] = name
+            attribute_values[f":c{i}"] = self._encode(value)
+            conditions.append(f"#c{i} {operator} :c{i}")
+        try:
+            self.client.update_item(
+                TableName=self.table_name,
+                Key={"run_date": {"S": run_date}, "symbol": {"S": symbol}},
+                UpdateExpression="SET " + ", ".join(assignments),
+                ConditionExpression=" AND ".join(conditions),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=attribute_values,
+            )
+            return True
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    def _held(self) -> List[Tuple[str, str, Any]]:
+        return [("worker_id", "=", self.worker_id), ("status", "=", "LEASED")]
+
+    def enqueue(self, run_date: str, symbols: List[str]) -> int:
+        """
+        Adds the symbols of a run date. Symbols already queued (by any worker) are kept as they are.
+
+        Returns:
+            Number of newly queued symbols.
+        """
+        now = datetime.now().isoformat()
+        added = 0
+        for symbol in symbols:
+            item = {"run_date": run_date, "symbol": symbol, "status": "PENDING", "worker_id": "",
+                    "lease_expires_at": 0, "attempts": 0, "records": 0, "last_error": "", "updated_at": now}
+            try:
+                self.client.put_item(
+                    TableName=self.table_name,
+                    Item={k: self._encode(v) for k, v in item.items()},
+                    ConditionExpression="attribute_not_exists(#sk)",
+                    ExpressionAttributeNames={"#sk": "symbol"},
+                )
+                added += 1
+            except self._client_error as e:
+                if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                    raise
+        return added
+
+    def claim(self, run_date: str, batch_size: int) -> List[str]:
+        """
+        Leases up to `batch_size` symbols that are pending or whose lease has expired.
+
+        Each claim is conditional on the item being unchanged since it was read, so
+        a symbol another worker claimed first is skipped.
+
+        Returns:
+            The claimed symbols (empty if nothing is claimable right now).
+        """
+        now = time.time()
+        candidates, expired = [], 0
+        for item in self._items(run_date):
+            lease_expired = item["status"] == "LEASED" and item["lease_expires_at"] < now
+            if lease_expired and item["attempts"] >= self.max_attempts:
+                # Expired leases that used up their attempts are given up instead of handed out again
+                expired += self._update(
+                    run_date, item["symbol"],
+                    {"status": "FAILED", "last_error": "Lease expired on final attempt",
+                     "updated_at": datetime.now().isoformat()},
+                    [("status", "=", "LEASED"), ("lease_expires_at", "=", item["lease_expires_at"])]
+                )
+            elif item["status"] == "PENDING" or lease_expired:
+                candidates.append(item)
+        if expired:
+            self.logger.warning("Gave up %s symbols whose final lease expired", expired)
+
+        claimed = []
+        for item in sorted(candidates, key=lambda i: (i["attempts"], i["symbol"])):
+            if len(claimed) >= batch_size:
+                break
+            won = self._update(
+                run_date, item["symbol"],
+                {"status": "LEASED", "worker_id": self.worker_id, "lease_expires_at": now + self.lease_seconds,
+                 "attempts": item["attempts"] + 1, "updated_at": datetime.now().isoformat()},
+                [("status", "=", item["status"]), ("attempts", "=", item["attempts"]),
+                 ("lease_expires_at", "=", item["lease_expires_at"])]
+            )
+            if won:
+                claimed.append(item["symbol"])
+                if item["status"] == "LEASED":
+                    self.logger.warning("Reclaimed expired lease on %s from worker %s",
+                                        item["symbol"], item["worker_id"])
+        return claimed
+
+    def heartbeat(self, run_date: str, symbols: List[str]) -> int:
+        """
+        Extends this worker's leases on `symbols`.
+
+        Returns:
+            Number of leases extended; fewer than len(symbols) means a lease expired
+            and was taken over by another worker.
+        """
+        expires = time.time() + self.lease_seconds
+        return sum(self._update(run_date, symbol,
+                                {"lease_expires_at": expires, "updated_at": datetime.now().isoformat()},
+                                self._held())
+                   for symbol in symbols)
+
+    def complete(self, run_date: str, symbol: str, records: int) -> bool:
+        """
+        Marks a leased symbol as done.
+
+        Returns:
+            False if the lease had been lost to another worker in the meantime.
+        """
+        return self._update(run_date, symbol,
+                            {"status": "DONE", "records": records, "lease_expires_at": 0, "last_error": "",
+                             "updated_at": datetime.now().isoformat()},
+                            self._held())
+
+    def release(self, run_date: str, symbol: str, error: str) -> bool:
+        """
+        Returns a leased symbol to the queue after a failure, or marks it FAILED once
+        it has used up its attempts.
+
+        Returns:
+            False if the lease had been lost to another worker in the meantime.
+        """
+        values = {"lease_expires_at": 0, "last_error": error, "updated_at": datetime.now().isoformat()}
+        # Conditional writes have no CASE: try the final-attempt transition first
+        return (self._update(run_date, symbol, dict(values, status="FAILED"),
+                             self._held() + [("attempts", ">=", self.max_attempts)])
+                or self._update(run_date, symbol, dict(values, status="PENDING"),
+                                self._held() + [("attempts", "<", self.max_attempts)]))
+
+    def progress(self, run_date: str) -> Dict[str, int]:
+        """Returns the number of symbols per status for a run date."""
+        counts: Dict[str, int] = {}
+        for item in self._items(run_date):
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return counts
+
+
+class LeaseHeartbeat:
+    """
+    Background thread extending the leases a worker currently holds.
+    """
+    def __init__(self, queue: Union[WorkQueue, DynamoDBWorkQueue], run_date: str, interval: float):
+        self.queue = queue
+        self.run_date = run_date
+        self.interval = interval
+        self._held: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+
+    def hold(self, symbols: List[str]):
+        with self._lock:
+            self._held.update(symbols)
+
+    def drop(self, symbol: str):
+        with self._lock:
+            self._held.discard(symbol)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                held = sorted(self._held)
+            try:
+                extended = self.queue.heartbeat(self.run_date, held)
+            except self.queue.errors as e:
+                self.queue.logger.error("Lease heartbeat failed: %s", e)
+                continue
+            if extended < len(held):
+                self.queue.logger.warning("Lost %s of %s leases (expired before heartbeat)",
+                                          len(held) - extended, len(held))
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def make_work_queue(config: Dict[str, Any], logger: logging.Logger, db: Database,
+                    worker_id: str) -> Union[WorkQueue, DynamoDBWorkQueue]:
+    """
+    Creates the lease queue selected by `work_queue.backend`.
+
+    "sqlite" (default) keeps leases in the pipeline database, for workers on one
+    host. "dynamodb" keeps them in `work_queue.dynamodb_table`, for workers on
+    several hosts.
+
+    Raises:
+        ValueError: If the backend is unknown or the DynamoDB table isn't configured.
+        RuntimeError: If the SQLite backend's database is on a network filesystem.
+    """
+    queue_config = config.get("work_queue", {})
+    backend = queue_config.get("backend", "sqlite")
+    lease_seconds = queue_config.get("lease_seconds", 300)
+    max_attempts = queue_config.get("max_attempts", 3)
+
+    if backend == "dynamodb":
+        table_name = queue_config.get("dynamodb_table")
+        if not table_name:
+            raise ValueError("work_queue.dynamodb_table is required for the dynamodb backend")
+        return DynamoDBWorkQueue(table_name, logger, worker_id, lease_seconds, max_attempts)
+    if backend != "sqlite":
+        raise ValueError(f"Invalid work_queue.backend: {backend}. Expected 'sqlite' or 'dynamodb'.")
+
+    fs_type = filesystem_type(db.db_path)
+    if fs_type in NETWORK_FILESYSTEMS:
+        raise RuntimeError(f"{db.db_path} is on a network filesystem ({fs_type}). SQLite locking can't keep "
+                           f"leases exclusive across hosts; use work_queue.backend: dynamodb for workers on "
+                           f"several hosts.")
+    return WorkQueue(db.db_path, logger, worker_id, lease_seconds, max_attempts)
+
+
+def run_market_worker(config: Dict[str, Any], logger: logging.Logger, db: Database, date_str: str,
+                      worker_id: Optional[str] = None, run_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Ingests, cleans and stores market data for the symbols of a run date, sharing the
+    work with other workers through the lease queue (see make_work_queue).
+
+    Every worker enqueues the configured symbol universe (idempotent), then claims
+    batches until no symbol is pending or leased by anyone. While other workers
+    still hold leases it polls, so leases of crashed workers are picked up once
+    they expire.
+
+    Args:
+        config: Configuration dictionary (uses the `work_queue` section).
+        logger: Logger instance.
+        db: Database the worker stores its data in (and, with the sqlite backend,
+            shares the leases through).
+        date_str: Run date (YYYY-MM-DD).
+        worker_id: Unique worker name (default: <hostname>-<pid>).
+        run_id: Run that data quality results and quarantined rows are recorded under
+            (default: the worker id).
+
+    Returns:
+        Summary with the symbols this worker completed/released, leases it lost
+        before completing, records stored and quarantined, and the final queue progress.
+
+    Raises:
+        ValueError: If the queue backend is misconfigured.
+        RuntimeError: If the sqlite backend's database is on a network filesystem.
+    """
+    queue_config = config.get("work_queue", {})
+    symbols = queue_config.get("symbols") or [config.get("alpha_vantage", {}).get("symbol", "SPY")]
+    batch_size = queue_config.get("batch_size", 5)
+    poll_seconds = queue_config.get("poll_seconds", 15)
+
+    queue = make_work_queue(config, logger, db, worker_id or default_worker_id())
+    added = queue.enqueue(date_str, symbols)
+    logger.info("Worker %s joined run %s (%s of %s symbols newly queued)",
+                queue.worker_id, date_str, added, len(symbols))
+
+    summary = {"worker_id": queue.worker_id, "completed": 0, "released": 0, "lost_leases": 0, "records": 0,
+               "quarantined": 0}
+    with LeaseHeartbeat(queue, date_str, queue_config.get("heartbeat_seconds", 60)) as heartbeat:
+        while True:
+            batch = queue.claim(date_str, batch_size)
+            if not batch:
+                progress = queue.progress(date_str)
+                if not progress.get("PENDING") and not progress.get("LEASED"):
+                    break
+                logger.info("No claimable symbols, %s leased by other workers. Waiting %ss.",
+                            progress.get("LEASED", 0), poll_seconds)
+                time.sleep(poll_seconds)
+                continue
+
+            heartbeat.hold(batch)
+            logger.info("Claimed %s symbols: %s", len(batch), ", ".join(batch))
+            for symbol in batch:
+                try:
+                    fetch_market_data(config, logger, date_str, symbol=symbol)
+                    records = clean_market_data(logger, date_str, symbol=symbol)
+                    if not records:
+                        raise RuntimeError("no market records (request failed or quota note)")
+                    report = validate_records(config, logger, "market", records)
+                    db.record_data_quality(run_id or queue.worker_id, date_str, "market",
+                                           report.results, report.quarantined)
+                    summary["quarantined"] += len(report.quarantined)
+                    inserted = db.insert_market_data(report.valid)
+                    if inserted:
+                        db.bump_data_generation("market_data")
+                    summary["records"] += inserted
+                    if queue.complete(date_str, symbol, inserted):
+                        summary["completed"] += 1
+                    else:
+                        # Another worker owns the symbol now and will complete it
+                        summary["lost_leases"] += 1
+                        logger.warning("Lease on %s expired before completion; data was stored anyway", symbol)
+                except Exception as e:
+                    logger.error("Worker %s failed symbol %s: %s", queue.worker_id, symbol, e)
+                    summary["released"] += 1
+                    queue.release(date_str, symbol, str(e))
+                finally:
+                    heartbeat.drop(symbol)
+
+    summary["progress"] = queue.progress(date_str)
+    logger.info("Worker %s finished: %s completed, %s released, %s leases lost, %s records stored, "
+                "%s quarantined. Queue: %s",
+                queue.worker_id, summary["completed"], summary["released"], summary["lost_leases"],
+                summary["records"], summary["quarantined"], summary["progress"])
+    return summary
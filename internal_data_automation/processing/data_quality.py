@@ -0,0 +1,381 @@
+import logging
+import math
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Set, Tuple, FrozenSet
+
+# Rules per source, keyed by rule name. Each value holds the rule's parameters; a source
+# section under `data_quality` in config.yaml replaces these defaults, and a rule set to
+# false there is disabled. Row rules take an optional `action`: "quarantine" (default)
+# removes failing rows before storage, "warn" only counts them.
+DEFAULT_RULES: Dict[str, Dict[str, Any]] = {
+    "market": {
+        "not_null": {"columns": ["symbol", "date", "open", "high", "low", "close", "volume"]},
+        "timestamp": {"columns": ["date"]},
+        "ohlc_consistency": {},
+        "range": {"volume": {"min": 0}},
+        "zero_volume": {},
+        "price_jump": {"max_sigma": 50, "min_history": 20},
+        "calendar_gaps": {},
+    },
+    "news": {
+        "not_null": {"columns": ["title", "url", "published_at"]},
+        "timestamp": {"columns": ["published_at"]},
+        "null_ratio": {"max_ratio": {"description": 0.5, "source": 0.1}},
+    },
+}
+
+# Scales the median absolute deviation to the standard deviation of a normal distribution
+MAD_TO_SIGMA = 1.4826
+
+
+def to_columns(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    Transposes records into one list per field, so rules evaluate whole columns at once.
+    """
+    names: List[str] = []
+    for record in records:
+        for name in record:
+            if name not in names:
+                names.append(name)
+    return {name: [record.get(name) for record in records] for name in names}
+
+
+def _is_null(value: Any) -> bool:
+    return value is None or value == "" or (isinstance(value, float) and math.isnan(value))
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        # NewsAPI uses a trailing Z, which fromisoformat only accepts from Python 3.11
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _rows_by_symbol(columns: Dict[str, List[Any]]) -> Dict[Any, List[int]]:
+    """Row indices per symbol, ordered by date (Alpha Vantage lists newest first)."""
+    dates = columns.get("date", [])
+    groups: Dict[Any, List[int]] = {}
+    for i, symbol in enumerate(columns.get("symbol", [None] * len(dates))):
+        groups.setdefault(symbol, []).append(i)
+    for rows in groups.values():
+        rows.sort(key=lambda i: dates[i] or "")
+    return groups
+
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+# --- Row rules: return the indices of failing rows ---
+
+def check_not_null(columns: Dict[str, List[Any]], params: Dict[str, Any], size: int) -> Set[int]:
+    """Rows with a missing value in any of `columns`."""
+    failed: Set[int] = set()
+    for name in params.get("columns", []):
+        values = columns.get(name, [None] * size)
+        failed.update(i for i, value in enumerate(values) if _is_null(value))
+    return failed
+
+
+def check_timestamp(columns: Dict[str, List[Any]], params: Dict[str, Any], size: int) -> Set[int]:
+    """Rows whose `columns` are present but not ISO dates or timestamps."""
+    failed: Set[int] = set()
+    for name in params.get("columns", []):
+        values = columns.get(name, [None] * size)
+        failed.update(i for i, value in enumerate(values)
+                      if not _is_null(value) and _parse_timestamp(value) is None)
+    return failed
+
+
+def check_ohlc_consistency(columns: Dict[str, List[Any]], params: Dict[str, Any], size: int) -> Set[int]:
+    """Bars whose low/high don't bound open and close, or with non-positive prices."""
+    nulls = [None] * size
+    return {
+        i for i, (o, h, l, c) in enumerate(zip(columns.get("open", nulls), columns.get("high", nulls),
+                                               columns.get("low", nulls), columns.get("close", nulls)))
+        if None not in (o, h, l, c) and not (0 < l <= min(o, c) and h >= max(o, c))
+    }
+
+
+def check_range(columns: Dict[str, List[Any]], params: Dict[str, Any], size: int) -> Set[int]:
+    """Rows outside the inclusive `{column: {min, max}}` bounds."""
+    failed: Set[int] = set()
+    for name, bounds in params.items():
+        if name == "action":
+            continue
+        low, high = bounds.get("min"), bounds.get("max")
+        values = columns.get(name, [None] * size)
+        failed.update(i for i, value in enumerate(values)
+                      if value is not None and ((low is not None and value < low)
+                                                or (high is not None and value > high)))
+    return failed
+
+
+def check_zero_volume(columns: Dict[str, List[Any]], params: Dict[str, Any], size: int) -> Set[int]:
+    """Bars without any traded volume."""
+    return {i for i, volume in enumerate(columns.get("volume", [None] * size)) if volume == 0}
+
+
+def check_price_jump(columns: Dict[str, List[Any]], params: Dict[str, Any], size: int) -> Set[int]:
+    """
+    Bars whose close is more than `max_sigma` standard deviations away from the last good close.
+
+    Sigma is estimated per symbol from the median absolute deviation of the log returns,
+    which a handful of bad bars can't inflate the way they inflate a plain standard
+    deviation. Each bar is compared with the last bar that passed, so after a spike
+    the next good bar is measured against the level before the spike and passes; the
+    spike itself is flagged. A leading bar that disagrees with the two bars after it
+    while they agree with each other is the outlier, not the bars that follow it. A
+    jump that the next bar confirms is a level shift: its first bar is flagged and the
+    new level becomes the reference.
+    """
+    max_sigma = params.get("max_sigma", 50)
+    min_history = params.get("min_history", 20)
+    closes = columns.get("close", [None] * size)
+    failed: Set[int] = set()
+
+    for rows in _rows_by_symbol(columns).values():
+        series = [i for i in rows if isinstance(closes[i], (int, float)) and closes[i] > 0]
+        returns = [math.log(closes[b] / closes[a]) for a, b in zip(series, series[1:])]
+        if len(returns) < min_history:
+            continue
+        center = _median(returns)
+        sigma = MAD_TO_SIGMA * _median([abs(r - center) for r in returns])
+        if sigma == 0:
+            continue
+        limit = max_sigma * sigma
+
+        def jump(a: int, b: int) -> bool:
+            return abs(math.log(closes[b] / closes[a]) - center) > limit
+
+        start = 0
+        while (start + 2 < len(series) and jump(series[start], series[start + 1])
+               and jump(series[start], series[start + 2]) and not jump(series[start + 1], series[start + 2])):
+            failed.add(series[start])
+            start += 1
+
+        reference = series[start]
+        for k in range(start + 1, len(series)):
+            bar = series[k]
+            if not jump(reference, bar):
+                reference = bar
+                continue
+            failed.add(bar)
+            following = series[k + 1] if k + 1 < len(series) else None
+            if following is not None and jump(reference, following) and not jump(bar, following):
+                reference = bar
+    return failed
+
+
+ROW_RULES = {
+    "not_null": check_not_null,
+    "timestamp": check_timestamp,
+    "ohlc_consistency": check_ohlc_consistency,
+    "range": check_range,
+    "zero_volume": check_zero_volume,
+    "price_jump": check_price_jump,
+}
+
+
+# --- Batch rules: return (violations, detail) for the batch as a whole ---
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The n-th (1-based, -1 for last) given weekday of a month."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year + month // 12, month % 12 + 1, 1)) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+
+@lru_cache(maxsize=None)
+def nyse_holidays(year: int) -> FrozenSet[date]:
+    """
+    Full-day NYSE holidays of a year, with the exchange's weekend observance rules.
+
+    Unscheduled closures (national days of mourning, storms) are not included; list
+    them under data_quality.holidays.
+    """
+    def observed(day: date) -> Optional[date]:
+        if day.weekday() == 5:
+            # A Saturday New Year's Day is not made up on Dec 31
+            return None if (day.month, day.day) == (1, 1) else day - timedelta(days=1)
+        if day.weekday() == 6:
+            return day + timedelta(days=1)
+        return day
+
+    fixed = [date(year, 1, 1), date(year, 7, 4), date(year, 12, 25)]
+    if year >= 2022:
+        fixed.append(date(year, 6, 19))
+    holidays = {observed(day) for day in fixed}
+    holidays.update({
+        _nth_weekday(year, 1, 0, 3),             # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),             # Washington's Birthday
+        _easter(year) - timedelta(days=2),       # Good Friday
+        _nth_weekday(year, 5, 0, -1),            # Memorial Day
+        _nth_weekday(year, 9, 0, 1),             # Labor Day
+        _nth_weekday(year, 11, 3, 4),            # Thanksgiving
+    })
+    holidays.discard(None)
+    return frozenset(holidays)
+
+
+def check_calendar_gaps(columns: Dict[str, List[Any]], params: Dict[str, Any],
+                        size: int) -> Tuple[int, str]:
+    """
+    Trading sessions missing between each symbol's first and last bar.
+
+    Sessions are weekdays that are neither NYSE holidays nor listed in `holidays`.
+    """
+    extra = {datetime.strptime(d, "%Y-%m-%d").date() for d in params.get("holidays", [])}
+    dates = columns.get("date", [None] * size)
+    missing: List[str] = []
+    for symbol, rows in _rows_by_symbol(columns).items():
+        present: Set[date] = set()
+        for i in rows:
+            try:
+                present.add(datetime.strptime(dates[i], "%Y-%m-%d").date())
+            except (TypeError, ValueError):
+                continue
+        if not present:
+            continue
+        day, last = min(present), max(present)
+        while day < last:
+            day += timedelta(days=1)
+            if (day.weekday() < 5 and day not in present and day not in extra
+                    and day not in nyse_holidays(day.year)):
+                missing.append(f"{symbol} {day.isoformat()}")
+    detail = ", ".join(missing[:10]) + (f" and {len(missing) - 10} more" if len(missing) > 10 else "")
+    return len(missing), detail
+
+
+def check_null_ratio(columns: Dict[str, List[Any]], params: Dict[str, Any], size: int) -> Tuple[int, str]:
+    """Columns whose share of missing values exceeds their `max_ratio`."""
+    if not size:
+        return 0, ""
+    violations, details = 0, []
+    for name, max_ratio in params.get("max_ratio", {}).items():
+        nulls = sum(1 for value in columns.get(name, [None] * size) if _is_null(value))
+        if nulls / size > max_ratio:
+            violations += nulls
+            details.append(f"{name} {nulls / size:.1%} > {max_ratio:.1%}")
+    return violations, ", ".join(details)
+
+
+BATCH_RULES = {
+    "calendar_gaps": check_calendar_gaps,
+    "null_ratio": check_null_ratio,
+}
+
+
+class DataQualityReport:
+    """
+    Outcome of validating one batch: the rows to store, the quarantined rows with the
+    rules they failed, and per-rule counts.
+    """
+    def __init__(self, source: str):
+        self.source = source
+        self.valid: List[Dict[str, Any]] = []
+        self.quarantined: List[Tuple[Dict[str, Any], List[str]]] = []
+        self.results: List[Dict[str, Any]] = []
+
+    @property
+    def failed_rules(self) -> List[Dict[str, Any]]:
+        return [r for r in self.results if r["failed"]]
+
+
+def resolve_rules(config: Dict[str, Any], source: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the enabled rules of a source with their parameters.
+
+    Raises:
+        ValueError: If the configuration names an unknown rule.
+    """
+    quality_config = config.get("data_quality", {})
+    rules = quality_config.get(source)
+    if rules is None:
+        rules = DEFAULT_RULES.get(source, {})
+    resolved = {}
+    for name, params in rules.items():
+        if params is False:
+            continue
+        if name not in ROW_RULES and name not in BATCH_RULES:
+            raise ValueError(f"Unknown data quality rule '{name}' for {source}")
+        params = dict(params or {})
+        if name == "calendar_gaps":
+            params.setdefault("holidays", quality_config.get("holidays", []))
+        resolved[name] = params
+    return resolved
+
+
+def validate_records(config: Dict[str, Any], logger: logging.Logger, source: str,
+                     records: List[Dict[str, Any]]) -> DataQualityReport:
+    """
+    Runs the data quality rules of a source over a batch of cleaned records.
+
+    Every rule sees the whole batch as columns (see to_columns). Row rules yield the
+    indices of failing rows; rows failing a quarantining rule are held back from
+    storage. Batch rules (calendar gaps, null ratios) can't blame single rows, so
+    they are only counted and logged.
+
+    Args:
+        config: Configuration dictionary (uses the `data_quality` section).
+        logger: Logger instance.
+        source: "market" or "news".
+        records: Cleaned records.
+
+    Returns:
+        DataQualityReport with the valid and quarantined rows and per-rule counts.
+    """
+    report = DataQualityReport(source)
+    if not config.get("data_quality", {}).get("enabled", True):
+        report.valid = list(records)
+        return report
+
+    size = len(records)
+    columns = to_columns(records)
+    quarantine: Dict[int, List[str]] = {}
+
+    for name, params in resolve_rules(config, source).items():
+        if name in ROW_RULES:
+            action = params.get("action", "quarantine")
+            failed = ROW_RULES[name](columns, params, size)
+            if action == "quarantine":
+                for i in failed:
+                    quarantine.setdefault(i, []).append(name)
+            report.results.append({"rule": name, "kind": "row", "action": action,
+                                   "checked": size, "failed": len(failed)})
+            if failed:
+                logger.warning("Data quality %s/%s: %s of %s rows failed (%s)",
+                               source, name, len(failed), size, action)
+        else:
+            violations, detail = BATCH_RULES[name](columns, params, size)
+            report.results.append({"rule": name, "kind": "batch", "action": "warn",
+                                   "checked": size, "failed": violations})
+            if violations:
+                logger.warning("Data quality %s/%s: %s violations: %s", source, name, violations, detail)
+
+    report.valid = [record for i, record in enumerate(records) if i not in quarantine]
+    report.quarantined = [(records[i], rules) for i, rules in sorted(quarantine.items())]
+    logger.info("Data quality %s: %s of %s records passed, %s quarantined",
+                source, len(report.valid), size, len(report.quarantined))
+    return report
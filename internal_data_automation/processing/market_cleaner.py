@@ -1,42 +1,47 @@
 
-import json
 import os
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from internal_data_automation.utils import json_codec
 
-def clean_market_data(logger: logging.Logger, date_str: str) -> List[Dict[str, Any]]:
+def clean_market_data(logger: logging.Logger, date_str: str, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Loads raw market data, cleans, and normalizes it.
 
     Args:
         logger: Logger instance.
         date_str: Date string identifying the source file.
+        symbol: Symbol of a per-symbol file (market_<symbol>_<date>.json), as written
+            by work-queue workers. Defaults to the single-symbol file market_<date>.json.
 
     Returns:
         List of cleaned market data records.
     """
-    input_file = os.path.join("data", "raw", f"market_{date_str}.json")
+    file_key = f"{symbol}_{date_str}" if symbol else date_str
+    input_file = os.path.join("data", "raw", f"market_{file_key}.json")
     cleaned_data: List[Dict[str, Any]] = []
 
     if not os.path.exists(input_file):
-        logger.warning(f"Market data file not found: {input_file}")
+        logger.warning("Market data file not found: %s", input_file)
         return cleaned_data
 
     try:
-        logger.info(f"Cleaning market data from {input_file}...")
-        with open(input_file, 'r') as f:
-            raw_data = json.load(f)
+        logger.info("Cleaning market data from %s...", input_file)
+        raw_data = json_codec.load_file(input_file)
 
         # Alpha Vantage Time Series Daily format
         time_series = raw_data.get("Time Series (Daily)", {})
         
         if not time_series:
-            logger.warning(f"No 'Time Series (Daily)' found in {input_file}")
+            logger.warning("No 'Time Series (Daily)' found in %s", input_file)
             return cleaned_data
 
+        record_symbol = symbol or raw_data.get("Meta Data", {}).get("2. Symbol")
+
         for date, values in time_series.items():
             try:
                 record = {
+                    "symbol": record_symbol,
                     "date": date,
                     "open": float(values.get("1. open", 0)),
                     "high": float(values.get("2. high", 0)),
@@ -46,14 +51,14 @@ def clean_market_data(logger: logging.Logger, date_str: str) -> List[Dict[str, A
                 }
                 cleaned_data.append(record)
             except (ValueError, TypeError) as e:
-                logger.warning(f"Skipping malformed market record for date {date}: {e}")
+                logger.warning("Skipping malformed market record for date %s: %s", date, e)
 
-        logger.info(f"Successfully cleaned {len(cleaned_data)} market records.")
+        logger.info("Successfully cleaned %s market records.", len(cleaned_data))
         return cleaned_data
 
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to decode JSON from {input_file}: {e}")
+    except json_codec.DECODE_ERRORS as e:
+        logger.error("Failed to decode JSON from %s: %s", input_file, e)
         return []
     except Exception as e:
-        logger.error(f"Unexpected error cleaning market data: {e}")
+        logger.error("Unexpected error cleaning market data: %s", e)
         return []
@@ -1,16 +1,27 @@
 
-import json
 import os
 import logging
-from typing import List, Dict, Any
+import sqlite3
+from typing import List, Dict, Any, Callable, Container, Optional, Set
+from internal_data_automation.storage.database import BUSY_TIMEOUT_SECONDS
+from internal_data_automation.utils import json_codec
+from internal_data_automation.utils.minhash import (
+    MinHasher, shingles, similarity, band_keys, pack_signature, unpack_signature
+)
 
-def clean_news_data(logger: logging.Logger, date_str: str) -> List[Dict[str, Any]]:
+def clean_news_data(logger: logging.Logger, date_str: str, seen_urls: Optional[Container[str]] = None,
+                    confirm_seen: Optional[Callable[[List[str]], Set[str]]] = None) -> List[Dict[str, Any]]:
     """
     Loads raw news data, cleans, and normalizes it.
 
     Args:
         logger: Logger instance.
         date_str: Date string identifying the source file.
+        seen_urls: URLs already stored (typically a Bloom filter). Articles found in
+            it are dropped here instead of being rejected by UNIQUE(url) at insert.
+        confirm_seen: Optional exact check for the URLs `seen_urls` reported, returning
+            those that really are stored, so a Bloom filter false positive never
+            drops a new article.
 
     Returns:
         List of cleaned news data records.
@@ -19,18 +30,17 @@ def clean_news_data(logger: logging.Logger, date_str: str) -> List[Dict[str, Any
     cleaned_data: List[Dict[str, Any]] = []
 
     if not os.path.exists(input_file):
-        logger.warning(f"News data file not found: {input_file}")
+        logger.warning("News data file not found: %s", input_file)
         return cleaned_data
 
     try:
-        logger.info(f"Cleaning news data from {input_file}...")
-        with open(input_file, 'r') as f:
-            raw_data = json.load(f)
+        logger.info("Cleaning news data from %s...", input_file)
+        raw_data = json_codec.load_file(input_file)
 
         articles = raw_data.get("articles", [])
         
         if not articles:
-            logger.warning(f"No articles found in {input_file}")
+            logger.warning("No articles found in %s", input_file)
             return cleaned_data
 
         for article in articles:
@@ -53,14 +63,122 @@ def clean_news_data(logger: logging.Logger, date_str: str) -> List[Dict[str, Any
 
                 cleaned_data.append(record)
             except Exception as e:
-                logger.warning(f"Skipping malformed news article: {e}")
+                logger.warning("Skipping malformed news article: %s", e)
 
-        logger.info(f"Successfully cleaned {len(cleaned_data)} news articles.")
+        if seen_urls is not None:
+            candidates = {r["url"] for r in cleaned_data if r["url"] in seen_urls}
+            known = confirm_seen(sorted(candidates)) if candidates and confirm_seen else candidates
+            if known:
+                cleaned_data = [r for r in cleaned_data if r["url"] not in known]
+                logger.info("Dropped %s already stored news articles (%s filter hits, %s false positives).",
+                            len(known), len(candidates), len(candidates) - len(known))
+
+        logger.info("Successfully cleaned %s news articles.", len(cleaned_data))
         return cleaned_data
 
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to decode JSON from {input_file}: {e}")
+    except json_codec.DECODE_ERRORS as e:
+        logger.error("Failed to decode JSON from %s: %s", input_file, e)
         return []
     except Exception as e:
-        logger.error(f"Unexpected error cleaning news data: {e}")
+        logger.error("Unexpected error cleaning news data: %s", e)
         return []
+
+
+def cluster_news_data(config: Dict[str, Any], logger: logging.Logger, db_path: str) -> Dict[str, int]:
+    """
+    Assigns near-duplicate cluster ids to stored news articles that don't have one yet.
+
+    Syndicated copies of a story carry different URLs and sources but nearly the
+    same title and description. Each article gets a MinHash signature of its word
+    shingles; the LSH buckets of its signature bands (news_lsh_buckets) give the
+    candidate articles sharing at least one band, and the article joins the
+    cluster of the most similar candidate whose estimated Jaccard similarity
+    reaches `threshold`, or starts a cluster of its own (cluster_id = its id).
+    Articles without any words in their title and description always get a
+    cluster of their own and no signature.
+    Each article costs `bands` indexed bucket lookups, independent of how many
+    articles are stored.
+
+    Args:
+        config: Configuration dictionary (uses the `news_dedup` section).
+        logger: Logger instance.
+        db_path: Path to the SQLite database.
+
+    Returns:
+        Numbers of articles clustered, of those joining an existing cluster, and
+        of candidate comparisons.
+    """
+    dedup_config = config.get("news_dedup", {})
+    stats = {"clustered": 0, "duplicates": 0, "comparisons": 0}
+    if not dedup_config.get("enabled", True):
+        return stats
+
+    num_perm = dedup_config.get("num_perm", 64)
+    bands = dedup_config.get("bands", 16)
+    if num_perm % bands:
+        raise ValueError(f"news_dedup.num_perm ({num_perm}) must be a multiple of bands ({bands})")
+    threshold = dedup_config.get("threshold", 0.7)
+    shingle_size = dedup_config.get("shingle_size", 2)
+    batch_size = dedup_config.get("batch_size", 1000)
+    max_candidates = dedup_config.get("max_bucket_candidates", 50)
+    hasher = MinHasher(num_perm, seed=dedup_config.get("seed", 1))
+
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS)
+    try:
+        while True:
+            # Batches commit separately, so a long backfill makes progress even if interrupted
+            with conn:
+                pending = conn.execute("""
+                    SELECT id, title, description FROM news_data
+                    WHERE cluster_id IS NULL ORDER BY id LIMIT ?
+                """, (batch_size,)).fetchall()
+                if not pending:
+                    break
+
+                for news_id, title, description in pending:
+                    signature = hasher.signature(shingles(f"{title or ''} {description or ''}", shingle_size))
+                    if signature is None:
+                        # No words to compare: a cluster of its own, kept out of the LSH index
+                        conn.execute("UPDATE news_data SET cluster_id = ? WHERE id = ?", (news_id, news_id))
+                        stats["clustered"] += 1
+                        continue
+                    keys = band_keys(signature, bands)
+
+                    candidates: Set[int] = set()
+                    for band, bucket in keys:
+                        # Newest first; a huge bucket only needs a few members to find the cluster
+                        candidates.update(row[0] for row in conn.execute(
+                            "SELECT news_id FROM news_lsh_buckets WHERE band = ? AND bucket = ? "
+                            "ORDER BY news_id DESC LIMIT ?", (band, bucket, max_candidates)
+                        ))
+
+                    cluster_id, best = news_id, 0.0
+                    if candidates:
+                        placeholders = ", ".join("?" for _ in candidates)
+                        rows = conn.execute(f"""
+                            SELECT s.news_id, s.signature, n.cluster_id FROM news_signatures s
+                            JOIN news_data n ON n.id = s.news_id
+                            WHERE s.news_id IN ({placeholders})
+                        """, tuple(candidates)).fetchall()
+                        stats["comparisons"] += len(rows)
+                        for candidate_id, blob, candidate_cluster in rows:
+                            score = similarity(signature, unpack_signature(blob))
+                            if score >= threshold and score > best and candidate_cluster is not None:
+                                cluster_id, best = candidate_cluster, score
+
+                    conn.execute("INSERT OR REPLACE INTO news_signatures (news_id, signature) VALUES (?, ?)",
+                                 (news_id, pack_signature(signature)))
+                    conn.executemany("INSERT OR IGNORE INTO news_lsh_buckets (band, bucket, news_id) VALUES (?, ?, ?)",
+                                     [(band, bucket, news_id) for band, bucket in keys])
+                    conn.execute("UPDATE news_data SET cluster_id = ? WHERE id = ?", (cluster_id, news_id))
+                    stats["clustered"] += 1
+                    if cluster_id != news_id:
+                        stats["duplicates"] += 1
+            if len(pending) < batch_size:
+                break
+    finally:
+        conn.close()
+
+    logger.info("Clustered %s news articles: %s near-duplicates of earlier stories (%s comparisons).",
+                stats["clustered"], stats["duplicates"], stats["comparisons"])
+    return stats
@@ -18,7 +18,7 @@ def generate_reports(config: Dict[str, Any], logger: logging.Logger, date_str: s
     db_path = config.get("storage", {}).get("database_path", "data/internal_data.db")
     
     if not os.path.exists(db_path):
-        logger.warning(f"Database not found at {db_path}. Skipping report generation.")
+        logger.warning("Database not found at %s. Skipping report generation.", db_path)
         return
 
     # Ensure reports directory exists
@@ -44,6 +44,10 @@ def generate_reports(config: Dict[str, Any], logger: logging.Logger, date_str: s
             
             cursor.execute("SELECT MAX(ingested_at) FROM news_data")
             news_last_ingested = cursor.fetchone()[0] or "Never"
+
+            # Syndicated copies share a cluster_id (unclustered articles count as their own story)
+            cursor.execute("SELECT COUNT(DISTINCT COALESCE(cluster_id, id)) FROM news_data")
+            news_stories = cursor.fetchone()[0]
             
             with open(summary_file, 'w') as f:
                 f.write(f"Internal Data Automation Report - {date_str}\n")
@@ -51,9 +55,10 @@ def generate_reports(config: Dict[str, Any], logger: logging.Logger, date_str: s
                 f.write(f"Market Data Records: {market_count}\n")
                 f.write(f"Last Market Ingestion: {market_last_ingested}\n\n")
                 f.write(f"News Data Records: {news_count}\n")
+                f.write(f"Distinct News Stories: {news_stories}\n")
                 f.write(f"Last News Ingestion: {news_last_ingested}\n")
             
-            logger.info(f"Summary report generated at {summary_file}")
+            logger.info("Summary report generated at %s", summary_file)
 
             # --- Generate Market Data CSV Export ---
             csv_file = os.path.join(reports_dir, f"market_data_{date_str}.csv")
@@ -69,13 +74,41 @@ def generate_reports(config: Dict[str, Any], logger: logging.Logger, date_str: s
                 writer.writerow(column_names)
                 writer.writerows(rows)
                 
-            logger.info(f"Market data CSV exported to {csv_file}")
+            logger.info("Market data CSV exported to %s", csv_file)
+
+            # --- Generate News Stories CSV Export (near-duplicates collapsed) ---
+            news_csv_file = os.path.join(reports_dir, f"news_stories_{date_str}.csv")
+
+            # One row per story: the earliest article of each cluster, plus how often
+            # and by how many sources it was published
+            cursor.execute("""
+                SELECT c.story_id, n.published_at, n.source, n.title, n.url,
+                       c.articles, c.sources, c.last_published_at
+                FROM (
+                    SELECT COALESCE(cluster_id, id) AS story_id, MIN(id) AS first_id, COUNT(*) AS articles,
+                           COUNT(DISTINCT source) AS sources, MAX(published_at) AS last_published_at
+                    FROM news_data GROUP BY story_id
+                ) c
+                JOIN news_data n ON n.id = c.first_id
+                ORDER BY c.last_published_at DESC
+            """)
+            column_names = ["cluster_id", "published_at", "source", "title", "url",
+                            "articles", "sources", "last_published_at"]
+
+            with open(news_csv_file, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(column_names)
+                writer.writerows(cursor)
+
+            logger.info("News stories CSV exported to %s (%s stories)", news_csv_file, news_stories)
 
     except sqlite3.Error as e:
-        logger.error(f"Database error during reporting: {e}")
+        logger.error("Database error during reporting: %s", e)
     except IOError as e:
-        logger.error(f"IO error during reporting: {e}")
+        logger.error("IO error during reporting: %s", e)
     except Exception as e:
-        logger.error(f"Unexpected error during reporting: {e}")
+        logger.error("Unexpected error during reporting: %s", e)
         
-    return [summary_file, csv_file] if 'summary_file' in locals() and 'csv_file' in locals() else []
+    if 'summary_file' in locals() and 'csv_file' in locals() and 'news_csv_file' in locals():
+        return [summary_file, csv_file, news_csv_file]
+    return []
@@ -0,0 +1,326 @@
+import argparse
+import json
+import math
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+RUN_COLUMNS = ("run_id", "run_date", "mode", "status", "started_at", "finished_at",
+               "ROUND(duration_seconds, 3) AS duration_seconds", "error_message")
+
+# strftime patterns grouping started_at into trend buckets
+TREND_BUCKETS = {
+    "day": "%Y-%m-%d",
+    "week": "%Y-W%W",
+    "month": "%Y-%m",
+}
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Indexes the queries below are written for (created by Database migrations)
+RUN_INDEXES = ("idx_pipeline_runs_started_at", "idx_pipeline_runs_status_started_at", "idx_pipeline_runs_duration")
+
+
+def build_filters(args: argparse.Namespace) -> Tuple[str, List[Any]]:
+    """
+    Builds the WHERE clause for the --since/--until/--status/--mode options.
+
+    Every condition is on a column of idx_pipeline_runs_started_at, so filtered
+    queries are answered by an index range scan.
+
+    Returns:
+        (where clause including "WHERE", or "", parameters)
+    """
+    conditions, params = [], []
+    if args.since:
+        conditions.append("started_at >= ?")
+        params.append(args.since)
+    if args.until:
+        # --until is inclusive of the whole day
+        until = datetime.strptime(args.until, "%Y-%m-%d") + timedelta(days=1)
+        conditions.append("started_at < ?")
+        params.append(until.strftime("%Y-%m-%d"))
+    if args.status:
+        conditions.append("status = ?")
+        params.append(args.status.upper())
+    if args.mode:
+        conditions.append("mode = ?")
+        params.append(args.mode)
+    return ("WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+
+def _rows(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def latest_run(conn: sqlite3.Connection, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """The most recent run matching the filters."""
+    where, params = build_filters(args)
+    cursor = conn.execute(
+        f"SELECT {', '.join(RUN_COLUMNS)} FROM pipeline_runs {where} ORDER BY started_at DESC LIMIT 1", params
+    )
+    return _rows(cursor)
+
+
+def list_runs(conn: sqlite3.Connection, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """The most recent runs matching the filters, newest first."""
+    where, params = build_filters(args)
+    cursor = conn.execute(
+        f"SELECT {', '.join(RUN_COLUMNS)} FROM pipeline_runs {where} ORDER BY started_at DESC LIMIT ?",
+        params + [args.limit]
+    )
+    return _rows(cursor)
+
+
+def slowest_runs(conn: sqlite3.Connection, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """The longest finished runs matching the filters."""
+    where, params = build_filters(args)
+    where = f"{where} AND duration_seconds IS NOT NULL" if where else "WHERE duration_seconds IS NOT NULL"
+    cursor = conn.execute(
+        f"SELECT {', '.join(RUN_COLUMNS)} FROM pipeline_runs {where} ORDER BY duration_seconds DESC LIMIT ?",
+        params + [args.limit]
+    )
+    return _rows(cursor)
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_stats(conn: sqlite3.Connection, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Run counts, failure rate and duration percentiles per mode."""
+    where, params = build_filters(args)
+    counts = conn.execute(f"""
+        SELECT mode,
+               COUNT(*),
+               SUM(status = 'SUCCESS'),
+               SUM(status = 'FAILED'),
+               SUM(status = 'STARTED'),
+               MIN(started_at),
+               MAX(started_at)
+        FROM pipeline_runs {where}
+        GROUP BY mode
+    """, params).fetchall()
+
+    stats = []
+    for mode, total, succeeded, failed, started, first, last in counts:
+        mode_where = f"{where} AND mode = ?" if where else "WHERE mode = ?"
+        # Only durations come back, read from the covering index in started_at order
+        durations = sorted(
+            row[0] for row in conn.execute(
+                f"SELECT duration_seconds FROM pipeline_runs {mode_where} AND duration_seconds IS NOT NULL",
+                params + [mode]
+            )
+        )
+        finished = succeeded + failed
+        entry = {
+            "mode": mode,
+            "runs": total,
+            "succeeded": succeeded,
+            "failed": failed,
+            "unfinished": started,
+            "failure_rate": round(failed / finished, 4) if finished else None,
+            "first_started_at": first,
+            "last_started_at": last,
+            "mean_seconds": round(sum(durations) / len(durations), 3) if durations else None,
+        }
+        for pct in PERCENTILES:
+            value = percentile(durations, pct)
+            entry[f"p{pct}_seconds"] = round(value, 3) if value is not None else None
+        entry["max_seconds"] = round(durations[-1], 3) if durations else None
+        stats.append(entry)
+    return stats
+
+
+def failure_trend(conn: sqlite3.Connection, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Runs and failure rate per day, week or month."""
+    where, params = build_filters(args)
+    cursor = conn.execute(f"""
+        SELECT strftime(?, started_at) AS period,
+               COUNT(*) AS runs,
+               SUM(status = 'FAILED') AS failed,
+               ROUND(AVG(duration_seconds), 3) AS mean_seconds
+        FROM pipeline_runs {where}
+        GROUP BY period
+        ORDER BY period
+    """, [TREND_BUCKETS[args.bucket]] + params)
+    trend = _rows(cursor)
+    for row in trend:
+        row["failure_rate"] = round(row["failed"] / row["runs"], 4) if row["runs"] else None
+    return trend
+
+
+def failure_streaks(conn: sqlite3.Connection, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """
+    The streak of consecutive failed runs at the end of the filtered range and the
+    longest one in it.
+
+    Like every other figure, both respect the filters: without --until the
+    "current" streak is the one still going on, with --until it is the one the
+    range ends with. Unfinished (STARTED) runs neither extend nor break a streak.
+    """
+    where, params = build_filters(args)
+
+    def scoped(condition: str) -> str:
+        return f"{where} AND {condition}" if where else f"WHERE {condition}"
+
+    # Current streak: failures after the last success in range (both via idx_pipeline_runs_status_started_at)
+    last_success = conn.execute(
+        "SELECT MAX(started_at) FROM pipeline_runs " + scoped("status = 'SUCCESS'"), params
+    ).fetchone()[0]
+    current = conn.execute(
+        f"""SELECT COUNT(*), MIN(started_at), MAX(started_at) FROM pipeline_runs
+            {scoped("status = 'FAILED' AND started_at > ?")}""",
+        params + [last_success or ""]
+    ).fetchone()
+
+    # Longest streak: one pass over the covering index in time order
+    finished_where = scoped("status IN ('SUCCESS', 'FAILED')")
+    longest = {"failed_runs": 0, "first_started_at": None, "last_started_at": None}
+    run_length, run_start = 0, None
+    for status, started_at in conn.execute(
+        f"SELECT status, started_at FROM pipeline_runs {finished_where} ORDER BY started_at", params
+    ):
+        if status == "FAILED":
+            run_length += 1
+            run_start = run_start or started_at
+            if run_length > longest["failed_runs"]:
+                longest = {"failed_runs": run_length, "first_started_at": run_start, "last_started_at": started_at}
+        else:
+            run_length, run_start = 0, None
+
+    return [
+        {"streak": "current", "failed_runs": current[0], "first_started_at": current[1],
+         "last_started_at": current[2], "last_success_at": last_success},
+        dict(longest, streak="longest"),
+    ]
+
+
+COMMANDS = {
+    "latest": (latest_run, "Show the most recent run"),
+    "list": (list_runs, "List recent runs"),
+    "stats": (run_stats, "Run counts, failure rate and duration percentiles per mode"),
+    "trend": (failure_trend, "Failure rate per day, week or month"),
+    "slowest": (slowest_runs, "Longest runs"),
+    "streak": (failure_streaks, "Streak of consecutive failures at the end of the range (current) and the "
+                                "longest one; both respect --since/--until/--mode"),
+}
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    """Renders rows as an aligned text table."""
+    if not rows:
+        return "No pipeline runs found."
+    columns = list(rows[0].keys())
+    cells = [["" if row.get(c) is None else str(row.get(c)) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(columns, widths)),
+             "  ".join("-" * w for w in widths)]
+    lines += ["  ".join(v.ljust(w) for v, w in zip(r, widths)) for r in cells]
+    return "\n".join(lines)
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query the pipeline run history (pipeline_runs).")
+    parser.add_argument("command", nargs="?", default="latest", choices=sorted(COMMANDS),
+                        help="; ".join(f"{name}: {help_text}" for name, (_, help_text) in COMMANDS.items()))
+    parser.add_argument("--db", help="Database path (default: storage.database_path from --config)")
+    parser.add_argument("--config", default="config.yaml", help="Configuration file (default: config.yaml)")
+    parser.add_argument("--since", help="Only runs started on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Only runs started on or before this date (YYYY-MM-DD)")
+    parser.add_argument("--status", choices=["SUCCESS", "FAILED", "STARTED"], type=str.upper)
+    parser.add_argument("--mode", choices=["development", "production"])
+    parser.add_argument("--limit", type=int, default=20, help="Rows for list/slowest (default: 20)")
+    parser.add_argument("--bucket", choices=sorted(TREND_BUCKETS), default="day", help="Period for trend")
+    parser.add_argument("--format", choices=["table", "json"], default="table")
+    return parser.parse_args(argv)
+
+
+def resolve_db_path(args: argparse.Namespace) -> str:
+    if args.db:
+        return args.db
+    if os.path.exists(args.config):
+        from internal_data_automation.utils.config_loader import load_config
+        return load_config(args.config).get("storage", {}).get("database_path", "data/internal_data.db")
+    return "data/internal_data.db"
+
+
+def _is_date(value: str) -> bool:
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
+
+def check_schema(conn: sqlite3.Connection) -> Tuple[Optional[str], List[str]]:
+    """
+    Checks that pipeline_runs has what the queries need, without changing anything.
+
+    Returns:
+        (error message if the queries cannot run, names of missing indexes)
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(pipeline_runs)")}
+    if not columns:
+        return "The database has no pipeline_runs table.", []
+    if "duration_seconds" not in columns:
+        return ("The database schema is out of date (pipeline_runs.duration_seconds is missing). "
+                "Run the pipeline once to migrate it, then retry."), []
+    indexes = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'pipeline_runs'"
+    )}
+    return None, [name for name in RUN_INDEXES if name not in indexes]
+
+
+def main(argv=None) -> int:
+    args = parse_arguments(argv)
+    for option in ("since", "until"):
+        value = getattr(args, option)
+        if value and not _is_date(value):
+            print(f"Invalid --{option} date: {value}. Expected YYYY-MM-DD.")
+            return 1
+
+    db_path = resolve_db_path(args)
+    if not os.path.exists(db_path):
+        print(f"Database not found at {db_path}.")
+        return 1
+
+    # Read-only: migrations are left to the pipeline, which owns the schema
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            error, missing_indexes = check_schema(conn)
+            if error:
+                print(error)
+                return 1
+            if missing_indexes:
+                print(f"Warning: missing indexes {', '.join(missing_indexes)}; queries scan the whole table "
+                      f"until the pipeline next runs.", file=sys.stderr)
+            query, _ = COMMANDS[args.command]
+            rows = query(conn, args)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Error reading database: {e}")
+        return 1
+
+    if args.format == "json":
+        print(json.dumps(rows, indent=2))
+    elif args.command == "latest" and rows:
+        # One run reads better as a record than as a one-row table
+        width = max(len(k) for k in rows[0])
+        print("\n".join(f"{k.ljust(width)}  {'' if v is None else v}" for k, v in rows[0].items()))
+    else:
+        print(format_table(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,159 @@
 
 import sqlite3
+import hashlib
+import json
 import os
 import logging
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
 from datetime import datetime
 
+# Seconds a connection waits for another process's write lock (workers share one database)
+BUSY_TIMEOUT_SECONDS = 30
+
+MARKET_DATA_TABLE = """
+CREATE TABLE IF NOT EXISTS market_data (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    volume INTEGER,
+    ingested_at TEXT,
+    row_hash TEXT,
+    UNIQUE(symbol, date)
+)
+"""
+
+MARKET_WRITE_MODES = ("insert", "upsert")
+
+# storage.journal_mode: "auto" uses WAL unless the database is on a network filesystem
+JOURNAL_MODES = ("auto", "wal", "delete")
+
+# Filesystems on which SQLite's locking is unreliable and WAL's shared memory doesn't work
+NETWORK_FILESYSTEMS = {
+    "nfs", "nfs4", "cifs", "smb", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs", "lustre",
+    "fuse.sshfs", "fuse.s3fs", "fuse.glusterfs", "fuse.ceph", "fuse.gcsfuse",
+}
+
+def filesystem_type(path: str, mounts_file: str = "/proc/mounts") -> Optional[str]:
+    """
+    Type of the filesystem holding `path` (the longest matching mount in /proc/mounts),
+    or None where /proc/mounts isn't available.
+    """
+    try:
+        with open(mounts_file) as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return None
+    target = os.path.realpath(os.path.dirname(os.path.abspath(path)) or ".")
+    best, fs_type = "", None
+    for mount_point, mount_type in mounts:
+        # /proc/mounts escapes spaces in mount points as \040
+        mount_point = mount_point.replace("\\040", " ")
+        inside = target == mount_point or target.startswith(mount_point.rstrip("/") + "/")
+        if inside and len(mount_point) > len(best):
+            best, fs_type = mount_point, mount_type
+    return fs_type
+
+def is_network_filesystem(path: str) -> bool:
+    return filesystem_type(path) in NETWORK_FILESYSTEMS
+
+# Rows deleted with old pipeline runs (prune_pipeline_runs), children first. Rows keyed
+# by run date go by date, which also catches those recorded under a work-queue worker id.
+RUN_RETENTION_TABLES = (
+    ("stage_metrics", "run_id IN (SELECT run_id FROM pipeline_runs WHERE started_at < :cutoff)"),
+    ("data_quality_results",
+     "run_id IN (SELECT run_id FROM pipeline_runs WHERE started_at < :cutoff) OR run_date < :cutoff_date"),
+    ("quarantined_records",
+     "run_id IN (SELECT run_id FROM pipeline_runs WHERE started_at < :cutoff) OR run_date < :cutoff_date"),
+    ("stage_checkpoints", "run_date < :cutoff_date"),
+    ("ingestion_leases", "run_date < :cutoff_date"),
+    ("pipeline_runs", "started_at < :cutoff"),
+)
+
+def market_row_hash(open_: Any, high: Any, low: Any, close: Any, volume: Any) -> str:
+    """
+    Content hash of a market bar's values, used to detect provider revisions.
+
+    Values are normalised first so a bar read back from SQLite hashes the same as
+    the freshly cleaned one.
+    """
+    values = tuple(None if v is None else float(v) for v in (open_, high, low, close))
+    values += (None if volume is None else int(volume),)
+    return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=16).hexdigest()
+
+class _SharedConnection:
+    """
+    Context manager handing out one long-lived connection to one thread at a time.
+
+    Mirrors sqlite3.Connection's own context manager: commits on success and
+    rolls back on error, but never closes the connection.
+    """
+    def __init__(self, conn: sqlite3.Connection, lock: threading.RLock):
+        self._conn = conn
+        self._lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._lock.acquire()
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        finally:
+            self._lock.release()
+        return False
+
 class Database:
-    def __init__(self, db_path: str, logger: logging.Logger):
+    def __init__(self, db_path: str, logger: logging.Logger, keep_connection: bool = False,
+                 market_symbol: str = "SPY", market_write_mode: str = "insert",
+                 journal_mode: Optional[str] = None):
         """
         Initialize database connection and ensure tables exist.
         
         Args:
             db_path: Path to the SQLite database file.
             logger: Logger instance.
+            keep_connection: Reuse one connection for all operations instead of
+                opening a new one per call (for long-running processes).
+            market_symbol: Symbol of market records that don't carry one, and of the
+                rows stored before market_data had a symbol column.
+            market_write_mode: "insert" keeps stored bars as they are, "upsert" rewrites
+                bars whose values the provider revised (see insert_market_data).
+            journal_mode: "wal" lets readers run alongside writes, but only works when all
+                processes are on one host; "delete" is SQLite's default rollback journal;
+                "auto" picks WAL unless the database is on a network filesystem. None leaves
+                the file's current mode alone.
+
+        Raises:
+            ValueError: On an unknown mode, or "wal" for a database on a network filesystem.
         """
+        if market_write_mode not in MARKET_WRITE_MODES:
+            raise ValueError(f"Invalid market_write_mode: {market_write_mode}. Expected one of {MARKET_WRITE_MODES}.")
+        if journal_mode is not None and journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"Invalid journal_mode: {journal_mode}. Expected one of {JOURNAL_MODES}.")
+        network = journal_mode in ("auto", "wal") and is_network_filesystem(db_path)
+        if journal_mode == "wal" and network:
+            raise ValueError(f"journal_mode 'wal' is unsafe for {db_path}: it is on a network filesystem")
+        if journal_mode == "auto":
+            journal_mode = "delete" if network else "wal"
         self.db_path = db_path
         self.logger = logger
+        self.market_symbol = market_symbol
+        self.market_write_mode = market_write_mode
+        self.journal_mode = journal_mode
+        self._shared_conn: Optional[sqlite3.Connection] = None
+        self._shared_lock = threading.RLock()
         self._ensure_db_dir()
+        if keep_connection:
+            self._shared_conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS,
+                                                check_same_thread=False)
         self._create_tables()
 
     def _ensure_db_dir(self):
@@ -25,26 +162,23 @@ class Database:
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """Create and return a database connection."""
-        return sqlite3.connect(self.db_path)
+    def _get_connection(self):
+        """Create and return a database connection (or the shared one when kept open)."""
+        if self._shared_conn is not None:
+            return _SharedConnection(self._shared_conn, self._shared_lock)
+        return sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS)
+
+    def close(self):
+        """Close the shared connection, if any."""
+        if self._shared_conn is not None:
+            with self._shared_lock:
+                self._shared_conn.close()
+                self._shared_conn = None
 
     def _create_tables(self):
         """Create necessary tables if they do not exist."""
         queries = [
-            """
-            CREATE TABLE IF NOT EXISTS market_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                open REAL,
-                high REAL,
-                low REAL,
-                close REAL,
-                volume INTEGER,
-                ingested_at TEXT,
-                UNIQUE(date)
-            )
-            """,
+            MARKET_DATA_TABLE,
             """
             CREATE TABLE IF NOT EXISTS news_data (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -54,6 +188,7 @@ class Database:
                 description TEXT,
                 url TEXT,
                 ingested_at TEXT,
+                cluster_id INTEGER,
                 UNIQUE(url)
             )
             """,
@@ -65,7 +200,144 @@ class Database:
                 status TEXT,
                 started_at TEXT,
                 finished_at TEXT,
-                error_message TEXT
+                error_message TEXT,
+                duration_seconds REAL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS stage_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL REFERENCES pipeline_runs(run_id),
+                stage TEXT NOT NULL,
+                status TEXT,
+                started_at TEXT,
+                wall_seconds REAL,
+                cpu_seconds REAL,
+                records_in INTEGER,
+                records_out INTEGER,
+                bytes_read INTEGER,
+                bytes_written INTEGER,
+                http_requests INTEGER,
+                http_latency_histogram TEXT
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_stage_metrics_run_id ON stage_metrics(run_id)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS stage_checkpoints (
+                run_date TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                run_id TEXT,
+                status TEXT,
+                fingerprint TEXT,
+                artifact TEXT,
+                files TEXT,
+                completed_at TEXT,
+                PRIMARY KEY (run_date, stage)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS ingestion_leases (
+                run_date TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'PENDING',
+                worker_id TEXT,
+                lease_expires_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                records INTEGER,
+                last_error TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (run_date, symbol)
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_ingestion_leases_claim
+            ON ingestion_leases(run_date, status, lease_expires_at)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_news_data_published_at ON news_data(published_at)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_news_data_source_published_at ON news_data(source, published_at)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS data_generations (
+                name TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS market_data_revisions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                date TEXT NOT NULL,
+                old_open REAL,
+                old_high REAL,
+                old_low REAL,
+                old_close REAL,
+                old_volume INTEGER,
+                new_open REAL,
+                new_high REAL,
+                new_low REAL,
+                new_close REAL,
+                new_volume INTEGER,
+                old_hash TEXT,
+                new_hash TEXT,
+                revised_at TEXT
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_market_data_revisions_symbol_date
+            ON market_data_revisions(symbol, date)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS news_signatures (
+                news_id INTEGER PRIMARY KEY,
+                signature BLOB NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS news_lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                news_id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, news_id)
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS data_quality_results (
+                run_id TEXT NOT NULL,
+                run_date TEXT,
+                source TEXT NOT NULL,
+                rule TEXT NOT NULL,
+                kind TEXT,
+                action TEXT,
+                checked INTEGER,
+                failed INTEGER,
+                recorded_at TEXT,
+                PRIMARY KEY (run_id, source, rule)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS quarantined_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT,
+                run_date TEXT NOT NULL,
+                source TEXT NOT NULL,
+                record_key TEXT,
+                rules TEXT NOT NULL,
+                record TEXT NOT NULL,
+                quarantined_at TEXT,
+                UNIQUE(run_date, source, record_key)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS maintenance_state (
+                task TEXT PRIMARY KEY,
+                last_run_at TEXT,
+                details TEXT
             )
             """
         ]
@@ -73,62 +345,214 @@ class Database:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
+                if self.journal_mode:
+                    self._set_journal_mode(cursor)
+                # Only takes effect in a new, empty database; older ones are converted by
+                # vacuum() the first time retention runs
+                cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
                 for query in queries:
                     cursor.execute(query)
+                self._migrate(cursor)
                 conn.commit()
-            self.logger.info(f"Database tables initialized at {self.db_path}")
+            self.logger.info("Database tables initialized at %s", self.db_path)
+        except sqlite3.Error as e:
+            self.logger.error("Failed to create tables: %s", e)
+
+    def _set_journal_mode(self, cursor: sqlite3.Cursor):
+        """
+        Switch the file to the configured journal mode. WAL lets readers (query service,
+        reports) run alongside pipeline writes. The mode is stored in the database file,
+        so this only does work once; leaving WAL needs every other connection closed.
+        """
+        try:
+            mode = cursor.execute(f"PRAGMA journal_mode={self.journal_mode.upper()}").fetchone()[0]
         except sqlite3.Error as e:
-            self.logger.error(f"Failed to create tables: {e}")
+            mode = str(e)
+        if mode.lower() != self.journal_mode:
+            self.logger.warning("Could not switch %s to journal_mode %s (%s); close other processes using it "
+                                "and run again", self.db_path, self.journal_mode, mode)
+
+    def _add_column(self, cursor: sqlite3.Cursor, table: str, column: str, definition: str) -> bool:
+        """
+        Add a column to an existing table unless it is already there.
+
+        Returns:
+            True if the column was added (the table predates it).
+        """
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column in (row[1] for row in cursor.fetchall()):
+            return False
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        self.logger.info("Migrated %s: added column %s", table, column)
+        return True
 
-    def insert_market_data(self, records: List[Dict[str, Any]]):
+    def _migrate(self, cursor: sqlite3.Cursor):
+        """Bring tables created by older versions up to the current schema."""
+        backfill_hashes = False
+        cursor.execute("PRAGMA table_info(market_data)")
+        if "symbol" not in (row[1] for row in cursor.fetchall()):
+            # UNIQUE(date) becomes UNIQUE(symbol, date), which needs a table rebuild
+            cursor.execute("SAVEPOINT migrate_market_data")
+            cursor.execute("ALTER TABLE market_data RENAME TO market_data_legacy")
+            cursor.execute(MARKET_DATA_TABLE)
+            cursor.execute("""
+            INSERT INTO market_data (id, symbol, date, open, high, low, close, volume, ingested_at)
+            SELECT id, ?, date, open, high, low, close, volume, ingested_at FROM market_data_legacy
+            """, (self.market_symbol,))
+            cursor.execute("DROP TABLE market_data_legacy")
+            cursor.execute("RELEASE migrate_market_data")
+            self.logger.info("Migrated market_data: added column symbol (existing rows: %s)", self.market_symbol)
+            backfill_hashes = True
+
+        if self._add_column(cursor, "market_data", "row_hash", "TEXT") or backfill_hashes:
+            # One-off pass over the history; from here on hashes are written with the rows
+            cursor.connection.create_function("market_row_hash", 5, market_row_hash, deterministic=True)
+            cursor.execute("""
+            UPDATE market_data SET row_hash = market_row_hash(open, high, low, close, volume)
+            WHERE row_hash IS NULL
+            """)
+            self.logger.info("Migrated market_data: hashed %s existing rows", cursor.rowcount)
+
+        if self._add_column(cursor, "pipeline_runs", "duration_seconds", "REAL"):
+            cursor.execute("""
+            UPDATE pipeline_runs
+            SET duration_seconds = (julianday(finished_at) - julianday(started_at)) * 86400
+            WHERE finished_at IS NOT NULL
+            """)
+
+        # Near-duplicate cluster of an article (processing/news_cleaner.py cluster_news_data);
+        # NULL until the article has been clustered
+        self._add_column(cursor, "news_data", "cluster_id", "INTEGER")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_data_cluster_id ON news_data(cluster_id)")
+
+        # Run history queries (reporting/run_history.py) filter on time range, status and
+        # mode; the first index covers them so range scans never touch the table itself.
+        for query in (
+            "CREATE INDEX IF NOT EXISTS idx_pipeline_runs_started_at "
+            "ON pipeline_runs(started_at, status, mode, duration_seconds)",
+            "CREATE INDEX IF NOT EXISTS idx_pipeline_runs_status_started_at ON pipeline_runs(status, started_at)",
+            "CREATE INDEX IF NOT EXISTS idx_pipeline_runs_duration ON pipeline_runs(duration_seconds)",
+        ):
+            cursor.execute(query)
+
+    def insert_market_data(self, records: List[Dict[str, Any]]) -> int:
         """
         Insert processed market data records into the database.
+
+        In "insert" mode bars already stored for a symbol and date are left alone. In
+        "upsert" mode the incoming bars are loaded into a temporary table and their
+        content hashes compared with the stored ones in one join; only bars whose
+        values changed are rewritten, and each revision is logged with its old and
+        new values to market_data_revisions. The work grows with the size of the
+        batch and the number of revisions, not with the stored history.
         
         Args:
             records: List of market data dictionaries.
+
+        Returns:
+            Number of rows inserted, plus rows revised in upsert mode.
         """
         if not records:
             self.logger.info("No market records to insert.")
-            return
+            return 0
 
-        query = """
-        INSERT OR IGNORE INTO market_data (date, open, high, low, close, volume, ingested_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-        
         ingested_at = datetime.now().isoformat()
-        data_tuples = [
-            (
-                r.get('date'),
-                r.get('open'),
-                r.get('high'),
-                r.get('low'),
-                r.get('close'),
-                r.get('volume'),
-                ingested_at
-            )
-            for r in records
-        ]
+        rows = {}
+        for r in records:
+            symbol = r.get('symbol') or self.market_symbol
+            values = (r.get('open'), r.get('high'), r.get('low'), r.get('close'), r.get('volume'))
+            # A bar listed twice in one batch: the last one wins
+            rows[(symbol, r.get('date'))] = (symbol, r.get('date')) + values + (market_row_hash(*values),)
 
         try:
             with self._get_connection() as conn:
+                if self.market_write_mode == "upsert":
+                    inserted, revised = self._upsert_market_rows(conn, list(rows.values()), ingested_at)
+                    conn.commit()
+                    self.logger.info("Inserted %s market records, revised %s.", inserted, revised)
+                    return inserted + revised
+
                 cursor = conn.cursor()
-                cursor.executemany(query, data_tuples)
+                cursor.executemany("""
+                INSERT OR IGNORE INTO market_data
+                    (symbol, date, open, high, low, close, volume, row_hash, ingested_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [row + (ingested_at,) for row in rows.values()])
                 conn.commit()
-                self.logger.info(f"Inserted {cursor.rowcount} market records.")
+                self.logger.info("Inserted %s market records.", cursor.rowcount)
+                return cursor.rowcount
         except sqlite3.Error as e:
-            self.logger.error(f"Failed to insert market data: {e}")
+            self.logger.error("Failed to insert market data: %s", e)
+            return 0
+
+    def _upsert_market_rows(self, conn: sqlite3.Connection, rows: List[Tuple], ingested_at: str) -> Tuple[int, int]:
+        """
+        Apply a batch of (symbol, date, open, high, low, close, volume, row_hash) rows.
+
+        Returns:
+            (rows inserted, rows revised)
+        """
+        # Take the write lock before comparing, so no other worker can change the
+        # compared bars before they are rewritten
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS incoming_market_data (
+            symbol TEXT, date TEXT, open REAL, high REAL, low REAL, close REAL, volume INTEGER, row_hash TEXT
+        )
+        """)
+        conn.execute("DELETE FROM incoming_market_data")
+        conn.executemany("INSERT INTO incoming_market_data VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
 
-    def insert_news_data(self, records: List[Dict[str, Any]]):
+        # Stored bars whose hash differs; each incoming row is one lookup on UNIQUE(symbol, date)
+        changed = conn.execute("""
+        SELECT m.id, i.symbol, i.date,
+               m.open, m.high, m.low, m.close, m.volume,
+               i.open, i.high, i.low, i.close, i.volume,
+               m.row_hash, i.row_hash
+        FROM incoming_market_data i
+        JOIN market_data m ON m.symbol = i.symbol AND m.date = i.date
+        WHERE m.row_hash IS NOT i.row_hash
+        """).fetchall()
+
+        revised_at = datetime.now().isoformat()
+        conn.executemany("""
+        INSERT INTO market_data_revisions (
+            symbol, date, old_open, old_high, old_low, old_close, old_volume,
+            new_open, new_high, new_low, new_close, new_volume, old_hash, new_hash, revised_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [row[1:] + (revised_at,) for row in changed])
+        conn.executemany("""
+        UPDATE market_data SET open = ?, high = ?, low = ?, close = ?, volume = ?, row_hash = ?
+        WHERE id = ?
+        """, [row[8:13] + (row[14], row[0]) for row in changed])
+
+        inserted = conn.execute("""
+        INSERT OR IGNORE INTO market_data (symbol, date, open, high, low, close, volume, row_hash, ingested_at)
+        SELECT symbol, date, open, high, low, close, volume, row_hash, ? FROM incoming_market_data
+        """, (ingested_at,)).rowcount
+        conn.execute("DELETE FROM incoming_market_data")
+
+        for row in changed[:20]:
+            self.logger.info("Revised %s %s: OHLCV %s -> %s", row[1], row[2], row[3:8], row[8:13])
+        if len(changed) > 20:
+            self.logger.info("... and %s more revisions (see market_data_revisions)", len(changed) - 20)
+        return inserted, len(changed)
+
+    def insert_news_data(self, records: List[Dict[str, Any]]) -> int:
         """
         Insert processed news data records into the database.
         
         Args:
             records: List of news data dictionaries.
+
+        Returns:
+            Number of rows actually inserted.
         """
         if not records:
             self.logger.info("No news records to insert.")
-            return
+            return 0
 
         query = """
         INSERT OR IGNORE INTO news_data (published_at, source, title, description, url, ingested_at)
@@ -153,9 +577,121 @@ class Database:
                 cursor = conn.cursor()
                 cursor.executemany(query, data_tuples)
                 conn.commit()
-                self.logger.info(f"Inserted {cursor.rowcount} news records.")
+                self.logger.info("Inserted %s news records.", cursor.rowcount)
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            self.logger.error("Failed to insert news data: %s", e)
+            return 0
+
+    def news_urls(self, limit: int) -> List[str]:
+        """
+        Return the URLs of the most recently stored news articles, oldest first.
+
+        Args:
+            limit: Maximum number of URLs.
+        """
+        query = "SELECT url FROM (SELECT id, url FROM news_data ORDER BY id DESC LIMIT ?) ORDER BY id"
+        try:
+            with self._get_connection() as conn:
+                return [row[0] for row in conn.execute(query, (limit,)) if row[0]]
+        except sqlite3.Error as e:
+            self.logger.error("Failed to read news URLs: %s", e)
+            return []
+
+    def existing_news_urls(self, urls: List[str]) -> Set[str]:
+        """
+        Return which of `urls` are already stored (one indexed lookup per URL via UNIQUE(url)).
+
+        Args:
+            urls: Candidate article URLs.
+        """
+        found: Set[str] = set()
+        try:
+            with self._get_connection() as conn:
+                # Stay below SQLite's bound parameter limit
+                for i in range(0, len(urls), 500):
+                    chunk = urls[i:i + 500]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    found.update(row[0] for row in conn.execute(
+                        f"SELECT url FROM news_data WHERE url IN ({placeholders})", chunk
+                    ))
+        except sqlite3.Error as e:
+            self.logger.error("Failed to look up news URLs: %s", e)
+            # Unconfirmed URLs are kept; UNIQUE(url) still rejects real duplicates
+        return found
+
+    def bump_data_generation(self, name: str):
+        """
+        Increment the generation counter of a data table after new data was stored.
+
+        Readers caching query results (storage/query_service.py) compare generations
+        to know when their cached results of that table are stale.
+
+        Args:
+            name: Table name (market_data, news_data).
+        """
+        query = """
+        INSERT INTO data_generations (name, generation, updated_at) VALUES (?, 1, ?)
+        ON CONFLICT(name) DO UPDATE SET generation = generation + 1, updated_at = excluded.updated_at
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute(query, (name, datetime.now().isoformat()))
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error("Failed to bump data generation of %s: %s", name, e)
+
+    def record_data_quality(self, run_id: str, run_date: str, source: str, results: List[Dict[str, Any]],
+                            quarantined: List[Tuple[Dict[str, Any], List[str]]]):
+        """
+        Persist the outcome of a data quality check.
+
+        Per-rule counts add up per run, so a worker validating one symbol at a time
+        ends up with the totals of its run. A record quarantined again for the same
+        run date replaces its earlier quarantine entry.
+
+        Args:
+            run_id: Pipeline run that validated the records.
+            run_date: Date the pipeline ran for (YYYY-MM-DD).
+            source: "market" or "news".
+            results: Per-rule counts (DataQualityReport.results).
+            quarantined: (record, failed rule names) pairs held back from storage.
+        """
+        now = datetime.now().isoformat()
+        results_query = """
+        INSERT INTO data_quality_results
+            (run_id, run_date, source, rule, kind, action, checked, failed, recorded_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(run_id, source, rule) DO UPDATE SET
+            checked = checked + excluded.checked,
+            failed = failed + excluded.failed,
+            recorded_at = excluded.recorded_at
+        """
+        quarantine_query = """
+        INSERT OR REPLACE INTO quarantined_records
+            (run_id, run_date, source, record_key, rules, record, quarantined_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+
+        def record_key(record: Dict[str, Any]) -> Optional[str]:
+            if source == "market":
+                return f"{record.get('symbol') or self.market_symbol}:{record.get('date')}"
+            return record.get("url")
+
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(results_query, [
+                    (run_id, run_date, source, r['rule'], r['kind'], r['action'], r['checked'], r['failed'], now)
+                    for r in results
+                ])
+                conn.executemany(quarantine_query, [
+                    (run_id, run_date, source, record_key(record), ",".join(rules),
+                     json.dumps(record, default=str), now)
+                    for record, rules in quarantined
+                ])
+                conn.commit()
         except sqlite3.Error as e:
-            self.logger.error(f"Failed to insert news data: {e}")
+            self.logger.error("Failed to record data quality results for %s: %s", source, e)
 
     def start_pipeline_run(self, run_id: str, run_date: str, mode: str, started_at: str):
         """记录 pipeline 开始"""
@@ -168,32 +704,304 @@ class Database:
                 conn.execute(query, (run_id, run_date, mode, "STARTED", started_at))
                 conn.commit()
         except sqlite3.Error as e:
-            self.logger.error(f"Failed to record pipeline start: {e}")
+            self.logger.error("Failed to record pipeline start: %s", e)
 
     def mark_pipeline_success(self, run_id: str, finished_at: str):
         """标记 pipeline 成功"""
         query = """
         UPDATE pipeline_runs 
-        SET status = ?, finished_at = ?
+        SET status = ?, finished_at = ?,
+            duration_seconds = (julianday(?) - julianday(started_at)) * 86400
         WHERE run_id = ?
         """
         try:
             with self._get_connection() as conn:
-                conn.execute(query, ("SUCCESS", finished_at, run_id))
+                conn.execute(query, ("SUCCESS", finished_at, finished_at, run_id))
                 conn.commit()
         except sqlite3.Error as e:
-            self.logger.error(f"Failed to record pipeline success: {e}")
+            self.logger.error("Failed to record pipeline success: %s", e)
 
     def mark_pipeline_failure(self, run_id: str, finished_at: str, error_message: str):
         """标记 pipeline 失败"""
         query = """
         UPDATE pipeline_runs 
-        SET status = ?, finished_at = ?, error_message = ?
+        SET status = ?, finished_at = ?, error_message = ?,
+            duration_seconds = (julianday(?) - julianday(started_at)) * 86400
         WHERE run_id = ?
         """
         try:
             with self._get_connection() as conn:
-                conn.execute(query, ("FAILED", finished_at, error_message, run_id))
+                conn.execute(query, ("FAILED", finished_at, error_message, finished_at, run_id))
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error("Failed to record pipeline failure: %s", e)
+
+    def insert_stage_metrics(self, run_id: str, stages: List[Dict[str, Any]]):
+        """
+        Persist per-stage metrics of a pipeline run.
+
+        Args:
+            run_id: Pipeline run the metrics belong to.
+            stages: Stage metric dictionaries as produced by MetricsCollector.to_list().
+        """
+        if not stages:
+            return
+
+        query = """
+        INSERT INTO stage_metrics (
+            run_id, stage, status, started_at, wall_seconds, cpu_seconds,
+            records_in, records_out, bytes_read, bytes_written,
+            http_requests, http_latency_histogram
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        data_tuples = [
+            (
+                run_id,
+                s['stage'],
+                s['status'],
+                s['started_at'],
+                s['wall_seconds'],
+                s['cpu_seconds'],
+                s['records_in'],
+                s['records_out'],
+                s['bytes_read'],
+                s['bytes_written'],
+                s['http_requests'],
+                json.dumps(s['http_latency'])
+            )
+            for s in stages
+        ]
+
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(query, data_tuples)
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error("Failed to record stage metrics: %s", e)
+
+    def record_stage_checkpoint(self, run_date: str, stage: str, run_id: str, fingerprint: str,
+                                artifact: Any, files: List[str]):
+        """
+        Record that a stage completed for a run date, with a fingerprint of its output.
+
+        Args:
+            run_date: Date the pipeline ran for (YYYY-MM-DD).
+            stage: Stage name.
+            run_id: Pipeline run that produced the output.
+            fingerprint: Fingerprint of the stage output.
+            artifact: JSON-serialisable stage result to hand to dependents on resume.
+            files: Files produced by the stage.
+        """
+        query = """
+        INSERT OR REPLACE INTO stage_checkpoints
+            (run_date, stage, run_id, status, fingerprint, artifact, files, completed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute(query, (
+                    run_date, stage, run_id, "COMPLETED", fingerprint,
+                    json.dumps(artifact, default=str), json.dumps(files), datetime.now().isoformat()
+                ))
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error("Failed to record checkpoint for stage %s: %s", stage, e)
+
+    def get_stage_checkpoints(self, run_date: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch the recorded stage checkpoints for a run date.
+
+        Args:
+            run_date: Date the pipeline ran for (YYYY-MM-DD).
+
+        Returns:
+            Mapping of stage name to checkpoint details.
+        """
+        query = """
+        SELECT stage, run_id, status, fingerprint, artifact, files, completed_at
+        FROM stage_checkpoints
+        WHERE run_date = ?
+        """
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute(query, (run_date,)).fetchall()
+        except sqlite3.Error as e:
+            self.logger.error("Failed to read stage checkpoints: %s", e)
+            return {}
+
+        return {
+            stage: {
+                "run_id": run_id,
+                "status": status,
+                "fingerprint": fingerprint,
+                "artifact": json.loads(artifact) if artifact else None,
+                "files": json.loads(files) if files else [],
+                "completed_at": completed_at,
+            }
+            for stage, run_id, status, fingerprint, artifact, files, completed_at in rows
+        }
+
+    def clear_stage_checkpoints(self, run_date: str, stages: Optional[Iterable[str]] = None):
+        """
+        Remove stage checkpoints of a run date (a fresh run starts from scratch).
+
+        Args:
+            run_date: Date the pipeline ran for (YYYY-MM-DD).
+            stages: Only clear these stages (default: all stages of the date).
+        """
+        try:
+            with self._get_connection() as conn:
+                if stages is None:
+                    conn.execute("DELETE FROM stage_checkpoints WHERE run_date = ?", (run_date,))
+                else:
+                    conn.executemany(
+                        "DELETE FROM stage_checkpoints WHERE run_date = ? AND stage = ?",
+                        [(run_date, stage) for stage in stages]
+                    )
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error("Failed to clear stage checkpoints: %s", e)
+
+    def prune_pipeline_runs(self, before: str, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Delete pipeline runs started before a cutoff, together with their stage metrics,
+        data quality results, quarantined records, checkpoints and leases.
+
+        Args:
+            before: ISO timestamp; runs started earlier are deleted.
+            dry_run: Only count the rows that would be deleted.
+
+        Returns:
+            Rows deleted (or that would be deleted) per table; empty on error.
+        """
+        params = {"cutoff": before, "cutoff_date": before[:10]}
+        counts = {}
+        try:
+            with self._get_connection() as conn:
+                for table, condition in RUN_RETENTION_TABLES:
+                    if dry_run:
+                        counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {condition}",
+                                                     params).fetchone()[0]
+                    else:
+                        counts[table] = conn.execute(f"DELETE FROM {table} WHERE {condition}", params).rowcount
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error("Failed to prune pipeline runs: %s", e)
+            return {}
+        return counts
+
+    def space_usage(self) -> Dict[str, Any]:
+        """
+        Page statistics of the database file.
+
+        Returns:
+            page_size, page_count and freelist_count (pages a vacuum would release),
+            auto_vacuum (0 none, 1 full, 2 incremental), row counts per table and, when
+            SQLite has the dbstat table, bytes per table including its indexes.
+        """
+        usage: Dict[str, Any] = {}
+        try:
+            with self._get_connection() as conn:
+                for pragma in ("page_size", "page_count", "freelist_count", "auto_vacuum"):
+                    usage[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+                tables = [row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+                usage["rows"] = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                                 for table in tables}
+                try:
+                    usage["bytes"] = dict(conn.execute("""
+                    SELECT m.tbl_name, SUM(s.pgsize) FROM dbstat s
+                    JOIN sqlite_master m ON m.name = s.name
+                    GROUP BY m.tbl_name
+                    """).fetchall())
+                except sqlite3.OperationalError:
+                    usage["bytes"] = {}
+        except sqlite3.Error as e:
+            self.logger.error("Failed to read database space usage: %s", e)
+        return usage
+
+    def vacuum(self, max_pages: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Return free pages to the file system.
+
+        A database created before incremental auto-vacuum was enabled is converted once
+        with a full VACUUM, which rewrites the whole file (and briefly needs as much free
+        disk space again). Afterwards only free pages are released, without a rewrite.
+
+        Args:
+            max_pages: Release at most this many pages per call (0 releases all).
+
+        Returns:
+            mode ("full" or "incremental") and bytes_before/bytes_after; None on error.
+        """
+        try:
+            with self._get_connection() as conn:
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+                pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                    # VACUUM can't run inside a transaction
+                    conn.commit()
+                    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                    conn.execute("VACUUM")
+                    mode = "full"
+                else:
+                    # Every result row is one step: the vacuum stops early unless all are fetched
+                    conn.execute(f"PRAGMA incremental_vacuum({int(max_pages)})").fetchall()
+                    conn.commit()
+                    mode = "incremental"
+                # In WAL mode the shrunk pages only reach the main file at a checkpoint
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+                pages_after = conn.execute("PRAGMA page_count").fetchone()[0]
+        except sqlite3.Error as e:
+            self.logger.error("Failed to vacuum database: %s", e)
+            return None
+        return {"mode": mode, "bytes_before": pages_before * page_size, "bytes_after": pages_after * page_size}
+
+    def analyze(self) -> bool:
+        """Refresh the query planner statistics (ANALYZE)."""
+        try:
+            with self._get_connection() as conn:
+                conn.execute("ANALYZE")
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error("Failed to analyze database: %s", e)
+            return False
+        return True
+
+    def get_maintenance_state(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Last run of every database maintenance task (see utils/retention.py).
+
+        Returns:
+            Mapping of task name to its last_run_at and details.
+        """
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute("SELECT task, last_run_at, details FROM maintenance_state").fetchall()
+        except sqlite3.Error as e:
+            self.logger.error("Failed to read maintenance state: %s", e)
+            return {}
+        return {
+            task: {"last_run_at": last_run_at, "details": json.loads(details) if details else None}
+            for task, last_run_at, details in rows
+        }
+
+    def record_maintenance(self, task: str, details: Optional[Dict[str, Any]] = None):
+        """
+        Record that a maintenance task ran now.
+
+        Args:
+            task: Task name (prune_runs, vacuum, analyze).
+            details: What the task did, stored as JSON.
+        """
+        query = """
+        INSERT INTO maintenance_state (task, last_run_at, details) VALUES (?, ?, ?)
+        ON CONFLICT(task) DO UPDATE SET last_run_at = excluded.last_run_at, details = excluded.details
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute(query, (task, datetime.now().isoformat(), json.dumps(details, default=str)))
                 conn.commit()
         except sqlite3.Error as e:
-            self.logger.error(f"Failed to record pipeline failure: {e}")
+            self.logger.error("Failed to record maintenance of %s: %s", task, e)
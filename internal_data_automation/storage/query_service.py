@@ -0,0 +1,314 @@
+import argparse
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+from internal_data_automation.utils import json_codec
+
+# Tables whose generation (data_generations) invalidates cached results
+CACHED_TABLES = ("market_data", "news_data")
+
+
+class QueryError(ValueError):
+    """Invalid query parameters (answered with HTTP 400)."""
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl_seconds`.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table: str) -> int:
+        """Drops the cached results of one table (keys start with the table name)."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == table]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+class QueryService:
+    """
+    Read-only queries over market_data and news_data with a result cache.
+
+    Each thread reads through its own read-only connection. The database is in WAL
+    mode (see Database), so reads never block pipeline writes and vice versa.
+    Cached results of a table are dropped when the pipeline bumps the table's
+    generation after a storage stage; the generations are polled at most every
+    `generation_check_seconds`.
+    """
+    def __init__(self, db_path: str, logger: logging.Logger, cache_size: int = 1024,
+                 cache_ttl_seconds: float = 300, max_rows: int = 5000, generation_check_seconds: float = 1.0):
+        """
+        Args:
+            db_path: Path to the SQLite database written by the pipeline.
+            logger: Logger instance.
+            cache_size: Maximum number of cached query results.
+            cache_ttl_seconds: Lifetime of a cached result.
+            max_rows: Upper bound for the `limit` of a query.
+            generation_check_seconds: Minimum interval between generation checks.
+        """
+        self.db_path = db_path
+        self.logger = logger
+        self.max_rows = max_rows
+        self.cache = LRUCache(cache_size, cache_ttl_seconds)
+        self.generation_check_seconds = generation_check_seconds
+        # A table without a data_generations row yet is at generation 0
+        self.generations: Dict[str, int] = {name: 0 for name in CACHED_TABLES}
+        self._generation_checked_at = 0.0
+        self._generation_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def _check_generations(self):
+        now = time.monotonic()
+        if now - self._generation_checked_at < self.generation_check_seconds:
+            return
+        with self._generation_lock:
+            if now - self._generation_checked_at < self.generation_check_seconds:
+                return
+            self._generation_checked_at = now
+            try:
+                rows = self._connection().execute("SELECT name, generation FROM data_generations").fetchall()
+            except sqlite3.OperationalError:
+                # Database created before data_generations existed; rely on the TTL
+                return
+            for name, generation in rows:
+                if name in CACHED_TABLES and self.generations[name] != generation:
+                    dropped = self.cache.invalidate(name)
+                    self.logger.info("%s changed (generation %s), dropped %s cached results",
+                                     name, generation, dropped)
+                    self.generations[name] = generation
+
+    def _query(self, table: str, sql: str, params: Tuple) -> List[Dict[str, Any]]:
+        self._check_generations()
+        key = (table, sql, params)
+        rows = self.cache.get(key)
+        if rows is None:
+            generation = self.generations.get(table)
+            cursor = self._connection().execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            # Don't cache a result that raced with an invalidation
+            if self.generations.get(table) == generation:
+                self.cache.put(key, rows)
+        return rows
+
+    def _limit(self, value: Optional[str]) -> int:
+        if value is None:
+            return self.max_rows
+        try:
+            limit = int(value)
+        except ValueError:
+            raise QueryError(f"Invalid limit: {value}")
+        return max(1, min(limit, self.max_rows))
+
+    def market(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Daily OHLCV bars of one symbol, oldest first.
+
+        Params: symbol (required), start, end (YYYY-MM-DD, inclusive), limit.
+        """
+        symbol = params.get("symbol")
+        if not symbol:
+            raise QueryError("symbol is required")
+        start = _date_param(params, "start") or "0000-00-00"
+        end = _date_param(params, "end") or "9999-99-99"
+        return self._query("market_data", """
+            SELECT date, open, high, low, close, volume FROM market_data
+            WHERE symbol = ? AND date BETWEEN ? AND ?
+            ORDER BY date
+            LIMIT ?
+        """, (symbol, start, end, self._limit(params.get("limit"))))
+
+    def news(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        News articles, newest first.
+
+        Params: since, until (ISO date or timestamp; until is exclusive), source, limit.
+        """
+        conditions, values = [], []
+        if params.get("since"):
+            conditions.append("published_at >= ?")
+            values.append(params["since"])
+        if params.get("until"):
+            conditions.append("published_at < ?")
+            values.append(params["until"])
+        if params.get("source"):
+            conditions.append("source = ?")
+            values.append(params["source"])
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        return self._query("news_data", f"""
+            SELECT published_at, source, title, description, url, cluster_id FROM news_data
+            {where}
+            ORDER BY published_at DESC
+            LIMIT ?
+        """, tuple(values) + (self._limit(params.get("limit")),))
+
+    def symbols(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Stored symbols with their date range and number of bars."""
+        return self._query("market_data", """
+            SELECT symbol, MIN(date) AS first_date, MAX(date) AS last_date, COUNT(*) AS bars
+            FROM market_data GROUP BY symbol ORDER BY symbol
+        """, ())
+
+    def health(self) -> Dict[str, Any]:
+        self._check_generations()
+        return {"status": "ok", "cache": self.cache.stats(), "generations": dict(self.generations)}
+
+
+def _date_param(params: Dict[str, str], name: str) -> Optional[str]:
+    value = params.get(name)
+    if value is None:
+        return None
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise QueryError(f"Invalid {name} date: {value}. Expected YYYY-MM-DD.")
+    return value
+
+
+def make_server(service: QueryService, host: str, port: int) -> ThreadingHTTPServer:
+    """Creates the HTTP server exposing /market, /news, /symbols and /health."""
+    routes = {
+        "/market": service.market,
+        "/news": service.news,
+        "/symbols": service.symbols,
+    }
+
+    class QueryHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without TCP_NODELAY, keep-alive
+        # responses stall on Nagle's algorithm plus the client's delayed ACK (~40ms)
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            path = parsed.path.rstrip("/")
+            try:
+                if path == "/health":
+                    self._send(200, service.health())
+                elif path in routes:
+                    rows = routes[path](params)
+                    self._send(200, {"count": len(rows), "rows": rows})
+                else:
+                    self._send(404, {"error": f"Unknown path {parsed.path}"})
+            except QueryError as e:
+                self._send(400, {"error": str(e)})
+            except sqlite3.Error as e:
+                service.logger.error("Query failed for %s: %s", self.path, e)
+                self._send(500, {"error": "Database error"})
+
+        def _send(self, status: int, payload: Dict[str, Any]):
+            body = json_codec.dumps(payload)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            service.logger.debug("Query service: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Read-only HTTP query service over the pipeline database.")
+    parser.add_argument("--config", default="config.yaml", help="Configuration file (default: config.yaml)")
+    parser.add_argument("--host", help="Override query_service.host")
+    parser.add_argument("--port", type=int, help="Override query_service.port")
+    args = parser.parse_args(argv)
+
+    from internal_data_automation.utils.config_loader import load_config
+    from internal_data_automation.utils.logger import setup_logger
+    from internal_data_automation.storage.database import Database
+
+    config = load_config(args.config)
+    query_config = config.get("query_service", {})
+    logger = setup_logger(
+        name="query_service",
+        log_file=query_config.get("log_file", "logs/query_service.log"),
+        level=config.get("log_level", "INFO")
+    )
+
+    storage_config = config.get("storage", {})
+    db_path = storage_config.get("database_path", "data/internal_data.db")
+    # Creates missing tables/indexes and sets the journal mode (WAL, on one host) before read-only use
+    Database(db_path, logger, journal_mode=storage_config.get("journal_mode", "auto"))
+
+    service = QueryService(
+        db_path, logger,
+        cache_size=query_config.get("cache_size", 1024),
+        cache_ttl_seconds=query_config.get("cache_ttl_seconds", 300),
+        max_rows=query_config.get("max_rows", 5000),
+        generation_check_seconds=query_config.get("generation_check_seconds", 1.0)
+    )
+    host = args.host or query_config.get("host", "0.0.0.0")
+    port = args.port or query_config.get("port", 8081)
+    server = make_server(service, host, port)
+    logger.info("Query service listening on http://%s:%s (database %s)", host, port, db_path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
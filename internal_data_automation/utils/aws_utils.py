@@ -1,8 +1,21 @@
-import boto3
 import logging
 import os
 import time
-from botocore.exceptions import ClientError, NoCredentialsError
+from functools import lru_cache
+
+# boto3/botocore are imported on first use: they are only needed in production
+# mode and are by far the most expensive imports of the pipeline.
+
+@lru_cache(maxsize=None)
+def get_client(service_name: str):
+    """
+    Returns a cached boto3 client for the service.
+
+    boto3 clients are thread-safe; creating one per call costs credential
+    resolution and endpoint setup, which adds up in service mode.
+    """
+    import boto3
+    return boto3.client(service_name)
 
 def upload_file_to_s3(file_path, bucket, object_name=None):
     """
@@ -13,15 +26,17 @@ def upload_file_to_s3(file_path, bucket, object_name=None):
     :param object_name: S3 object name. If not specified then file_name is used
     :return: True if file was uploaded, else False
     """
+    from botocore.exceptions import ClientError, NoCredentialsError
+
     # If S3 object_name was not specified, use file_name
     if object_name is None:
         object_name = os.path.basename(file_path)
 
-    s3_client = boto3.client('s3')
+    s3_client = get_client('s3')
     try:
         s3_client.upload_file(file_path, bucket, object_name)
     except ClientError as e:
-        logging.error(f"S3 Upload Failed: {e}")
+        logging.error("S3 Upload Failed: %s", e)
         return False
     except NoCredentialsError:
         logging.error("S3 Upload Failed: No AWS credentials found")
@@ -36,7 +51,7 @@ class CloudWatchLogHandler(logging.Handler):
         super().__init__()
         self.log_group = log_group
         self.log_stream_name = log_stream_name
-        self.client = boto3.client('logs')
+        self.client = get_client('logs')
         self.sequence_token = None
         
         # Ensure log group and stream exist
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import math
+import os
+import struct
+from typing import Iterable, Optional
+
+MAGIC = b"IDABLOOM"
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Sized for `capacity` items at a false-positive rate of `error_rate`; the k bit
+    positions of an item are derived from one blake2b digest by double hashing.
+    """
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[bytearray] = None, count: int = 0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> bool:
+        """
+        Adds an item.
+
+        Returns:
+            True if the item was (probably) not in the filter before.
+        """
+        added = False
+        for position in self._positions(item):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+class RotatingBloomFilter:
+    """
+    Size-bounded membership filter remembering roughly the last 1-2x `capacity` items.
+
+    Items go into the current generation; once it holds `capacity` items it becomes
+    the previous generation and the one before it is dropped. Lookups check both,
+    so the false-positive rate stays below about twice `error_rate` and memory
+    never grows past two filters.
+    """
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous: Optional[BloomFilter] = None
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.current or (self.previous is not None and item in self.previous)
+
+    def __len__(self) -> int:
+        return self.current.count + (self.previous.count if self.previous else 0)
+
+    def add(self, item: str) -> bool:
+        """Adds an item, rotating generations when the current one is full."""
+        if item in self:
+            return False
+        if self.current.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+        return self.current.add(item)
+
+    def update(self, items: Iterable[str]) -> int:
+        """Adds several items and returns how many were new."""
+        return sum(1 for item in items if item and self.add(item))
+
+    def save(self, path: str):
+        """Writes the filter to `path` atomically (temporary file, then rename)."""
+        header = json.dumps({
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "current_count": self.current.count,
+            "previous_count": self.previous.count if self.previous else None,
+        }).encode("utf-8")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+            f.write(self.current.bits)
+            if self.previous:
+                f.write(self.previous.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RotatingBloomFilter":
+        """
+        Reads a filter written by save().
+
+        Raises:
+            ValueError: If the file is not a filter, or its header or bit arrays
+                are truncated or corrupt.
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            try:
+                (header_size,) = struct.unpack("<I", f.read(4))
+                header = json.loads(f.read(header_size))
+                current_count, previous_count = header["current_count"], header["previous_count"]
+                bloom = cls(header["capacity"], header["error_rate"])
+            except (struct.error, KeyError, TypeError, ArithmeticError) as e:
+                # Bad JSON or UTF-8 already raises ValueError
+                raise ValueError(f"{path} has a corrupt header: {e!r}") from e
+            data = f.read()
+
+        size = len(bloom.current.bits)
+        expected = size * (1 if previous_count is None else 2)
+        if len(data) != expected:
+            raise ValueError(f"{path} is truncated ({len(data)} of {expected} bytes)")
+        bloom.current = BloomFilter(bloom.capacity, bloom.error_rate, bytearray(data[:size]), current_count)
+        if previous_count is not None:
+            bloom.previous = BloomFilter(bloom.capacity, bloom.error_rate, bytearray(data[size:]), previous_count)
+        return bloom
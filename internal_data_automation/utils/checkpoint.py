@@ -0,0 +1,58 @@
+import hashlib
+import json
+import os
+from typing import Any, List, Optional
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def fingerprint(artifact: Any, files: List[str]) -> str:
+    """
+    Computes a fingerprint of a stage's output.
+
+    The fingerprint covers the JSON-serialised stage result and the content of
+    every file the stage produced, so a checkpoint is invalidated as soon as one
+    of its files is changed or removed.
+
+    Args:
+        artifact: JSON-serialisable value returned by the stage.
+        files: Paths of files produced by the stage.
+
+    Returns:
+        Hex SHA-256 digest, or an empty string if one of the files is missing.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(artifact, sort_keys=True, default=str).encode("utf-8"))
+    for path in sorted(files):
+        if not os.path.exists(path):
+            return ""
+        digest.update(path.encode("utf-8"))
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_files(artifact: Any) -> List[str]:
+    """
+    Returns the local files referenced by a stage result (a path or a list of paths).
+    """
+    if isinstance(artifact, str):
+        candidates = [artifact]
+    elif isinstance(artifact, (list, tuple)):
+        candidates = [a for a in artifact if isinstance(a, str)]
+    else:
+        return []
+    return [path for path in candidates if os.path.isfile(path)]
+
+
+def is_checkpoint_valid(checkpoint: Optional[dict]) -> bool:
+    """
+    Checks that a recorded checkpoint still matches the files on disk.
+
+    Args:
+        checkpoint: Row from Database.get_stage_checkpoints().
+    """
+    if not checkpoint or checkpoint.get("status") != "COMPLETED":
+        return False
+    return fingerprint(checkpoint["artifact"], checkpoint["files"]) == checkpoint["fingerprint"]
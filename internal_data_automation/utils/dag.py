@@ -0,0 +1,153 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, Future
+from typing import Dict, Any, List, Callable, Iterable, Optional, Set
+
+
+class Stage:
+    """
+    A named unit of pipeline work with the names of the stages it depends on.
+
+    `func` is called with the mapping of already finished stage names to their
+    return values, so a stage can consume the output of its dependencies.
+
+    `persistent` marks stages whose output survives the process (files, DB rows)
+    and can therefore be reused when resuming; non-persistent stages only hand
+    their output to dependents in memory.
+    """
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Any], deps: Iterable[str] = (),
+                 persistent: bool = True):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.persistent = persistent
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, deps={self.deps!r})"
+
+
+class DagExecutor:
+    """
+    Runs stages concurrently as soon as all their dependencies have completed.
+
+    If a stage raises, no further stages are started, already running stages
+    are allowed to finish, and the first error is re-raised from run().
+    """
+    def __init__(self, stages: List[Stage], logger: logging.Logger, max_workers: Optional[int] = None):
+        """
+        Args:
+            stages: Stages making up the DAG.
+            logger: Logger instance.
+            max_workers: Maximum number of stages running at the same time.
+
+        Raises:
+            ValueError: If stage names are duplicated, a dependency is unknown or the graph has a cycle.
+        """
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+
+        for stage in stages:
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        self.order = self._topological_order()
+        self.logger = logger
+        self.max_workers = max_workers or len(self.stages) or 1
+
+    def _topological_order(self) -> List[str]:
+        """Returns stage names in dependency order (Kahn's algorithm), raising on cycles."""
+        remaining = {name: set(stage.deps) for name, stage in self.stages.items()}
+        order: List[str] = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Cycle detected between stages: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def plan_resume(self, completed: Set[str]) -> Set[str]:
+        """
+        Determines which previously completed stages can be reused instead of re-run.
+
+        A completed stage must still re-run if any of its dependencies re-runs
+        (its inputs may change), and a non-persistent stage must re-run if any
+        of its dependents re-runs (its output only exists in memory).
+
+        Args:
+            completed: Names of stages that completed with a valid checkpoint.
+
+        Returns:
+            Names of stages whose checkpointed results can be reused.
+        """
+        reusable = set(completed) & set(self.stages)
+        changed = True
+        while changed:
+            changed = False
+            for name in self.order:
+                if name not in reusable:
+                    continue
+                stage = self.stages[name]
+                dependents = [s for s in self.stages.values() if name in s.deps]
+                if any(dep not in reusable for dep in stage.deps) or (
+                        not stage.persistent and any(d.name not in reusable for d in dependents)):
+                    reusable.discard(name)
+                    changed = True
+        return reusable
+
+    def run(self, preloaded: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Executes all stages.
+
+        Args:
+            preloaded: Results of stages that should not be executed (e.g. restored
+                from checkpoints); they are handed to dependents as if the stage had run.
+
+        Returns:
+            Mapping of stage name to the value returned by the stage.
+        """
+        results: Dict[str, Any] = dict(preloaded or {})
+        waiting = {name: set(self.stages[name].deps) - set(results)
+                   for name in self.order if name not in results}
+        running: Dict[Future, str] = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as pool:
+            def submit_ready():
+                for name in [n for n, deps in waiting.items() if not deps]:
+                    del waiting[name]
+                    self.logger.debug("Submitting stage %s", name)
+                    # Hand each stage a snapshot so it never sees a dict being mutated
+                    running[pool.submit(self.stages[name].func, dict(results))] = name
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except BaseException as e:
+                        self.logger.error("Stage %s failed: %s", name, e)
+                        if error is None:
+                            error = e
+                        continue
+                    for deps in waiting.values():
+                        deps.discard(name)
+
+                if error is None:
+                    submit_ready()
+
+        if error is not None:
+            not_started = sorted(waiting)
+            if not_started:
+                self.logger.warning("Stages not started due to earlier failure: %s", ", ".join(not_started))
+            raise error
+
+        return results
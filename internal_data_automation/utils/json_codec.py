@@ -0,0 +1,143 @@
+import json
+import mmap
+import os
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+# Backends in order of preference. orjson and msgspec are optional; the stdlib is always there.
+PREFERENCE = ("orjson", "msgspec", "stdlib")
+
+# Environment variable forcing a backend, e.g. IDA_JSON_BACKEND=stdlib
+BACKEND_ENV = "IDA_JSON_BACKEND"
+
+Buffer = Union[bytes, bytearray, memoryview, str]
+
+
+class JsonCodec:
+    """
+    One JSON backend behind a common interface.
+
+    `loads` accepts bytes (or any buffer, or str) and `dumps` always returns UTF-8 bytes,
+    so raw HTTP bodies and files never need an intermediate str copy.
+    """
+    def __init__(self, name: str, loads: Callable[[Buffer], Any], dumps: Callable[[Any, bool], bytes],
+                 decode_errors: Tuple[type, ...], reads_buffers: bool):
+        self.name = name
+        self._loads = loads
+        self._dumps = dumps
+        self.decode_errors = decode_errors
+        # Whether loads() takes a memoryview directly (decoding straight from an mmap)
+        self.reads_buffers = reads_buffers
+
+    def loads(self, data: Buffer) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any, indent: bool = False) -> bytes:
+        return self._dumps(obj, indent)
+
+    def load_file(self, path: str) -> Any:
+        """
+        Decodes a JSON file. Backends that read buffers decode straight from a
+        memory map of the file instead of copying it into a bytes object first.
+        """
+        with open(path, 'rb') as f:
+            if not self.reads_buffers or os.fstat(f.fileno()).st_size == 0:
+                return self._loads(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    return self._loads(view)
+                finally:
+                    view.release()
+
+    def dump_file(self, obj: Any, path: str, indent: bool = False):
+        with open(path, 'wb') as f:
+            f.write(self._dumps(obj, indent))
+
+    def __repr__(self) -> str:
+        return f"JsonCodec({self.name!r})"
+
+
+def _stdlib_codec() -> JsonCodec:
+    def dumps(obj: Any, indent: bool) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+    # json.loads detects the encoding of bytes itself, but doesn't take a memoryview
+    return JsonCodec("stdlib", json.loads, dumps, (json.JSONDecodeError, UnicodeDecodeError), reads_buffers=False)
+
+
+def _orjson_codec() -> Optional[JsonCodec]:
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    def dumps(obj: Any, indent: bool) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return JsonCodec("orjson", orjson.loads, dumps, (json.JSONDecodeError,), reads_buffers=True)
+
+
+def _msgspec_codec() -> Optional[JsonCodec]:
+    try:
+        import msgspec
+    except ImportError:
+        return None
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj: Any, indent: bool) -> bytes:
+        data = encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if indent else data
+
+    return JsonCodec("msgspec", decoder.decode, dumps, (msgspec.DecodeError,), reads_buffers=True)
+
+
+_FACTORIES = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "stdlib": _stdlib_codec,
+}
+
+
+def available_codecs() -> Dict[str, JsonCodec]:
+    """All installed backends, in order of preference."""
+    codecs = {}
+    for name in PREFERENCE:
+        codec = _FACTORIES[name]()
+        if codec is not None:
+            codecs[name] = codec
+    return codecs
+
+
+def get_codec(name: Optional[str] = None) -> JsonCodec:
+    """
+    Returns the named backend, or the preferred installed one.
+
+    Raises:
+        ValueError: If the named backend is unknown or not installed.
+    """
+    if name:
+        if name not in _FACTORIES:
+            raise ValueError(f"Unknown JSON backend '{name}'. Expected one of {PREFERENCE}.")
+        codec = _FACTORIES[name]()
+        if codec is None:
+            raise ValueError(f"JSON backend '{name}' is not installed")
+        return codec
+    for candidate in PREFERENCE:
+        codec = _FACTORIES[candidate]()
+        if codec is not None:
+            return codec
+    return _stdlib_codec()
+
+
+codec = get_codec(os.environ.get(BACKEND_ENV))
+
+# Module-level shortcuts for the selected backend
+loads = codec.loads
+dumps = codec.dumps
+load_file = codec.load_file
+dump_file = codec.dump_file
+
+# Exceptions raised for malformed input by the selected backend (always ValueError subclasses)
+DECODE_ERRORS: Tuple[type, ...] = codec.decode_errors
@@ -1,61 +1,185 @@
+import atexit
+import json
 import logging
-import os
+import logging.handlers
+import queue
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, List, Optional, Set
 
-def setup_logger(name: str = "internal_data_automation", log_file: str = "logs/pipeline.log", level: str = "INFO") -> logging.Logger:
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Active queue listeners keyed by logger name (only populated in queue mode)
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+
+# Logger names whose shutdown_logger is already registered to run at exit
+_exit_hooks: Set[str] = set()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats log records as single-line JSON objects (one record per line).
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def _build_sink_handlers(log_file: str, log_level: int, max_bytes: int, backup_count: int,
+                         json_log_file: Optional[str]) -> List[logging.Handler]:
+    """
+    Builds the handlers that actually perform I/O (console, rotating file, JSON lines).
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = []
+
+    # Console Handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(log_level)
+    console_handler.setFormatter(formatter)
+    handlers.append(console_handler)
+
+    # Rotating File Handler (max_bytes=0 disables rotation)
+    try:
+        # Ensure log directory exists
+        log_path = Path(log_file)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count
+        )
+        file_handler.setLevel(log_level)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    except Exception as e:
+        print(f"Failed to setup file logging: {e}")
+
+    # Optional JSON-lines sink for log shippers
+    if json_log_file:
+        try:
+            json_path = Path(json_log_file)
+            json_path.parent.mkdir(parents=True, exist_ok=True)
+
+            json_handler = logging.handlers.RotatingFileHandler(
+                json_log_file, maxBytes=max_bytes, backupCount=backup_count
+            )
+            json_handler.setLevel(log_level)
+            json_handler.setFormatter(JsonLinesFormatter())
+            handlers.append(json_handler)
+        except Exception as e:
+            print(f"Failed to setup JSON logging: {e}")
+
+    return handlers
+
+
+def setup_logger(name: str = "internal_data_automation", log_file: str = "logs/pipeline.log", level: str = "INFO",
+                 use_queue: bool = False, json_log_file: Optional[str] = None,
+                 max_bytes: int = 0, backup_count: int = 0) -> logging.Logger:
     """
     Sets up a logger that logs to both console and a file.
-    
+
+    In queue mode the logger only gets a QueueHandler, so producers just enqueue
+    records; a background QueueListener performs the console/file/JSON I/O.
+
     Args:
         name: Name of the logger.
         log_file: Path to the log file.
         level: Logging level (e.g., "INFO", "DEBUG").
-        
+        use_queue: Enqueue records and write them from a background listener thread.
+        json_log_file: Optional path of an additional JSON-lines log file.
+        max_bytes: Rotate the log files once they reach this size (0 disables rotation).
+        backup_count: Number of rotated log files to keep.
+
     Returns:
         Configured logger instance.
     """
     # specific log level
     log_level = getattr(logging, level.upper(), logging.INFO)
-    
+
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(log_level)
-    
+
     # Avoid duplicate handlers if setup_logger is called multiple times
     if logger.handlers:
         return logger
-        
-    # Create formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    
-    # Console Handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(log_level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # File Handler
-    try:
-        # Ensure log directory exists
-        log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(log_level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    except Exception as e:
-        print(f"Failed to setup file logging: {e}")
 
-    # CloudWatch Handler (if configured)
-    # We check if 'cloudwatch_config' is passed in extra args or handle it outside.
-    # For simplicity, we can pass it as an argument or handle it in the caller.
-    # However, to match the signature, we might need to rely on the caller adding the handler.
-    # To keep this function focused, we will just return the logger here.
-        
+    handlers = _build_sink_handlers(log_file, log_level, max_bytes, backup_count, json_log_file)
+
+    if not use_queue:
+        for handler in handlers:
+            logger.addHandler(handler)
+        return logger
+
+    # Queue mode: producers only enqueue, the listener thread fans out to the sinks
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    # Records are already filtered by the logger level, don't propagate to root sinks twice
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
+    # shutdown_logger looks the listener up by name, so one hook covers every later setup
+    if name not in _exit_hooks:
+        _exit_hooks.add(name)
+        atexit.register(shutdown_logger, logger)
+
     return logger
 
+
+def _attach_handler(logger: logging.Logger, handler: logging.Handler):
+    """
+    Attaches a sink handler to the logger, or to its queue listener in queue mode.
+    """
+    listener = _listeners.get(logger.name)
+    if listener is None:
+        logger.addHandler(handler)
+        return
+
+    # QueueListener handlers are immutable: restart it with the extra sink.
+    # Records enqueued meanwhile stay in the queue and are picked up on restart.
+    listener.stop()
+    new_listener = logging.handlers.QueueListener(
+        listener.queue, *listener.handlers, handler, respect_handler_level=True
+    )
+    new_listener.start()
+    _listeners[logger.name] = new_listener
+
+
+def shutdown_logger(logger: logging.Logger):
+    """
+    Flushes pending queued records, stops the queue listener and detaches it, if any.
+
+    The logger's QueueHandler is removed along with the listener, so a later
+    setup_logger() call builds a fresh queue and listener instead of returning a
+    logger that feeds a queue nobody drains.
+
+    Safe to call multiple times and for loggers not running in queue mode.
+    """
+    listener = _listeners.pop(logger.name, None)
+    if listener is not None:
+        listener.stop()
+        for handler in list(logger.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is listener.queue:
+                logger.removeHandler(handler)
+                handler.close()
+        logger.propagate = True
+        for handler in listener.handlers:
+            handler.flush()
+            handler.close()
+
+
 def add_cloudwatch_handler(logger: logging.Logger, log_group: str, log_stream_name: str):
     """
     Adds a CloudWatch log handler to the existing logger.
@@ -63,8 +187,8 @@ def add_cloudwatch_handler(logger: logging.Logger, log_group: str, log_stream_na
     try:
         from internal_data_automation.utils.aws_utils import CloudWatchLogHandler
         cw_handler = CloudWatchLogHandler(log_group=log_group, log_stream_name=log_stream_name)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        formatter = logging.Formatter(LOG_FORMAT)
         cw_handler.setFormatter(formatter)
-        logger.addHandler(cw_handler)
+        _attach_handler(logger, cw_handler)
     except Exception as e:
-        logger.error(f"Failed to add CloudWatch handler: {e}")
+        logger.error("Failed to add CloudWatch handler: %s", e)
@@ -0,0 +1,212 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterator
+
+# Upper bounds (seconds) of the HTTP latency histogram buckets, Prometheus style
+HTTP_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Stage currently executing in this thread/context, used to attribute HTTP latencies
+_current_stage: contextvars.ContextVar[Optional["StageMetrics"]] = contextvars.ContextVar(
+    "current_stage", default=None
+)
+
+
+class LatencyHistogram:
+    """
+    Bucketed latency histogram, exported in the cumulative Prometheus histogram format.
+    """
+    def __init__(self, buckets=HTTP_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "buckets": list(self.buckets),
+            "counts": self.counts,
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+
+class StageMetrics:
+    """
+    Measurements for a single pipeline stage.
+
+    Wall and CPU time are captured by MetricsCollector.stage(); the stage body fills in
+    record and byte counters through the object yielded by the context manager.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at: Optional[str] = None
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.records_in = 0
+        self.records_out = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.status = "RUNNING"
+        self.http_latency = LatencyHistogram()
+        self._lock = threading.Lock()
+
+    def observe_http(self, seconds: float):
+        with self._lock:
+            self.http_latency.observe(seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "started_at": self.started_at,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "records_in": self.records_in,
+            "records_out": self.records_out,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "status": self.status,
+            "http_requests": self.http_latency.count,
+            "http_latency": self.http_latency.to_dict(),
+        }
+
+
+class MetricsCollector:
+    """
+    Collects StageMetrics for one pipeline run.
+
+    When a profiler (utils.profiling.StageProfiler) is given, every stage is also
+    run under it; without one, stages pay nothing for profiling.
+    """
+    def __init__(self, run_id: str, profiler=None):
+        self.run_id = run_id
+        self.profiler = profiler
+        self.stages: List[StageMetrics] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """
+        Measures the enclosed block as stage `name`.
+
+        CPU time is measured per thread so concurrently running stages don't
+        account each other's work.
+        """
+        metrics = StageMetrics(name)
+        metrics.started_at = datetime.now().isoformat()
+        with self._lock:
+            self.stages.append(metrics)
+
+        token = _current_stage.set(metrics)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            with self.profiler.stage(name) if self.profiler else nullcontext():
+                yield metrics
+            metrics.status = "SUCCESS"
+        except BaseException:
+            metrics.status = "FAILED"
+            raise
+        finally:
+            metrics.wall_seconds = time.perf_counter() - wall_start
+            metrics.cpu_seconds = time.thread_time() - cpu_start
+            _current_stage.reset(token)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [m.to_dict() for m in self.stages]
+
+
+def record_http_latency(seconds: float):
+    """
+    Records an HTTP request latency against the stage running in the current context.
+
+    No-op when called outside an instrumented stage.
+    """
+    metrics = _current_stage.get()
+    if metrics is not None:
+        metrics.observe_http(seconds)
+
+
+def file_size(path: Optional[str]) -> int:
+    """Returns the size of `path` in bytes, or 0 if it does not exist."""
+    if path and os.path.exists(path):
+        return os.path.getsize(path)
+    return 0
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def write_prometheus_textfile(path: str, collector: MetricsCollector, run_status: str, finished_at: float):
+    """
+    Writes run and stage metrics in the Prometheus text format for node_exporter's
+    textfile collector.
+
+    The file is written to a temporary path and renamed so the collector never
+    reads a partially written file.
+
+    Args:
+        path: Target .prom file (inside node_exporter's --collector.textfile.directory).
+        collector: Metrics of the finished run.
+        run_status: Final run status (SUCCESS/FAILED).
+        finished_at: Unix timestamp of the end of the run.
+    """
+    gauges = [
+        ("wall_seconds", "Wall-clock time spent in the stage"),
+        ("cpu_seconds", "CPU time spent in the stage"),
+        ("records_in", "Records consumed by the stage"),
+        ("records_out", "Records produced by the stage"),
+        ("bytes_read", "Bytes read by the stage"),
+        ("bytes_written", "Bytes written by the stage"),
+    ]
+    stages = collector.to_list()
+
+    lines = [
+        "# HELP pipeline_last_run_timestamp_seconds Unix time the last pipeline run finished.",
+        "# TYPE pipeline_last_run_timestamp_seconds gauge",
+        f"pipeline_last_run_timestamp_seconds {finished_at:.3f}",
+        "# HELP pipeline_last_run_success Whether the last pipeline run succeeded.",
+        "# TYPE pipeline_last_run_success gauge",
+        f"pipeline_last_run_success {1 if run_status == 'SUCCESS' else 0}",
+    ]
+
+    for key, help_text in gauges:
+        metric = f"pipeline_stage_{key}"
+        lines.append(f"# HELP {metric} {help_text}.")
+        lines.append(f"# TYPE {metric} gauge")
+        for s in stages:
+            lines.append(f'{metric}{{stage="{_escape_label(s["stage"])}"}} {s[key]}')
+
+    metric = "pipeline_stage_http_request_duration_seconds"
+    lines.append(f"# HELP {metric} Latency of HTTP requests issued by the stage.")
+    lines.append(f"# TYPE {metric} histogram")
+    for s in stages:
+        if not s["http_requests"]:
+            continue
+        stage = _escape_label(s["stage"])
+        histogram = s["http_latency"]
+        cumulative = 0
+        for upper, count in zip(list(histogram["buckets"]) + ["+Inf"], histogram["counts"]):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{stage="{stage}",le="{upper}"}} {cumulative}')
+        lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram["sum"]}')
+        lines.append(f'{metric}_count{{stage="{stage}"}} {histogram["count"]}')
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
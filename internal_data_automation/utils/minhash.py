@@ -0,0 +1,89 @@
+import hashlib
+import random
+import re
+import struct
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+# Permutations are simulated by (a * x + b) mod p over 32-bit shingle hashes
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = 2) -> Set[str]:
+    """
+    Word n-grams of a lowercased text with punctuation removed.
+
+    Texts shorter than `size` words yield their words joined as one shingle, so
+    short titles still get a signature.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """
+    MinHash signatures estimating the Jaccard similarity of shingle sets.
+
+    The fraction of positions at which two signatures agree is an unbiased
+    estimate of the Jaccard similarity of the underlying sets.
+    """
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        self.num_perm = num_perm
+        rng = random.Random(seed)
+        self.permutations = [(rng.randint(1, MERSENNE_PRIME - 1), rng.randint(0, MERSENNE_PRIME - 1))
+                             for _ in range(num_perm)]
+
+    def signature(self, items: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        """
+        MinHash signature of a shingle set.
+
+        Returns:
+            `num_perm` minimum hashes, or None for an empty set: it has no
+            meaningful signature, and a constant one would make every empty
+            text look identical to every other.
+        """
+        hashes = [int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=4).digest(), "little")
+                  for item in items]
+        if not hashes:
+            return None
+        return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) & MAX_HASH
+                     for a, b in self.permutations)
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures of the same length."""
+    if len(a) != len(b) or not a:
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def band_keys(signature: Sequence[int], bands: int) -> List[Tuple[int, int]]:
+    """
+    Splits a signature into `bands` bands and hashes each one to a bucket.
+
+    Two signatures share a bucket in some band with probability 1 - (1 - s^r)^b
+    for Jaccard similarity s and r = len(signature) / bands rows per band, so
+    near-duplicates collide while dissimilar items rarely do.
+
+    Returns:
+        (band, bucket) pairs, with buckets as signed 64-bit integers for SQLite.
+    """
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        chunk = struct.pack(f"<{rows}I", *signature[band * rows:(band + 1) * rows])
+        bucket = int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True)
+        keys.append((band, bucket))
+    return keys
+
+
+def pack_signature(signature: Sequence[int]) -> bytes:
+    return struct.pack(f"<{len(signature)}I", *signature)
+
+
+def unpack_signature(blob: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f"<{len(blob) // 4}I", blob)
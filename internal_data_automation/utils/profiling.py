@@ -0,0 +1,105 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any, List, Iterator
+
+
+class StageProfiler:
+    """
+    Profiles pipeline stages with cProfile (CPU) and tracemalloc (allocations).
+
+    For every stage it writes, into `output_dir`:
+        <stage>.pstats           cProfile statistics (open with pstats or snakeviz)
+        <stage>.allocations.txt  Top-N allocation sites still alive at the end of the stage
+    and after the run a summary.json with peak memory and the hottest functions per stage.
+
+    tracemalloc is process-wide and cProfile only sees the thread it is enabled in,
+    so stages must run one at a time while profiling.
+    """
+    def __init__(self, output_dir: str, top_n: int = 25):
+        """
+        Args:
+            output_dir: Directory for the profile files (created if missing).
+            top_n: Number of allocation sites and functions reported per stage.
+        """
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.stages: List[Dict[str, Any]] = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Profiles the enclosed block as stage `name`."""
+        profile = cProfile.Profile()
+        tracemalloc.start()
+        wall_start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall_seconds = time.perf_counter() - wall_start
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self._save(name, profile, snapshot, peak, wall_seconds)
+
+    def _save(self, name: str, profile: cProfile.Profile, snapshot: tracemalloc.Snapshot,
+              peak: int, wall_seconds: float):
+        pstats_path = os.path.join(self.output_dir, f"{name}.pstats")
+        profile.dump_stats(pstats_path)
+
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        allocations = snapshot.statistics("lineno")[:self.top_n]
+        allocations_path = os.path.join(self.output_dir, f"{name}.allocations.txt")
+        with open(allocations_path, 'w') as f:
+            f.write(f"Stage {name}: peak traced memory {peak / 1024 / 1024:.2f} MiB\n")
+            f.write(f"Top {len(allocations)} allocation sites alive at the end of the stage:\n")
+            for stat in allocations:
+                f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {stat.traceback}\n")
+
+        # Hottest functions by cumulative time, for the summary
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        hottest = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top_n]
+
+        self.stages.append({
+            "stage": name,
+            "wall_seconds": wall_seconds,
+            "peak_memory_bytes": peak,
+            "pstats": pstats_path,
+            "allocations": allocations_path,
+            "top_allocations": [
+                {"site": str(stat.traceback), "size_bytes": stat.size, "blocks": stat.count}
+                for stat in allocations
+            ],
+            "top_functions": [
+                {
+                    "function": f"{filename}:{lineno}({func})",
+                    "calls": ncalls,
+                    "total_seconds": tottime,
+                    "cumulative_seconds": cumtime,
+                }
+                for (filename, lineno, func), (_, ncalls, tottime, cumtime, _) in hottest
+            ],
+        })
+
+    def write_summary(self) -> str:
+        """
+        Writes summary.json for all profiled stages.
+
+        Returns:
+            Path of the summary file.
+        """
+        path = os.path.join(self.output_dir, "summary.json")
+        with open(path, 'w') as f:
+            json.dump({"stages": self.stages}, f, indent=4)
+        return path
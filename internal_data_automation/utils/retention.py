@@ -0,0 +1,358 @@
+import logging
+import os
+import re
+import tarfile
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from internal_data_automation.storage.database import Database
+
+# Directories rolled into monthly bundles, and how many days their files stay loose
+DEFAULT_BUNDLES = {
+    "raw": {"path": "data/raw", "keep_days": 30},
+    "reports": {"path": "reports", "keep_days": 90},
+}
+
+# Checkout the package runs from; never a valid log directory
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+# Run date in raw and report file names, e.g. market_SPY_2025-01-31.json, news_stories_2025-01-31.csv
+_FILE_DATE = re.compile(r"(\d{4}-\d{2}-\d{2})\.[^.]+$")
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def file_date(path: str) -> date:
+    """Run date of a raw or report file: from its name, else its modification time."""
+    match = _FILE_DATE.search(os.path.basename(path))
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%Y-%m-%d").date()
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(os.path.getmtime(path)).date()
+
+
+def plan_bundles(directory: str, keep_days: int, today: date) -> Dict[str, List[str]]:
+    """
+    Groups the files of a directory into the monthly bundles that are due.
+
+    A month is bundled once all of it is older than `keep_days`, so each bundle is
+    written once; a file of a month bundled earlier (e.g. a late re-run) is merged
+    into the existing bundle.
+
+    Returns:
+        Mapping of month (YYYY-MM) to the paths of its files, oldest month first.
+    """
+    cutoff = today - timedelta(days=keep_days)
+    months: Dict[str, List[str]] = {}
+    if not os.path.isdir(directory):
+        return months
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if not entry.is_file() or entry.name.startswith(".") or entry.name.endswith(".tmp"):
+            continue
+        day = file_date(entry.path)
+        next_month = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+        if next_month <= cutoff:
+            months.setdefault(f"{day:%Y-%m}", []).append(entry.path)
+    return dict(sorted(months.items()))
+
+
+def write_bundle(bundle_path: str, files: List[str]) -> int:
+    """
+    Writes files into a tar.gz bundle, keeping the members of an existing bundle
+    (a file of the same name replaces its older copy).
+
+    The bundle is written to a temporary file, read back and checked before it
+    replaces the old one, so a failure never leaves a truncated bundle behind.
+
+    Returns:
+        Size of the bundle in bytes.
+
+    Raises:
+        OSError, tarfile.TarError: If the bundle can't be written or fails the check.
+    """
+    names = {os.path.basename(path) for path in files}
+    expected = set(names)
+    tmp_path = f"{bundle_path}.tmp"
+    try:
+        with tarfile.open(tmp_path, "w:gz", compresslevel=6) as bundle:
+            if os.path.exists(bundle_path):
+                with tarfile.open(bundle_path, "r:gz") as existing:
+                    for member in existing:
+                        if member.isfile() and member.name not in names:
+                            bundle.addfile(member, existing.extractfile(member))
+                            expected.add(member.name)
+            for path in files:
+                bundle.add(path, arcname=os.path.basename(path))
+
+        with tarfile.open(tmp_path, "r:gz") as check:
+            written = set(check.getnames())
+        if written != expected:
+            raise tarfile.TarError(f"{tmp_path} holds {len(written)} of {len(expected)} files")
+        os.replace(tmp_path, bundle_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return os.path.getsize(bundle_path)
+
+
+def archive_bundle(config: Dict[str, Any], logger: logging.Logger, bundle_path: str, category: str) -> bool:
+    """Uploads a bundle to <aws.s3_prefix>/archive/<category>/ in aws.s3_bucket_name."""
+    aws_config = config.get("aws", {})
+    bucket_name = aws_config.get("s3_bucket_name")
+    s3_prefix = aws_config.get("s3_prefix", "internal-data-automation")
+    if not bucket_name:
+        logger.error("retention.s3_archive is set but aws.s3_bucket_name is not")
+        return False
+
+    from internal_data_automation.utils.aws_utils import upload_file_to_s3
+
+    object_name = f"{s3_prefix}/archive/{category}/{os.path.basename(bundle_path)}"
+    if not upload_file_to_s3(bundle_path, bucket_name, object_name):
+        logger.error("Failed to archive %s to s3://%s/%s", bundle_path, bucket_name, object_name)
+        return False
+    logger.info("Archived %s to s3://%s/%s", bundle_path, bucket_name, object_name)
+    return True
+
+
+def bundle_files(config: Dict[str, Any], logger: logging.Logger, category: str, settings: Dict[str, Any],
+                 today: date, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Rolls the due months of one directory into <archive_dir>/<category>_<YYYY-MM>.tar.gz,
+    optionally archives the bundles to S3, and deletes the bundled files.
+
+    Files are only deleted once their bundle is written (and uploaded, with
+    retention.s3_archive); otherwise they stay and the next run tries again.
+
+    Returns:
+        files and bytes bundled (or due), and bundle_bytes the bundles grew by.
+    """
+    retention_config = config.get("retention", {})
+    archive_dir = retention_config.get("archive_dir", "data/archive")
+    summary = {"files": 0, "bytes": 0, "bundle_bytes": 0}
+
+    months = plan_bundles(settings["path"], settings["keep_days"], today)
+    for month, files in months.items():
+        size = sum(os.path.getsize(path) for path in files)
+        bundle_path = os.path.join(archive_dir, f"{category}_{month}.tar.gz")
+        if dry_run:
+            logger.info("[dry-run] Would bundle %s %s files (%s) into %s",
+                        len(files), category, format_bytes(size), bundle_path)
+            summary["files"] += len(files)
+            summary["bytes"] += size
+            continue
+
+        previous_size = os.path.getsize(bundle_path) if os.path.exists(bundle_path) else 0
+        try:
+            os.makedirs(archive_dir, exist_ok=True)
+            bundle_size = write_bundle(bundle_path, files)
+        except (OSError, tarfile.TarError) as e:
+            logger.error("Failed to bundle %s files of %s: %s", category, month, e)
+            continue
+        logger.info("Bundled %s %s files (%s) into %s (%s)",
+                    len(files), category, format_bytes(size), bundle_path, format_bytes(bundle_size))
+
+        if retention_config.get("s3_archive") and not archive_bundle(config, logger, bundle_path, category):
+            logger.warning("Keeping the %s files of %s until %s is archived", category, month, bundle_path)
+            continue
+
+        for path in files:
+            os.remove(path)
+        summary["files"] += len(files)
+        summary["bytes"] += size
+        summary["bundle_bytes"] += bundle_size - previous_size
+    return summary
+
+
+def _rotated_log_pattern(path: str) -> re.Pattern:
+    """Backups RotatingFileHandler makes of a log file: <name>.1, <name>.2, ..."""
+    return re.compile(re.escape(os.path.basename(path)) + r"\.\d+$")
+
+
+def clean_logs(config: Dict[str, Any], logger: logging.Logger, keep_days: int, today: date,
+               dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Deletes log artifacts not modified for `keep_days` from retention.logs.path:
+    rotated backups of the configured log files (pipeline.log.N), cron run logs
+    (cron_run_*.log) and run directories under profiles/. Nothing else in the
+    directory is touched, and the files loggers currently write to are never deleted.
+
+    Returns:
+        files and bytes deleted (or due); empty if the directory is unset or unsafe.
+    """
+    log_config = config.get("logging", {})
+    log_dir = config.get("retention", {}).get("logs", {}).get("path")
+    if not log_dir:
+        logger.error("retention.logs.path is not set; skipping log cleanup")
+        return {}
+    real_dir = os.path.realpath(log_dir)
+    unsafe = {os.path.realpath(os.getcwd()), REPO_ROOT, os.path.realpath(os.sep),
+              os.path.realpath(os.path.expanduser("~"))}
+    if real_dir in unsafe:
+        logger.error("Refusing to clean logs in %s: retention.logs.path must be a dedicated log directory", real_dir)
+        return {}
+    if not os.path.isdir(log_dir):
+        return {"files": 0, "bytes": 0}
+
+    log_files = [path for path in (log_config.get("file", "logs/pipeline.log"), log_config.get("json_file"),
+                                   config.get("query_service", {}).get("log_file")) if path]
+    patterns = [_rotated_log_pattern(path) for path in log_files] + [re.compile(r"cron_run_.*\.log$")]
+    cutoff = datetime.combine(today - timedelta(days=keep_days), datetime.min.time()).timestamp()
+    summary = {"files": 0, "bytes": 0}
+
+    def delete(paths: List[str]):
+        for path in paths:
+            size = os.path.getsize(path)
+            if not dry_run:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning("Failed to delete log file %s: %s", path, e)
+                    continue
+            summary["files"] += 1
+            summary["bytes"] += size
+
+    for entry in os.scandir(log_dir):
+        if (entry.is_file() and any(p.fullmatch(entry.name) for p in patterns)
+                and entry.stat().st_mtime < cutoff):
+            delete([entry.path])
+
+    # Profiles: logs/profiles/<run_id>/ goes as a whole once none of its files is recent
+    profiles_dir = os.path.join(log_dir, "profiles")
+    if os.path.isdir(profiles_dir):
+        for entry in os.scandir(profiles_dir):
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            files = [f.path for f in os.scandir(entry.path) if f.is_file(follow_symlinks=False)]
+            if any(os.path.getmtime(path) >= cutoff for path in files):
+                continue
+            delete(files)
+            if not dry_run and not os.listdir(entry.path):
+                os.rmdir(entry.path)
+
+    logger.info("%s %s log files older than %s days (%s)", "[dry-run] Would delete" if dry_run else "Deleted",
+                summary["files"], keep_days, format_bytes(summary["bytes"]))
+    return summary
+
+
+def _is_due(state: Dict[str, Dict[str, Any]], task: str, every_days: Optional[float], now: datetime) -> bool:
+    if not every_days:
+        return False
+    last_run_at = state.get(task, {}).get("last_run_at")
+    return last_run_at is None or datetime.fromisoformat(last_run_at) <= now - timedelta(days=every_days)
+
+
+def maintain_database(config: Dict[str, Any], logger: logging.Logger, db: Database, now: datetime,
+                      dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Prunes old pipeline runs, then runs the vacuum and ANALYZE when their interval
+    has passed since the last run recorded in maintenance_state.
+
+    Returns:
+        pruned rows per table, and the bytes reclaimed (or, in a dry run, the
+        estimated bytes a vacuum after pruning would reclaim).
+    """
+    db_config = config.get("retention", {}).get("database", {})
+    state = db.get_maintenance_state()
+    usage = db.space_usage()
+    summary: Dict[str, Any] = {"pruned": {}, "bytes": 0}
+
+    keep_days = db_config.get("prune_runs_after_days")
+    if keep_days:
+        before = (now - timedelta(days=keep_days)).isoformat()
+        summary["pruned"] = db.prune_pipeline_runs(before, dry_run=dry_run)
+        logger.info("%s pipeline runs started before %s: %s", "[dry-run] Would prune" if dry_run else "Pruned",
+                    before[:10], ", ".join(f"{t} {n}" for t, n in summary["pruned"].items()) or "nothing")
+        if not dry_run:
+            db.record_maintenance("prune_runs", {"before": before, "rows": summary["pruned"]})
+
+    vacuum_due = _is_due(state, "vacuum", db_config.get("vacuum_every_days", 1), now)
+    if dry_run:
+        # Pages freed by pruning, estimated from each table's share of deleted rows
+        pruned_bytes = sum(
+            usage.get("bytes", {}).get(table, 0) * count / usage["rows"][table]
+            for table, count in summary["pruned"].items() if usage.get("rows", {}).get(table)
+        )
+        free_bytes = usage.get("freelist_count", 0) * usage.get("page_size", 0)
+        summary["bytes"] = int(free_bytes + pruned_bytes)
+        logger.info("[dry-run] Database has %s of free pages; pruning would free about %s more",
+                    format_bytes(free_bytes), format_bytes(pruned_bytes))
+        if vacuum_due:
+            logger.info("[dry-run] Vacuum is due%s", "" if usage.get("auto_vacuum") == 2 else
+                        " (one-off full VACUUM converting the database to incremental auto-vacuum)")
+    elif vacuum_due:
+        if usage.get("auto_vacuum") != 2:
+            logger.info("Converting %s to incremental auto-vacuum with a full VACUUM...", db.db_path)
+        result = db.vacuum(db_config.get("vacuum_max_pages", 0))
+        if result:
+            summary["bytes"] = result["bytes_before"] - result["bytes_after"]
+            logger.info("Database %s vacuum reclaimed %s (%s -> %s)", result["mode"],
+                        format_bytes(summary["bytes"]), format_bytes(result["bytes_before"]),
+                        format_bytes(result["bytes_after"]))
+            db.record_maintenance("vacuum", result)
+
+    if _is_due(state, "analyze", db_config.get("analyze_every_days", 7), now):
+        if dry_run:
+            logger.info("[dry-run] ANALYZE is due")
+        elif db.analyze():
+            logger.info("Database statistics refreshed (ANALYZE)")
+            db.record_maintenance("analyze")
+    return summary
+
+
+def run_retention(config: Dict[str, Any], logger: logging.Logger, db: Database, today: Optional[date] = None,
+                  dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Applies the retention policy under `retention` in config.yaml: bundles old raw
+    and report files by month, deletes old log files and maintains the database.
+
+    Args:
+        config: Configuration dictionary.
+        logger: Logger instance.
+        db: Database instance.
+        today: Date the retention periods are counted back from (default: today).
+        dry_run: Only report what would be done and the space it would reclaim.
+
+    Returns:
+        Summary per step, plus deleted_bytes (files deleted), bundle_bytes (growth of
+        the bundles) and reclaimed_bytes (net saving, never negative).
+    """
+    retention_config = config.get("retention", {})
+    today = today or date.today()
+    now = datetime.combine(today, datetime.now().time())
+    summary: Dict[str, Any] = {"dry_run": dry_run}
+
+    for category, defaults in DEFAULT_BUNDLES.items():
+        settings = {**defaults, **(retention_config.get(category) or {})}
+        if settings.get("keep_days") is None:
+            continue
+        summary[category] = bundle_files(config, logger, category, settings, today, dry_run=dry_run)
+
+    log_keep_days = retention_config.get("logs", {}).get("keep_days", 30)
+    if log_keep_days is not None:
+        summary["logs"] = clean_logs(config, logger, log_keep_days, today, dry_run=dry_run)
+
+    summary["database"] = maintain_database(config, logger, db, now, dry_run=dry_run)
+
+    bundled = [summary[c] for c in DEFAULT_BUNDLES if c in summary]
+    summary["deleted_bytes"] = sum(b["bytes"] for b in bundled) + summary.get("logs", {}).get("bytes", 0)
+    summary["bundle_bytes"] = sum(b["bundle_bytes"] for b in bundled)
+    # Net saving; merging a tiny file into a bundle can cost more than it frees (in a
+    # dry run, the bundles' size is unknown and the figure is an upper bound)
+    summary["reclaimed_bytes"] = max(0, summary["deleted_bytes"] - summary["bundle_bytes"]
+                                     + summary["database"]["bytes"])
+    if dry_run:
+        logger.info("[dry-run] Retention would delete %s of files (bundled ones are kept compressed) and "
+                    "reclaim about %s in the database", format_bytes(summary["deleted_bytes"]),
+                    format_bytes(summary["database"]["bytes"]))
+    else:
+        logger.info("Retention deleted %s of files, added %s of bundles and reclaimed %s in the database "
+                    "(net %s)", format_bytes(summary["deleted_bytes"]), format_bytes(summary["bundle_bytes"]),
+                    format_bytes(summary["database"]["bytes"]), format_bytes(summary["reclaimed_bytes"]))
+    return summary
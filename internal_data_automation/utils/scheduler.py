@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from typing import Set
+
+# (name, lowest value, highest value) of the five cron fields
+CRON_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 6),
+)
+
+
+def _parse_field(expr: str, low: int, high: int) -> Set[int]:
+    """
+    Parses one cron field (`*`, `*/n`, `a`, `a-b`, `a-b/n` and comma-separated lists).
+    """
+    values: Set[int] = set()
+    for part in expr.split(","):
+        step = 1
+        has_step = "/" in part
+        if has_step:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+            if step < 1:
+                raise ValueError(f"Invalid step in cron field: {expr}")
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_str, end_str = part.split("-", 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(part)
+            end = high if has_step else start
+
+        # Cron allows 7 for Sunday in the weekday field
+        weekday = high == 6
+        if start < low or end > (7 if weekday else high) or start > end:
+            raise ValueError(f"Cron field '{expr}' out of range {low}-{high}")
+        # Normalise 7 to 0 only if the step actually reaches it (2-7/2 is 2,4,6)
+        values.update(0 if weekday and value == 7 else value for value in range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    Standard five-field cron expression: minute hour day-of-month month day-of-week.
+
+    As in cron, when both day-of-month and day-of-week are restricted a day
+    matches if either of them matches. Like cron, a field starting with `*`
+    (including `*/n`) does not count as restricted, so `0 0 */2 * 1` runs on
+    odd days that are Mondays, not on odd days and on every Monday.
+    """
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: '{expression}'")
+
+        self.expression = expression
+        parsed = [_parse_field(f, low, high) for f, (_, low, high) in zip(fields, CRON_FIELDS)]
+        self.minutes, self.hours, self.days, self.months, self.weekdays = parsed
+        self._day_restricted = not fields[2].startswith("*")
+        self._weekday_restricted = not fields[4].startswith("*")
+
+    def _day_matches(self, dt: datetime) -> bool:
+        # datetime.weekday() is Monday=0, cron is Sunday=0
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def matches(self, dt: datetime) -> bool:
+        return (dt.minute in self.minutes and dt.hour in self.hours
+                and dt.month in self.months and self._day_matches(dt))
+
+    def next_after(self, dt: datetime) -> datetime:
+        """
+        Returns the first matching minute strictly after `dt`.
+
+        Skips whole months, days and hours that cannot match instead of testing
+        every minute.
+        """
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = (candidate.year + 1, 1) if candidate.month == 12 else (candidate.year, candidate.month + 1)
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
@@ -0,0 +1,204 @@
+import fcntl
+import json
+import logging
+import os
+import signal
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Callable, Optional
+
+from internal_data_automation.utils.scheduler import CronSchedule
+
+
+class ScheduledJob:
+    """
+    A pipeline invocation triggered by a cron schedule.
+
+    `options` holds the per-job overrides (sources, skip flags) passed to the runner.
+    """
+    def __init__(self, name: str, cron: str, options: Dict[str, Any]):
+        self.name = name
+        self.schedule = CronSchedule(cron)
+        self.options = options
+        self.next_run_at: Optional[datetime] = None
+        self.last_run_at: Optional[str] = None
+        self.last_status: Optional[str] = None
+        self.runs = 0
+        self.failures = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "cron": self.schedule.expression,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "last_run_at": self.last_run_at,
+            "last_status": self.last_status,
+            "runs": self.runs,
+            "failures": self.failures,
+        }
+
+
+class InstanceLock:
+    """
+    Exclusive, non-blocking flock on a lock file so only one service instance runs per host/volume.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        lock_dir = os.path.dirname(self.path)
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class PipelineService:
+    """
+    Long-running scheduler that executes pipeline jobs in-process.
+
+    Jobs run one at a time in the main thread, so everything the runner keeps
+    between calls (HTTP session, database, AWS clients, log handlers) stays warm.
+    SIGTERM/SIGINT stop the service after the job in progress has finished.
+    """
+    def __init__(self, config: Dict[str, Any], logger: logging.Logger,
+                 run_job: Callable[[ScheduledJob], bool]):
+        """
+        Args:
+            config: Configuration dictionary (uses the `service` section).
+            logger: Logger instance.
+            run_job: Callback executing one job, returning True on success.
+        """
+        service_config = config.get("service", {})
+        self.logger = logger
+        self.run_job = run_job
+        self.lock = InstanceLock(service_config.get("lock_file", "data/pipeline.lock"))
+        self.health_host = service_config.get("health_host", "0.0.0.0")
+        self.health_port = service_config.get("health_port", 8080)
+        self.jobs: List[ScheduledJob] = [
+            ScheduledJob(
+                job["name"],
+                job["cron"],
+                {k: v for k, v in job.items() if k not in ("name", "cron")}
+            )
+            for job in service_config.get("jobs", [])
+        ]
+        self.started_at = datetime.now().isoformat()
+        self.current_job: Optional[str] = None
+        self._stop = threading.Event()
+        self._health_server: Optional[ThreadingHTTPServer] = None
+
+    def health(self) -> Dict[str, Any]:
+        """Returns the service status served by the health endpoint."""
+        return {
+            "status": "stopping" if self._stop.is_set() else "ok",
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "current_job": self.current_job,
+            "jobs": {job.name: job.to_dict() for job in self.jobs},
+        }
+
+    def _start_health_server(self):
+        service = self
+
+        class HealthHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("/health", ""):
+                    self.send_error(404)
+                    return
+                payload = service.health()
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200 if payload["status"] == "ok" else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                service.logger.debug("Health endpoint: " + format, *args)
+
+        self._health_server = ThreadingHTTPServer((self.health_host, self.health_port), HealthHandler)
+        threading.Thread(target=self._health_server.serve_forever, name="health", daemon=True).start()
+        self.logger.info("Health endpoint listening on http://%s:%s/health", self.health_host, self.health_port)
+
+    def request_stop(self, signum=None, frame=None):
+        """Signal handler: finish the running job, then exit the loop."""
+        if not self._stop.is_set():
+            self.logger.info("Received signal %s, shutting down after the current job", signum)
+        self._stop.set()
+
+    def serve(self) -> int:
+        """
+        Runs the scheduler loop until a stop signal arrives.
+
+        Returns:
+            Process exit code.
+        """
+        if not self.jobs:
+            self.logger.error("No jobs configured under service.jobs, nothing to schedule.")
+            return 1
+
+        if not self.lock.acquire():
+            self.logger.error("Another pipeline service holds %s. Exiting.", self.lock.path)
+            return 1
+
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        try:
+            if self.health_port:
+                self._start_health_server()
+
+            now = datetime.now()
+            for job in self.jobs:
+                job.next_run_at = job.schedule.next_after(now)
+                self.logger.info("Scheduled job %s (%s), next run at %s",
+                                 job.name, job.schedule.expression, job.next_run_at)
+
+            while not self._stop.is_set():
+                job = min(self.jobs, key=lambda j: j.next_run_at)
+                delay = (job.next_run_at - datetime.now()).total_seconds()
+                if delay > 0 and self._stop.wait(timeout=delay):
+                    break
+
+                self.current_job = job.name
+                job.last_run_at = datetime.now().isoformat()
+                self.logger.info("Starting scheduled job %s", job.name)
+                try:
+                    ok = self.run_job(job)
+                except Exception as e:
+                    self.logger.error("Scheduled job %s raised: %s", job.name, e)
+                    ok = False
+                self.current_job = None
+                job.runs += 1
+                job.last_status = "SUCCESS" if ok else "FAILED"
+                if not ok:
+                    job.failures += 1
+
+                # Runs missed while this job was executing are skipped, not replayed
+                job.next_run_at = job.schedule.next_after(max(datetime.now(), job.next_run_at))
+                self.logger.info("Job %s finished with %s, next run at %s",
+                                 job.name, job.last_status, job.next_run_at)
+        finally:
+            if self._health_server:
+                self._health_server.shutdown()
+                self._health_server.server_close()
+            self.lock.release()
+            self.logger.info("Pipeline service stopped")
+
+        return 0
@@ -6,19 +6,22 @@ sys.path.append(os.getcwd())
 
 import argparse
 import sys
+import time
 import uuid
 from datetime import datetime
+from functools import partial
+from importlib import import_module
 from internal_data_automation.utils.config_loader import load_config
-from internal_data_automation.utils.logger import setup_logger
-from internal_data_automation.ingestion.market_api import fetch_market_data
-from internal_data_automation.ingestion.news_api import fetch_news_data
-from internal_data_automation.processing.market_cleaner import clean_market_data
-from internal_data_automation.processing.news_cleaner import clean_news_data
+from internal_data_automation.utils.logger import setup_logger, shutdown_logger
 from internal_data_automation.storage.database import Database
-from internal_data_automation.reporting.report_generator import generate_reports
 from internal_data_automation.utils.validators import validate_production_requirements
+from internal_data_automation.utils.metrics import MetricsCollector, file_size, write_prometheus_textfile
+from internal_data_automation.utils.dag import Stage, DagExecutor
+from internal_data_automation.utils.checkpoint import fingerprint, artifact_files, is_checkpoint_valid
 
-def parse_arguments():
+SOURCES = ("market", "news")
+
+def parse_arguments(argv=None):
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Run the Internal Data Automation Pipeline.")
     
@@ -52,8 +55,69 @@ def parse_arguments():
         action="store_true", 
         help="Skip the reporting stage."
     )
-    
-    return parser.parse_args()
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume the last run for --date from its first incomplete stage, reusing completed outputs."
+    )
+
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        choices=SOURCES,
+        default=list(SOURCES),
+        help="Data sources to run (default: all)."
+    )
+
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a resident service executing the jobs scheduled under 'service' in config.yaml."
+    )
+
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Run as a market ingestion worker sharing the symbols under 'work_queue' with other workers."
+    )
+
+    parser.add_argument(
+        "--worker-id",
+        type=str,
+        default=None,
+        help="Unique worker name recorded on its leases (default: <hostname>-<pid>)."
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each stage (cProfile and tracemalloc) into logs/profiles/<run_id>/. Stages run sequentially."
+    )
+
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=25,
+        help="Number of allocation sites and functions reported per profiled stage (default: 25)."
+    )
+
+    parser.add_argument(
+        "--retention",
+        action="store_true",
+        help="Apply the retention policy under 'retention' in config.yaml as of --date instead of running the pipeline."
+    )
+
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --retention: only report what would be bundled, deleted and pruned, and the space reclaimed."
+    )
+
+    args = parser.parse_args(argv)
+    if args.dry_run and not args.retention:
+        parser.error("--dry-run requires --retention")
+    return args
 
 def validate_date(date_str):
     """Validate that the date string matches YYYY-MM-DD format."""
@@ -63,18 +127,480 @@ def validate_date(date_str):
     except ValueError:
         return False
 
-def check_ingestion_success(date_str):
-    """Checks if ingestion was successful by looking for output files."""
-    market_file = os.path.join("data", "raw", f"market_{date_str}.json")
-    news_file = os.path.join("data", "raw", f"news_{date_str}.json")
-    return os.path.exists(market_file) and os.path.exists(news_file)
+def lazy(module_name, attr):
+    """
+    Returns a callable that imports `module_name` on first call and forwards to `attr`.
+
+    Stage modules (and their heavy dependencies such as requests or boto3) are
+    only loaded when a stage that needs them actually runs.
+    """
+    def call(*args, **kwargs):
+        return getattr(import_module(module_name), attr)(*args, **kwargs)
+    return call
+
+def load_news_url_filter(config, logger, db):
+    """
+    Loads the Bloom filter of stored news URLs (news_api.url_filter), or builds it
+    from news_data when the file is missing, unreadable or sized differently.
+
+    Returns:
+        The filter, or None if no filter path is configured.
+    """
+    filter_config = config.get("news_api", {}).get("url_filter") or {}
+    path = filter_config.get("path")
+    if not path:
+        return None
+    from internal_data_automation.utils.bloom import RotatingBloomFilter
+
+    capacity = filter_config.get("capacity", 200000)
+    error_rate = filter_config.get("error_rate", 0.001)
+    if os.path.exists(path):
+        try:
+            url_filter = RotatingBloomFilter.load(path)
+            if (url_filter.capacity, url_filter.error_rate) == (capacity, error_rate):
+                logger.info("Loaded news URL filter from %s (%s URLs)", path, len(url_filter))
+                return url_filter
+            logger.info("News URL filter settings changed, rebuilding %s", path)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load news URL filter %s, rebuilding it: %s", path, e)
+
+    url_filter = RotatingBloomFilter(capacity, error_rate)
+    url_filter.update(db.news_urls(capacity))
+    logger.info("Built news URL filter from %s stored URLs", len(url_filter))
+    try:
+        url_filter.save(path)
+    except OSError as e:
+        logger.warning("Could not save news URL filter %s: %s", path, e)
+    return url_filter
+
+def build_stages(config, logger, db, args, app_mode, date_str, metrics, url_filter=None):
+    """
+    Builds the pipeline stage DAG for a run.
+
+    Skipped stages stay in the graph as no-ops so dependencies still resolve.
+    `url_filter` (see load_news_url_filter) lets the news cleaner drop articles
+    stored by earlier runs; it is updated with the URLs each run stores.
+    """
+    db_path = db.db_path
+
+    def ingest(source, fetch):
+        def run(results):
+            if args.skip_ingestion:
+                logger.info("Skipping %s ingestion stage.", source)
+                return None
+            logger.info("Starting %s ingestion for date: %s", source, date_str)
+            raw_file = os.path.join("data", "raw", f"{source}_{date_str}.json")
+            with metrics.stage(f"ingest_{source}") as m:
+                fetch(config, logger, date_str)
+                m.bytes_written = file_size(raw_file)
+            logger.info("%s ingestion completed", source.capitalize())
+
+            # Additional Production Check: Verify Ingestion Output
+            if app_mode == "production" and not os.path.exists(raw_file):
+                error_msg = f"Production Failure: Ingestion failed to produce expected {source} data file."
+                logger.error(error_msg)
+                raise RuntimeError(error_msg)
+            return raw_file if os.path.exists(raw_file) else None
+        return run
+
+    def clean(source, cleaner):
+        def run(results):
+            if args.skip_processing:
+                logger.info("Skipping %s processing stage.", source)
+                return []
+            logger.info("Starting %s processing...", source)
+            with metrics.stage(f"clean_{source}") as m:
+                records = cleaner(logger, date_str)
+                m.bytes_read = file_size(os.path.join("data", "raw", f"{source}_{date_str}.json"))
+                m.records_out = len(records)
+            logger.info("Processed %s %s records", len(records), source)
+            return records
+        return run
+
+    validate_records = lazy("internal_data_automation.processing.data_quality", "validate_records")
+
+    def validate(source):
+        def run(results):
+            records = results[f"clean_{source}"]
+            if args.skip_processing:
+                return records
+            with metrics.stage(f"validate_{source}") as m:
+                report = validate_records(config, logger, source, records)
+                db.record_data_quality(metrics.run_id, date_str, source, report.results, report.quarantined)
+                m.records_in = len(records)
+                m.records_out = len(report.valid)
+            return report.valid
+        return run
+
+    def store(source, insert, on_stored=None):
+        def run(results):
+            if args.skip_storage:
+                logger.info("Skipping %s storage stage.", source)
+                return 0
+            records = results[f"validate_{source}"]
+            logger.info("Starting %s storage...", source)
+            with metrics.stage(f"store_{source}") as m:
+                # DB file growth is shared by concurrent writers, so it is only an approximation per stage
+                db_size_before = file_size(db_path)
+                inserted = insert(records)
+                m.records_in = len(records)
+                m.records_out = inserted
+                m.bytes_written = max(file_size(db_path) - db_size_before, 0)
+            if inserted:
+                # Invalidates query service caches of this table
+                db.bump_data_generation(f"{source}_data")
+            if on_stored:
+                on_stored(records)
+            logger.info("%s storage completed", source.capitalize())
+            return inserted
+        return run
+
+    cluster_news_data = lazy("internal_data_automation.processing.news_cleaner", "cluster_news_data")
+
+    def cluster_news(results):
+        if args.skip_processing:
+            logger.info("Skipping news clustering stage.")
+            return 0
+        with metrics.stage("cluster_news") as m:
+            stats = cluster_news_data(config, logger, db_path)
+            m.records_in = stats["clustered"]
+            m.records_out = stats["clustered"] - stats["duplicates"]
+        if stats["clustered"]:
+            db.bump_data_generation("news_data")
+        return stats["clustered"]
+
+    generate_reports = lazy("internal_data_automation.reporting.report_generator", "generate_reports")
+
+    def report(results):
+        if args.skip_reporting:
+            logger.info("Skipping reporting stage.")
+            return []
+        logger.info("Starting reporting stage...")
+        with metrics.stage("report") as m:
+            generated_reports = generate_reports(config, logger, date_str) or []
+            m.records_out = len(generated_reports)
+            m.bytes_written = sum(file_size(p) for p in generated_reports)
+        logger.info("Reporting stage completed")
+        return generated_reports
+
+    def upload(results):
+        # --- S3 Upload (Production Only) ---
+        generated_reports = results["report"]
+        if app_mode != "production" or args.skip_reporting:
+            return []
+
+        logger.info("Starting S3 upload...")
+        aws_config = config.get("aws", {})
+        bucket_name = aws_config.get("s3_bucket_name")
+        s3_prefix = aws_config.get("s3_prefix", "internal-data-automation")
+
+        from internal_data_automation.utils.aws_utils import upload_file_to_s3
+
+        uploaded = []
+        with metrics.stage("upload") as m:
+            for report_path in generated_reports:
+                if report_path and os.path.exists(report_path):
+                    file_name = os.path.basename(report_path)
+                    object_name = f"{s3_prefix}/{date_str}/{file_name}"
+                    logger.info("Uploading %s to s3://%s/%s", file_name, bucket_name, object_name)
+
+                    m.records_in += 1
+                    m.bytes_read += file_size(report_path)
+                    success = upload_file_to_s3(report_path, bucket_name, object_name)
+                    if not success:
+                        error_msg = f"Failed to upload {file_name} to S3."
+                        logger.error(error_msg)
+                        raise RuntimeError(error_msg)
+                    m.records_out += 1
+                    uploaded.append(object_name)
+        logger.info("S3 upload completed successfully")
+        return uploaded
+
+    def checkpointed(stage, skipped):
+        """Records a checkpoint for the stage after it completes (unless skipped)."""
+        func = stage.func
+
+        def run(results):
+            result = func(results)
+            # A persistent stage returning None produced nothing worth reusing
+            if not skipped and not (stage.persistent and result is None):
+                # In-memory outputs are never restored, only their completion matters
+                artifact = result if stage.persistent else None
+                files = artifact_files(artifact)
+                db.record_stage_checkpoint(
+                    date_str, stage.name, metrics.run_id, fingerprint(artifact, files), artifact, files
+                )
+            return result
+
+        stage.func = run
+        return stage
+
+    clean_news = lazy("internal_data_automation.processing.news_cleaner", "clean_news_data")
+    if url_filter is not None:
+        filter_config = config.get("news_api", {}).get("url_filter", {})
+        confirm = db.existing_news_urls if filter_config.get("confirm_hits", True) else None
+        clean_news = partial(clean_news, seen_urls=url_filter, confirm_seen=confirm)
+
+        def remember_news_urls(records):
+            added = url_filter.update(r.get("url") for r in records)
+            if added:
+                try:
+                    url_filter.save(filter_config["path"])
+                except OSError as e:
+                    logger.warning("Could not save news URL filter: %s", e)
+                logger.info("Added %s URLs to the news URL filter (%s total)", added, len(url_filter))
+    else:
+        remember_news_urls = None
+
+    upload_skipped = app_mode != "production" or args.skip_reporting
+    branches = {
+        "market": (
+            lazy("internal_data_automation.ingestion.market_api", "fetch_market_data"),
+            lazy("internal_data_automation.processing.market_cleaner", "clean_market_data"),
+            db.insert_market_data,
+            None
+        ),
+        "news": (
+            lazy("internal_data_automation.ingestion.news_api", "fetch_news_data"),
+            clean_news,
+            db.insert_news_data,
+            remember_news_urls
+        ),
+    }
+    stages = []
+    for source in args.sources:
+        fetch, cleaner, insert, on_stored = branches[source]
+        stages += [
+            checkpointed(Stage(f"ingest_{source}", ingest(source, fetch)), args.skip_ingestion),
+            checkpointed(Stage(f"clean_{source}", clean(source, cleaner), deps=[f"ingest_{source}"],
+                               persistent=False), args.skip_processing),
+            # Rows failing data quality rules are quarantined instead of stored
+            checkpointed(Stage(f"validate_{source}", validate(source), deps=[f"clean_{source}"],
+                               persistent=False), args.skip_processing),
+            checkpointed(Stage(f"store_{source}", store(source, insert, on_stored), deps=[f"validate_{source}"]),
+                         args.skip_storage),
+        ]
+    report_deps = [f"store_{source}" for source in args.sources]
+    if "news" in args.sources:
+        # Near-duplicate clusters of stored articles, so reports can collapse syndicated copies
+        stages.append(checkpointed(Stage("cluster_news", cluster_news, deps=["store_news"]),
+                                   args.skip_processing))
+        report_deps.append("cluster_news")
+    stages += [
+        checkpointed(Stage("report", report, deps=report_deps), args.skip_reporting),
+        checkpointed(Stage("upload", upload, deps=["report"]), upload_skipped),
+    ]
+    return stages
+
+def restore_checkpoints(db, executor, date_str, logger):
+    """
+    Loads valid stage checkpoints of a previous run for the same date.
+
+    Returns:
+        Results of the stages that can be reused, keyed by stage name.
+    """
+    checkpoints = db.get_stage_checkpoints(date_str)
+    valid = set()
+    for name, checkpoint in checkpoints.items():
+        if is_checkpoint_valid(checkpoint):
+            valid.add(name)
+        else:
+            logger.warning("Checkpoint for stage %s no longer matches its output, stage will re-run", name)
+
+    reusable = executor.plan_resume(valid)
+    for name in executor.order:
+        if name in reusable:
+            logger.info("Resume: reusing stage %s completed by run %s at %s",
+                        name, checkpoints[name]["run_id"], checkpoints[name]["completed_at"])
+    rerun = [name for name in executor.order if name not in reusable]
+    logger.info("Resume: stages to run: %s", ", ".join(rerun) if rerun else "none")
+
+    return {name: checkpoints[name]["artifact"] for name in reusable}
+
+def publish_metrics(config, logger, db, metrics, run_status):
+    """Persists per-stage metrics to the database and the Prometheus textfile."""
+    if not metrics.stages:
+        return
+
+    stages = metrics.to_list()
+    for s in stages:
+        logger.info(
+            "Stage %s: %s in %.3fs wall / %.3fs CPU, records %s -> %s, bytes read %s, written %s, HTTP requests %s",
+            s['stage'], s['status'], s['wall_seconds'], s['cpu_seconds'], s['records_in'], s['records_out'],
+            s['bytes_read'], s['bytes_written'], s['http_requests']
+        )
+
+    if db:
+        db.insert_stage_metrics(metrics.run_id, stages)
+
+    textfile_path = config.get("metrics", {}).get("prometheus_textfile")
+    if textfile_path:
+        try:
+            write_prometheus_textfile(textfile_path, metrics, run_status, time.time())
+        except OSError as e:
+            logger.error("Failed to write Prometheus textfile %s: %s", textfile_path, e)
+
+def run_pipeline(config, logger, db, app_mode, args, run_id=None, url_filter=None):
+    """
+    Executes one pipeline run and records it in pipeline_runs.
+
+    Args:
+        config: Configuration dictionary.
+        logger: Logger instance.
+        db: Database used for the audit trail, checkpoints and storage.
+        app_mode: "production" or "development".
+        args: Parsed run options (date, skip flags, resume, sources).
+        run_id: Optional pre-generated run id.
+        url_filter: Bloom filter of stored news URLs (see load_news_url_filter).
+
+    Returns:
+        True if the run succeeded.
+    """
+    run_id = run_id or str(uuid.uuid4())
+    started_at = datetime.now().isoformat()
+
+    profiler = None
+    if args.profile:
+        from internal_data_automation.utils.profiling import StageProfiler
+        log_dir = os.path.dirname(config.get("logging", {}).get("file", "logs/pipeline.log"))
+        profiler = StageProfiler(os.path.join(log_dir, "profiles", run_id), top_n=args.profile_top)
+        logger.info("Profiling enabled, writing stage profiles to %s", profiler.output_dir)
+
+    metrics = MetricsCollector(run_id, profiler=profiler)
+    run_status = "FAILED"
+    logger.info("Pipeline run %s started", run_id)
+
+    try:
+        # Record Pipeline Start
+        db.start_pipeline_run(run_id, args.date, app_mode, started_at)
+
+        # Validate Date
+        if not validate_date(args.date):
+            error_msg = f"Invalid date format: {args.date}. Expected YYYY-MM-DD."
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+            
+        date_str = args.date
+        logger.info("Pipeline run date: %s", date_str)
+
+        # Enforce Production Rules: Ingestion cannot be skipped
+        if app_mode == "production" and args.skip_ingestion:
+            error_msg = "Production Violation: Ingestion cannot be skipped in production mode."
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+
+        # Market and news branches are independent and run concurrently;
+        # reporting waits for both storage stages.
+        stages = build_stages(config, logger, db, args, app_mode, date_str, metrics, url_filter)
+        max_workers = config.get("pipeline", {}).get("max_workers", 4)
+        if profiler:
+            # Profilers can't tell concurrent stages apart
+            max_workers = 1
+        executor = DagExecutor(stages, logger, max_workers=max_workers)
+
+        # Resume reuses the outputs of stages completed by an earlier run for this date,
+        # a regular run starts over and invalidates them.
+        preloaded = {}
+        if args.resume:
+            preloaded = restore_checkpoints(db, executor, date_str, logger)
+        else:
+            db.clear_stage_checkpoints(date_str, executor.order)
+
+        executor.run(preloaded)
+
+        # Record Success
+        finished_at = datetime.now().isoformat()
+        db.mark_pipeline_success(run_id, finished_at)
+        logger.info("Pipeline run %s marked SUCCESS", run_id)
+        run_status = "SUCCESS"
+        
+    except Exception as e:
+        error_message = str(e)
+        finished_at = datetime.now().isoformat()
+        logger.error("Pipeline run %s failed: %s", run_id, error_message)
+            
+        # Record Failure in DB
+        try:
+            db.mark_pipeline_failure(run_id, finished_at, error_message)
+            logger.info("Pipeline run %s marked FAILED", run_id)
+        except Exception as db_e:
+            logger.error("Failed to record pipeline failure in DB: %s", db_e)
+    finally:
+        publish_metrics(config, logger, db, metrics, run_status)
+        if profiler:
+            for s in profiler.stages:
+                logger.info("Profile %s: %.3fs, peak memory %.2f MiB",
+                            s['stage'], s['wall_seconds'], s['peak_memory_bytes'] / 1024 / 1024)
+            logger.info("Profile summary written to %s", profiler.write_summary())
+
+    return run_status == "SUCCESS"
+
+def run_worker(config, logger, db, app_mode, args, run_id):
+    """
+    Executes one work-queue worker session for --date and records it in pipeline_runs.
+
+    Returns:
+        True if every symbol of the date ended up DONE (by this or another worker).
+    """
+    from internal_data_automation.ingestion.work_queue import run_market_worker
+
+    started_at = datetime.now().isoformat()
+    metrics = MetricsCollector(run_id)
+    run_status = "FAILED"
+    logger.info("Worker run %s started", run_id)
+
+    try:
+        db.start_pipeline_run(run_id, args.date, app_mode, started_at)
+        if not validate_date(args.date):
+            raise ValueError(f"Invalid date format: {args.date}. Expected YYYY-MM-DD.")
+
+        with metrics.stage("work_queue_market") as m:
+            summary = run_market_worker(config, logger, db, args.date, args.worker_id, run_id=run_id)
+            m.records_in = summary["completed"] + summary["released"] + summary["lost_leases"]
+            m.records_out = summary["records"]
+
+        failed = summary["progress"].get("FAILED", 0)
+        if failed:
+            raise RuntimeError(f"{failed} symbols failed for {args.date}, see the work queue (last_error)")
+
+        db.mark_pipeline_success(run_id, datetime.now().isoformat())
+        logger.info("Worker run %s marked SUCCESS", run_id)
+        run_status = "SUCCESS"
+    except Exception as e:
+        logger.error("Worker run %s failed: %s", run_id, e)
+        try:
+            db.mark_pipeline_failure(run_id, datetime.now().isoformat(), str(e))
+        except Exception as db_e:
+            logger.error("Failed to record worker failure in DB: %s", db_e)
+    finally:
+        publish_metrics(config, logger, db, metrics, run_status)
+
+    return run_status == "SUCCESS"
+
+def run_retention_job(config, logger, db, args):
+    """Applies the retention policy (utils/retention.py) as of --date."""
+    if not validate_date(args.date):
+        logger.error("Invalid date format: %s. Expected YYYY-MM-DD.", args.date)
+        return False
+    from internal_data_automation.utils.retention import run_retention
+    run_retention(config, logger, db, today=datetime.strptime(args.date, "%Y-%m-%d").date(),
+                  dry_run=args.dry_run)
+    return True
+
+def job_arguments(job):
+    """Builds run options for a scheduled service job (today's date plus job overrides)."""
+    args = parse_arguments([])
+    for key, value in job.options.items():
+        setattr(args, key, value)
+    return args
 
 def main():
     args = parse_arguments()
     run_id = str(uuid.uuid4())
-    started_at = datetime.now().isoformat()
     db = None
+    url_filter = None
     app_mode = "development" # Default
+    exit_code = 0
     
     try:
         # Load configuration
@@ -82,11 +608,18 @@ def main():
         
         # Initialize logger
         log_level = config.get("log_level", "INFO")
-        logger = setup_logger(level=log_level)
+        log_config = config.get("logging", {})
+        logger = setup_logger(
+            log_file=log_config.get("file", "logs/pipeline.log"),
+            level=log_level,
+            use_queue=log_config.get("queue", False),
+            json_log_file=log_config.get("json_file"),
+            max_bytes=log_config.get("max_bytes", 0),
+            backup_count=log_config.get("backup_count", 0)
+        )
         
         logger.info("Pipeline initialized successfully")
-        logger.info(f"Loaded configuration for app: {config.get('app_name')}")
-        logger.info(f"Pipeline run {run_id} started")
+        logger.info("Loaded configuration for app: %s", config.get('app_name'))
         
         # Determine Execution Mode
         app_mode = config.get("app", {}).get("mode", "development")
@@ -103,143 +636,69 @@ def main():
                 import socket
                 hostname = socket.gethostname()
                 log_stream_prefix = aws_config.get("cloudwatch_log_stream_prefix", "pipeline-run")
-                log_stream_name = f"{log_stream_prefix}-{hostname}-{args.date}-{run_id}"
+                if args.serve:
+                    # One stream per service process, shared by all scheduled runs
+                    log_stream_name = f"{log_stream_prefix}-{hostname}-service-{datetime.now():%Y%m%dT%H%M%S}"
+                else:
+                    log_stream_name = f"{log_stream_prefix}-{hostname}-{args.date}-{run_id}"
                 
                 from internal_data_automation.utils.logger import add_cloudwatch_handler
                 add_cloudwatch_handler(logger, log_group, log_stream_name)
-                logger.info(f"CloudWatch logging enabled: Group={log_group}, Stream={log_stream_name}")
+                logger.info("CloudWatch logging enabled: Group=%s, Stream=%s", log_group, log_stream_name)
         else:
             logger.info("Running in DEVELOPMENT mode")
 
         # Initialize Database EARLY for audit logging
         db_path = config.get("storage", {}).get("database_path", "data/internal_data.db")
-        db = Database(db_path, logger)
-        
-        # Record Pipeline Start
-        db.start_pipeline_run(run_id, args.date, app_mode, started_at)
+        market_symbol = config.get("alpha_vantage", {}).get("symbol", "SPY")
+        storage_config = config.get("storage", {})
+        db = Database(db_path, logger, keep_connection=args.serve, market_symbol=market_symbol,
+                      market_write_mode=storage_config.get("market_write_mode", "insert"),
+                      journal_mode=storage_config.get("journal_mode", "auto"))
 
-        # Validate Date
-        if not validate_date(args.date):
-            error_msg = f"Invalid date format: {args.date}. Expected YYYY-MM-DD."
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-            
-        date_str = args.date
-        logger.info(f"Pipeline run date: {date_str}")
-
-        # Ingestion Stage
-        skip_ingestion = args.skip_ingestion
-        
-        # Enforce Production Rules: Ingestion cannot be skipped
-        if app_mode == "production" and skip_ingestion:
-            error_msg = "Production Violation: Ingestion cannot be skipped in production mode."
-            logger.error(error_msg)
-            raise RuntimeError(error_msg)
-
-        if not skip_ingestion:
-            logger.info(f"Starting ingestion for date: {date_str}")
-            fetch_market_data(config, logger, date_str)
-            fetch_news_data(config, logger, date_str)
-            logger.info("Ingestion stage completed")
-            
-            # Additional Production Check: Verify Ingestion Output
-            if app_mode == "production":
-                if not check_ingestion_success(date_str):
-                    error_msg = "Production Failure: Ingestion failed to produce expected data files."
-                    logger.error(error_msg)
-                    raise RuntimeError(error_msg)
-        else:
-            logger.info("Skipping ingestion stage.")
-
-        # Processing Stage
-        market_records = []
-        news_records = []
-        
-        if not args.skip_processing:
-            logger.info("Starting processing stage...")
-            market_records = clean_market_data(logger, date_str)
-            logger.info(f"Processed {len(market_records)} market records")
-            news_records = clean_news_data(logger, date_str)
-            logger.info(f"Processed {len(news_records)} news records")
-            logger.info("Processing stage completed")
-        else:
-             logger.info("Skipping processing stage.")
-
-        # Storage Stage
-        if not args.skip_storage:
-            logger.info("Starting storage stage...")
-            # DB is already initialized
-            
-            # Only insert if we have records or if we didn't skip processing but got 0 records
-            db.insert_market_data(market_records)
-            db.insert_news_data(news_records)
-            logger.info("Storage stage completed")
-        else:
-            logger.info("Skipping storage stage.")
-
-        # Reporting Stage
-        # Reporting Stage
-        if not args.skip_reporting:
-            logger.info("Starting reporting stage...")
-            generated_reports = generate_reports(config, logger, date_str)
-            logger.info("Reporting stage completed")
-            
-            # --- S3 Upload (Production Only) ---
-            if app_mode == "production":
-                logger.info("Starting S3 upload...")
-                aws_config = config.get("aws", {})
-                bucket_name = aws_config.get("s3_bucket_name")
-                s3_prefix = aws_config.get("s3_prefix", "internal-data-automation")
-                
-                from internal_data_automation.utils.aws_utils import upload_file_to_s3
-                
-                for report_path in generated_reports:
-                    if report_path and os.path.exists(report_path):
-                        file_name = os.path.basename(report_path)
-                        object_name = f"{s3_prefix}/{date_str}/{file_name}"
-                        logger.info(f"Uploading {file_name} to s3://{bucket_name}/{object_name}")
-                        
-                        success = upload_file_to_s3(report_path, bucket_name, object_name)
-                        if not success:
-                            error_msg = f"Failed to upload {file_name} to S3."
-                            logger.error(error_msg)
-                            raise RuntimeError(error_msg)
-                logger.info("S3 upload completed successfully")
-        else:
-            logger.info("Skipping reporting stage.")
-            
-        # Record Success
-        finished_at = datetime.now().isoformat()
-        if db:
-            db.mark_pipeline_success(run_id, finished_at)
-        logger.info(f"Pipeline run {run_id} marked SUCCESS")
+        # Known news URLs, loaded once (and kept across runs in service mode)
+        if not args.worker and not args.retention and (args.serve or "news" in args.sources):
+            url_filter = load_news_url_filter(config, logger, db)
         
     except Exception as e:
-        # Check if it was a system exit from argument parsing or other
-        if isinstance(e, SystemExit):
-            raise
-            
-        error_message = str(e)
-        finished_at = datetime.now().isoformat()
-        
         # Log error
         if 'logger' in locals():
-            logger.error(f"Pipeline run {run_id} failed: {error_message}")
+            logger.error("Pipeline run %s failed: %s", run_id, e)
         else:
             print(f"Error initializing pipeline: {e}")
-            
-        # Record Failure in DB
+        exit_code = 1
+
+    try:
+        if exit_code == 0 and args.serve:
+            from internal_data_automation.utils.service import PipelineService
+
+            def run_job(job):
+                job_args = job_arguments(job)
+                if job_args.retention:
+                    return run_retention_job(config, logger, db, job_args)
+                return run_pipeline(config, logger, db, app_mode, job_args, url_filter=url_filter)
+
+            service = PipelineService(config, logger, run_job)
+            exit_code = service.serve()
+        elif exit_code == 0 and args.retention:
+            if not run_retention_job(config, logger, db, args):
+                exit_code = 1
+        elif exit_code == 0 and args.worker:
+            if not run_worker(config, logger, db, app_mode, args, run_id):
+                exit_code = 1
+        elif exit_code == 0:
+            if not run_pipeline(config, logger, db, app_mode, args, run_id, url_filter=url_filter):
+                exit_code = 1
+    finally:
         if db:
-            try:
-                db.mark_pipeline_failure(run_id, finished_at, error_message)
-                if 'logger' in locals():
-                     logger.info(f"Pipeline run {run_id} marked FAILED")
-            except Exception as db_e:
-                 print(f"Failed to record pipeline failure in DB: {db_e}")
-
-        # In Production, we hard exit on failure
-        # In Development, we re-raise (which also exits, but allows traceback visibility if needed)
-        sys.exit(1)
+            db.close()
+        if 'logger' in locals():
+            # Drain queued log records before the interpreter exits
+            shutdown_logger(logger)
+
+    # In Production, we hard exit on failure
+    if exit_code:
+        sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
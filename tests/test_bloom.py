@@ -0,0 +1,88 @@
+import logging
+
+import pytest
+
+from internal_data_automation.utils.bloom import BloomFilter, RotatingBloomFilter
+
+logger = logging.getLogger("test_bloom")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    urls = [f"https://example.com/{n}" for n in range(1000)]
+    for url in urls:
+        bloom.add(url)
+    assert all(url in bloom for url in urls)
+    false_positives = sum(f"https://example.org/{n}" in bloom for n in range(10000))
+    assert false_positives < 300
+
+
+def test_rotating_filter_keeps_two_generations():
+    bloom = RotatingBloomFilter(capacity=100, error_rate=0.001)
+    assert bloom.update(f"a{n}" for n in range(100)) == 100
+    assert bloom.update(f"b{n}" for n in range(100)) == 100
+    assert "a0" in bloom and "b0" in bloom
+    assert not bloom.add("a0")
+
+    bloom.update(f"c{n}" for n in range(100))
+    # The "a" generation was dropped when "c" started
+    assert sum(f"a{n}" in bloom for n in range(100)) < 5
+    assert all(f"c{n}" in bloom for n in range(100))
+
+
+def test_save_load_roundtrip(tmp_path):
+    path = str(tmp_path / "filters" / "news_urls.bloom")
+    bloom = RotatingBloomFilter(capacity=50, error_rate=0.01)
+    bloom.update(f"https://example.com/{n}" for n in range(80))
+    bloom.save(path)
+
+    loaded = RotatingBloomFilter.load(path)
+
+    assert (loaded.capacity, loaded.error_rate, len(loaded)) == (50, 0.01, len(bloom))
+    assert loaded.previous is not None
+    assert all(f"https://example.com/{n}" in loaded for n in range(80))
+
+
+@pytest.mark.parametrize("cut", [0, 4, 10, 14, 30, -1])
+def test_load_rejects_truncated_file(tmp_path, cut):
+    path = str(tmp_path / "news_urls.bloom")
+    bloom = RotatingBloomFilter(capacity=50, error_rate=0.01)
+    bloom.update(["https://example.com/1"])
+    bloom.save(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:cut])
+
+    with pytest.raises(ValueError):
+        RotatingBloomFilter.load(path)
+
+
+@pytest.mark.parametrize("header", [b"not json", b'{"capacity": 10}', b"[1, 2]", b'\xff\xfe',
+                                    b'{"capacity": 0, "error_rate": 0.01, "current_count": 0, "previous_count": null}'])
+def test_load_rejects_corrupt_header(tmp_path, header):
+    path = tmp_path / "news_urls.bloom"
+    path.write_bytes(b"IDABLOOM" + len(header).to_bytes(4, "little") + header)
+
+    with pytest.raises(ValueError):
+        RotatingBloomFilter.load(str(path))
+
+
+class StoredUrls:
+    def news_urls(self, limit):
+        return ["https://example.com/stored"]
+
+
+def test_pipeline_rebuilds_unreadable_filter(tmp_path, caplog):
+    from run_pipeline import load_news_url_filter
+
+    path = tmp_path / "news_urls.bloom"
+    path.write_bytes(b"IDABLOOM\x01")
+    config = {"news_api": {"url_filter": {"path": str(path), "capacity": 50, "error_rate": 0.01}}}
+
+    with caplog.at_level(logging.WARNING, logger="test_bloom"):
+        url_filter = load_news_url_filter(config, logger, StoredUrls())
+
+    assert "https://example.com/stored" in url_filter
+    assert "Could not load news URL filter" in caplog.text
+    assert "https://example.com/stored" in RotatingBloomFilter.load(str(path))
@@ -0,0 +1,91 @@
+import logging
+
+from internal_data_automation.storage.database import Database
+from internal_data_automation.utils.checkpoint import artifact_files, fingerprint, is_checkpoint_valid
+from internal_data_automation.utils.dag import DagExecutor, Stage
+
+logger = logging.getLogger("test_checkpoint")
+
+RUN_DATE = "2026-01-02"
+
+
+def write(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+    return str(path)
+
+
+def test_fingerprint_covers_artifact_and_file_content(tmp_path):
+    path = write(tmp_path / "market_2026-01-02.json", "{}")
+    original = fingerprint(path, [path])
+
+    assert fingerprint(path, [path]) == original
+    assert fingerprint({"rows": 1}, [path]) != original
+
+    write(path, '{"changed": true}')
+    assert fingerprint(path, [path]) != original
+
+
+def test_fingerprint_is_empty_when_a_file_is_missing(tmp_path):
+    path = str(tmp_path / "gone.json")
+    assert fingerprint(path, [path]) == ""
+
+
+def test_artifact_files_keeps_existing_paths_only(tmp_path):
+    path = write(tmp_path / "report.html", "<html/>")
+    assert artifact_files(path) == [path]
+    assert artifact_files([path, str(tmp_path / "missing.csv"), 3]) == [path]
+    assert artifact_files({"path": path}) == []
+    assert artifact_files(None) == []
+
+
+def test_checkpoint_roundtrip_and_invalidation(tmp_path):
+    db = Database(str(tmp_path / "internal_data.db"), logger)
+    path = write(tmp_path / "market_2026-01-02.json", "{}")
+    files = artifact_files(path)
+    db.record_stage_checkpoint(RUN_DATE, "fetch_market", "run-1", fingerprint(path, files), path, files)
+
+    checkpoint = db.get_stage_checkpoints(RUN_DATE)["fetch_market"]
+    assert checkpoint["run_id"] == "run-1"
+    assert checkpoint["artifact"] == path
+    assert is_checkpoint_valid(checkpoint)
+
+    write(path, "[]")
+    assert not is_checkpoint_valid(checkpoint)
+    assert not is_checkpoint_valid(dict(checkpoint, status="STARTED"))
+    assert not is_checkpoint_valid(None)
+
+    db.clear_stage_checkpoints(RUN_DATE, ["fetch_market"])
+    assert db.get_stage_checkpoints(RUN_DATE) == {}
+
+
+def executor():
+    # fetch -> clean (in memory) -> store -> report
+    return DagExecutor([
+        Stage("fetch", lambda r: "raw.json"),
+        Stage("clean", lambda r: [r["fetch"]], deps=["fetch"], persistent=False),
+        Stage("store", lambda r: len(r["clean"]), deps=["clean"]),
+        Stage("report", lambda r: f"report of {r['store']}", deps=["store"]),
+    ], logger)
+
+
+def test_plan_resume_reruns_dependents_of_invalid_stages():
+    dag = executor()
+    assert dag.plan_resume({"fetch", "clean", "store", "report"}) == {"fetch", "clean", "store", "report"}
+    # store must re-run, so its in-memory input has to be rebuilt and report follows
+    assert dag.plan_resume({"fetch", "clean", "report"}) == {"fetch"}
+    # Without fetch nothing downstream can be trusted
+    assert dag.plan_resume({"clean", "store", "report"}) == set()
+
+
+def test_run_skips_preloaded_stages():
+    calls = []
+    dag = DagExecutor([
+        Stage("fetch", lambda r: calls.append("fetch") or "raw.json"),
+        Stage("store", lambda r: calls.append("store") or f"stored {r['fetch']}", deps=["fetch"]),
+    ], logger)
+
+    results = dag.run(preloaded={"fetch": "restored.json"})
+
+    assert calls == ["store"]
+    assert results == {"fetch": "restored.json", "store": "stored restored.json"}
@@ -0,0 +1,129 @@
+import logging
+import math
+from datetime import date, timedelta
+
+from internal_data_automation.processing.data_quality import (
+    check_calendar_gaps, check_ohlc_consistency, check_price_jump, nyse_holidays, to_columns, validate_records
+)
+
+logger = logging.getLogger("test_data_quality")
+
+JUMP = {"max_sigma": 50, "min_history": 20}
+
+
+def sessions(start, count):
+    days, day = [], start
+    while len(days) < count:
+        if day.weekday() < 5 and day not in nyse_holidays(day.year):
+            days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+
+def bars(closes, symbol="SPY", start=date(2026, 1, 2)):
+    # Newest first, as Alpha Vantage lists them
+    return [
+        {"symbol": symbol, "date": day, "open": close, "high": close * 1.01, "low": close * 0.99,
+         "close": close, "volume": 1000}
+        for day, close in reversed(list(zip(sessions(start, len(closes)), closes)))
+    ]
+
+
+def series(count=40):
+    return [100 * (1 + 0.01 * math.sin(k)) for k in range(count)]
+
+
+def flagged_dates(records):
+    columns = to_columns(records)
+    return sorted(columns["date"][i] for i in check_price_jump(columns, JUMP, len(records)))
+
+
+def dates_of(records, *positions):
+    ordered = sorted(r["date"] for r in records)
+    return sorted(ordered[p] for p in positions)
+
+
+def test_price_jump_accepts_smooth_series():
+    assert flagged_dates(bars(series())) == []
+
+
+def test_price_jump_flags_spike_not_the_bar_after_it():
+    closes = series()
+    closes[10] *= 10
+    records = bars(closes)
+    assert flagged_dates(records) == dates_of(records, 10)
+
+
+def test_price_jump_flags_bad_first_bar_only():
+    closes = series()
+    closes[0] = 1000.0
+    records = bars(closes)
+    assert flagged_dates(records) == dates_of(records, 0)
+
+
+def test_price_jump_flags_bad_last_bar():
+    closes = series()
+    closes[-1] = 5.0
+    records = bars(closes)
+    assert flagged_dates(records) == dates_of(records, len(closes) - 1)
+
+
+def test_price_jump_flags_only_the_start_of_a_level_shift():
+    closes = [close * (3 if k >= 20 else 1) for k, close in enumerate(series())]
+    records = bars(closes)
+    assert flagged_dates(records) == dates_of(records, 20)
+
+
+def test_price_jump_needs_history_per_symbol():
+    closes = series(10)
+    closes[5] *= 10
+    assert flagged_dates(bars(closes)) == []
+
+
+def test_ohlc_consistency():
+    records = [
+        {"open": 10, "high": 11, "low": 9, "close": 10.5},
+        {"open": 10, "high": 9.5, "low": 9, "close": 10.5},   # high below close
+        {"open": 10, "high": 11, "low": 0, "close": 10.5},    # non-positive low
+        {"open": None, "high": 11, "low": 9, "close": 10.5},  # left to not_null
+    ]
+    assert check_ohlc_consistency(to_columns(records), {}, len(records)) == {1, 2}
+
+
+def test_nyse_holidays_observance():
+    holidays = nyse_holidays(2026)
+    assert date(2026, 4, 3) in holidays      # Good Friday
+    assert date(2026, 7, 3) in holidays      # July 4th on a Saturday, observed Friday
+    assert date(2026, 1, 19) in holidays     # Martin Luther King Jr. Day
+    # New Year's Day 2022 fell on a Saturday and was not made up
+    assert date(2021, 12, 31) not in nyse_holidays(2021)
+
+
+def test_calendar_gaps_skip_weekends_and_holidays():
+    records = bars(series(30))
+    columns = to_columns(records)
+    assert check_calendar_gaps(columns, {}, len(records)) == (0, "")
+
+    missing = sorted(r["date"] for r in records)[10]
+    records = [r for r in records if r["date"] != missing]
+    columns = to_columns(records)
+    assert check_calendar_gaps(columns, {}, len(records)) == (1, f"SPY {missing}")
+    assert check_calendar_gaps(columns, {"holidays": [missing]}, len(records))[0] == 0
+
+
+def test_validate_records_quarantines_only_failing_rows():
+    closes = series()
+    closes[0] = 1000.0
+    records = bars(closes)
+    records[5]["volume"] = 0
+    records[6]["close"] = None
+
+    report = validate_records({}, logger, "market", records)
+
+    quarantined = {record["date"]: rules for record, rules in report.quarantined}
+    assert quarantined == {
+        dates_of(records, 0)[0]: ["price_jump"],
+        records[5]["date"]: ["zero_volume"],
+        records[6]["date"]: ["not_null"],
+    }
+    assert len(report.valid) == len(records) - 3
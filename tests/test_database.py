@@ -0,0 +1,150 @@
+import gc
+import logging
+import sqlite3
+
+import pytest
+
+from internal_data_automation.storage import database
+from internal_data_automation.storage.database import Database, filesystem_type, market_row_hash
+
+logger = logging.getLogger("test_database")
+
+MOUNTS = """\
+/dev/root / ext4 rw,relatime 0 0
+fs-1234.efs.us-east-1.amazonaws.com:/ /mnt/shared nfs4 rw,relatime 0 0
+/dev/sdb1 /mnt/shared/local\\040disk ext4 rw 0 0
+"""
+
+
+def journal_mode(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA journal_mode").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_filesystem_type_uses_longest_mount(tmp_path):
+    mounts = tmp_path / "mounts"
+    mounts.write_text(MOUNTS)
+
+    assert filesystem_type("/mnt/shared/data/internal_data.db", str(mounts)) == "nfs4"
+    assert filesystem_type("/mnt/shared/local disk/internal_data.db", str(mounts)) == "ext4"
+    assert filesystem_type("/mnt/sharedx/internal_data.db", str(mounts)) == "ext4"
+    assert filesystem_type("/tmp/x.db", str(tmp_path / "missing")) is None
+
+
+def test_journal_mode_left_alone_by_default(tmp_path):
+    path = str(tmp_path / "test.db")
+    Database(path, logger)
+    assert journal_mode(path) == "delete"
+
+
+def test_auto_journal_mode_uses_wal_on_local_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "filesystem_type", lambda path: "ext4")
+    path = str(tmp_path / "test.db")
+    Database(path, logger, journal_mode="auto")
+    assert journal_mode(path) == "wal"
+
+
+def test_auto_journal_mode_avoids_wal_on_network_filesystem(tmp_path, monkeypatch):
+    path = str(tmp_path / "test.db")
+    Database(path, logger, journal_mode="wal")
+    # Leaving WAL needs every other connection closed; unclosed ones are freed by the collector
+    gc.collect()
+    monkeypatch.setattr(database, "filesystem_type", lambda path: "nfs4")
+
+    # An existing WAL database is switched back to the rollback journal
+    Database(path, logger, journal_mode="auto")
+    assert journal_mode(path) == "delete"
+    with pytest.raises(ValueError):
+        Database(path, logger, journal_mode="wal")
+
+
+def bar(date, close, volume=1000, symbol="SPY"):
+    return {"symbol": symbol, "date": date, "open": 100.0, "high": 110.0, "low": 90.0, "close": close,
+            "volume": volume}
+
+
+def query(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_upsert_skips_unchanged_rows(tmp_path):
+    db = Database(str(tmp_path / "test.db"), logger, market_write_mode="upsert")
+    assert db.insert_market_data([bar("2026-01-02", 105.0), bar("2026-01-05", 106.0)]) == 2
+    before = query(db.db_path, "SELECT id, ingested_at, row_hash FROM market_data ORDER BY id")
+
+    assert db.insert_market_data([bar("2026-01-02", 105.0), bar("2026-01-05", 106)]) == 0
+
+    assert query(db.db_path, "SELECT id, ingested_at, row_hash FROM market_data ORDER BY id") == before
+    assert query(db.db_path, "SELECT COUNT(*) FROM market_data_revisions") == [(0,)]
+
+
+def test_upsert_logs_revised_close(tmp_path):
+    db = Database(str(tmp_path / "test.db"), logger, market_write_mode="upsert")
+    db.insert_market_data([bar("2026-01-02", 105.0), bar("2026-01-05", 106.0)])
+
+    assert db.insert_market_data([bar("2026-01-02", 104.5), bar("2026-01-05", 106.0)]) == 1
+
+    assert query(db.db_path, "SELECT close, row_hash FROM market_data WHERE date = '2026-01-02'") == [
+        (104.5, market_row_hash(100.0, 110.0, 90.0, 104.5, 1000))]
+    assert query(db.db_path, """
+        SELECT symbol, date, old_close, new_close, old_volume, new_volume, old_hash, new_hash
+        FROM market_data_revisions
+    """) == [("SPY", "2026-01-02", 105.0, 104.5, 1000, 1000,
+              market_row_hash(100.0, 110.0, 90.0, 105.0, 1000), market_row_hash(100.0, 110.0, 90.0, 104.5, 1000))]
+
+
+def test_upsert_inserts_new_rows(tmp_path):
+    db = Database(str(tmp_path / "test.db"), logger, market_write_mode="upsert")
+    db.insert_market_data([bar("2026-01-02", 105.0)])
+
+    assert db.insert_market_data([bar("2026-01-02", 105.0), bar("2026-01-05", 106.0),
+                                  bar("2026-01-05", 50.0, symbol="QQQ")]) == 2
+
+    assert query(db.db_path, "SELECT symbol, date, close FROM market_data ORDER BY symbol, date") == [
+        ("QQQ", "2026-01-05", 50.0), ("SPY", "2026-01-02", 105.0), ("SPY", "2026-01-05", 106.0)]
+    assert query(db.db_path, "SELECT COUNT(*) FROM market_data_revisions") == [(0,)]
+
+
+def test_insert_mode_keeps_stored_bars(tmp_path):
+    db = Database(str(tmp_path / "test.db"), logger)
+    db.insert_market_data([bar("2026-01-02", 105.0)])
+
+    assert db.insert_market_data([bar("2026-01-02", 104.5)]) == 0
+
+    assert query(db.db_path, "SELECT close FROM market_data") == [(105.0,)]
+    assert query(db.db_path, "SELECT COUNT(*) FROM market_data_revisions") == [(0,)]
+
+
+@pytest.mark.parametrize("legacy_schema", [
+    # Before row_hash
+    """CREATE TABLE market_data (id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT NOT NULL, date TEXT NOT NULL,
+       open REAL, high REAL, low REAL, close REAL, volume INTEGER, ingested_at TEXT, UNIQUE(symbol, date))""",
+    # Before symbol (one symbol per database)
+    """CREATE TABLE market_data (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL UNIQUE,
+       open REAL, high REAL, low REAL, close REAL, volume INTEGER, ingested_at TEXT)""",
+])
+def test_migration_backfills_row_hashes(tmp_path, legacy_schema):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute(legacy_schema)
+    columns = "symbol, " if "symbol" in legacy_schema else ""
+    values = "'SPY', " if columns else ""
+    conn.execute(f"INSERT INTO market_data ({columns}date, open, high, low, close, volume) "
+                 f"VALUES ({values}'2026-01-02', 100, 110, 90, 105, 1000)")
+    conn.commit()
+    conn.close()
+
+    db = Database(path, logger, market_write_mode="upsert")
+
+    assert query(path, "SELECT symbol, row_hash FROM market_data") == [
+        ("SPY", market_row_hash(100.0, 110.0, 90.0, 105.0, 1000))]
+    # The backfilled hash matches a re-fetched identical bar: no spurious revision
+    assert db.insert_market_data([bar("2026-01-02", 105.0)]) == 0
+    assert query(path, "SELECT COUNT(*) FROM market_data_revisions") == [(0,)]
@@ -0,0 +1,55 @@
+import logging
+import logging.handlers
+
+from internal_data_automation.utils import logger as logger_module
+from internal_data_automation.utils.logger import setup_logger, shutdown_logger
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_queue_logger_can_be_set_up_again_after_shutdown(tmp_path):
+    name = "test_logger.restart"
+    first_log, second_log = str(tmp_path / "first.log"), str(tmp_path / "second.log")
+
+    logger = setup_logger(name, first_log, use_queue=True)
+    logger.info("first run")
+    shutdown_logger(logger)
+
+    assert "first run" in read(first_log)
+    assert not logger.handlers
+
+    logger = setup_logger(name, second_log, use_queue=True)
+    logger.info("second run")
+    shutdown_logger(logger)
+
+    assert "second run" in read(second_log)
+    assert "second run" not in read(first_log)
+
+
+def test_shutdown_is_idempotent_and_leaves_plain_loggers_alone(tmp_path):
+    logger = setup_logger("test_logger.plain", str(tmp_path / "plain.log"))
+    handlers = list(logger.handlers)
+
+    shutdown_logger(logger)
+    shutdown_logger(logger)
+
+    assert logger.handlers == handlers
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in handlers)
+    for handler in handlers:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_exit_hook_registered_once_per_logger(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(logger_module.atexit, "register", lambda func, *args: registered.append(args))
+    name = "test_logger.exit_hook"
+
+    for n in range(3):
+        logger = setup_logger(name, str(tmp_path / f"run{n}.log"), use_queue=True)
+        shutdown_logger(logger)
+
+    assert len(registered) == 1
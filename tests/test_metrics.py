@@ -0,0 +1,128 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from internal_data_automation.utils import metrics as metrics_module
+from internal_data_automation.utils.metrics import MetricsCollector, record_http_latency, write_prometheus_textfile
+
+
+def samples(text):
+    """Metric lines of a textfile as {name{labels}: value}."""
+    result = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            result[name] = float(value)
+    return result
+
+
+def run_stages():
+    collector = MetricsCollector("run-1")
+    with collector.stage("fetch_market") as m:
+        record_http_latency(0.03)
+        record_http_latency(0.2)
+        record_http_latency(40.0)
+        m.records_out = 250
+        m.bytes_written = 4096
+    with pytest.raises(RuntimeError):
+        with collector.stage('clean "market"') as m:
+            m.records_in = 250
+            raise RuntimeError("bad payload")
+    return collector
+
+
+def test_prometheus_textfile_metrics_and_labels(tmp_path):
+    path = str(tmp_path / "textfile" / "pipeline.prom")
+    collector = run_stages()
+
+    write_prometheus_textfile(path, collector, "FAILED", 1767340800.0)
+
+    with open(path) as f:
+        text = f.read()
+    values = samples(text)
+    assert values["pipeline_last_run_timestamp_seconds"] == 1767340800.0
+    assert values["pipeline_last_run_success"] == 0
+    assert values['pipeline_stage_records_out{stage="fetch_market"}'] == 250
+    assert values['pipeline_stage_bytes_written{stage="fetch_market"}'] == 4096
+    assert values['pipeline_stage_records_in{stage="clean \\"market\\""}'] == 250
+    assert "# TYPE pipeline_stage_wall_seconds gauge" in text
+    assert "# TYPE pipeline_stage_http_request_duration_seconds histogram" in text
+
+    histogram = "pipeline_stage_http_request_duration_seconds"
+    assert values[f'{histogram}_bucket{{stage="fetch_market",le="0.05"}}'] == 1
+    assert values[f'{histogram}_bucket{{stage="fetch_market",le="0.25"}}'] == 2
+    assert values[f'{histogram}_bucket{{stage="fetch_market",le="30.0"}}'] == 2
+    assert values[f'{histogram}_bucket{{stage="fetch_market",le="+Inf"}}'] == 3
+    assert values[f'{histogram}_count{{stage="fetch_market"}}'] == 3
+    assert values[f'{histogram}_sum{{stage="fetch_market"}}'] == pytest.approx(40.23)
+    # Stages without requests export no histogram
+    assert not any(name.startswith(histogram) and "clean" in name for name in values)
+    assert [s["status"] for s in collector.to_list()] == ["SUCCESS", "FAILED"]
+
+
+def test_prometheus_textfile_is_replaced_atomically(tmp_path, monkeypatch):
+    path = str(tmp_path / "pipeline.prom")
+    with open(path, 'w') as f:
+        f.write("previous\n")
+    renames = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        # The target still holds the previous file until the complete new one is renamed over it
+        with open(dst) as f:
+            assert f.read() == "previous\n"
+        with open(src) as f:
+            assert "pipeline_last_run_success 1\n" in f.read()
+        renames.append((src, dst))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(metrics_module.os, "replace", replace)
+    write_prometheus_textfile(path, MetricsCollector("run-2"), "SUCCESS", 0.0)
+
+    assert len(renames) == 1
+    src, dst = renames[0]
+    assert dst == path and os.path.dirname(src) == os.path.dirname(path)
+    assert os.listdir(tmp_path) == ["pipeline.prom"]
+
+
+def test_http_latency_attributed_to_stage_of_each_thread():
+    collector = MetricsCollector("run-3")
+    barrier = threading.Barrier(2)
+
+    def stage(name, latency, requests):
+        with collector.stage(name):
+            barrier.wait()
+            for _ in range(requests):
+                record_http_latency(latency)
+                time.sleep(0.001)  # interleave with the other stage
+
+    threads = [threading.Thread(target=stage, args=("fetch_market", 0.01, 5)),
+               threading.Thread(target=stage, args=("fetch_news", 2.0, 3))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    histograms = {s["stage"]: s["http_latency"] for s in collector.to_list()}
+    assert histograms["fetch_market"]["count"] == 5
+    assert histograms["fetch_market"]["sum"] == pytest.approx(0.05)
+    assert histograms["fetch_news"]["count"] == 3
+    assert histograms["fetch_news"]["sum"] == pytest.approx(6.0)
+
+
+def test_http_latency_in_pool_threads_needs_the_stage_context():
+    collector = MetricsCollector("run-4")
+    record_http_latency(1.0)  # outside any stage: ignored
+
+    with collector.stage("fetch_market"), ThreadPoolExecutor(max_workers=4) as pool:
+        # As ingestion does: run each request in a copy of the submitting context
+        for future in [pool.submit(contextvars.copy_context().run, record_http_latency, 0.1) for _ in range(8)]:
+            future.result()
+        # A bare submit runs without the stage context and is not attributed
+        pool.submit(record_http_latency, 0.1).result()
+
+    assert collector.to_list()[0]["http_requests"] == 8
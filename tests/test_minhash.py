@@ -0,0 +1,85 @@
+import logging
+import sqlite3
+
+from internal_data_automation.processing.news_cleaner import cluster_news_data
+from internal_data_automation.storage.database import Database
+from internal_data_automation.utils.minhash import MinHasher, band_keys, shingles, similarity
+
+logger = logging.getLogger("test_minhash")
+
+CONFIG = {"news_dedup": {"num_perm": 64, "bands": 16, "threshold": 0.7, "shingle_size": 2}}
+
+
+def store_articles(db_path, articles):
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.executemany("INSERT INTO news_data (title, description, url) VALUES (?, ?, ?)",
+                             [(title, description, f"https://example.com/{n}")
+                              for n, (title, description) in enumerate(articles)])
+        return conn.execute("SELECT id, cluster_id FROM news_data ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def clusters(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [cluster_id for (cluster_id,) in conn.execute("SELECT cluster_id FROM news_data ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_shingles_of_short_and_empty_texts():
+    assert shingles("Fed holds", 3) == {"fed holds"}
+    assert shingles("  --  ", 2) == set()
+
+
+def test_empty_shingle_set_has_no_signature():
+    hasher = MinHasher(64)
+    assert hasher.signature(set()) is None
+    signature = hasher.signature(shingles("Stocks rally as the Fed holds rates steady"))
+    assert len(signature) == 64
+    assert len(band_keys(signature, 16)) == 16
+
+
+def test_signature_similarity_tracks_jaccard():
+    hasher = MinHasher(128)
+    a = hasher.signature(shingles("stocks rally as the fed holds interest rates steady again"))
+    b = hasher.signature(shingles("stocks rally as the fed holds interest rates steady today"))
+    c = hasher.signature(shingles("oil prices slump on weak demand from china"))
+    assert similarity(a, a) == 1.0
+    assert similarity(a, b) > 0.6
+    assert similarity(a, c) < 0.2
+
+
+def test_cluster_merges_near_duplicates_only(tmp_path):
+    db = Database(str(tmp_path / "news.db"), logger)
+    store_articles(db.db_path, [
+        ("Stocks rally as the Fed holds interest rates steady", "Markets cheered the decision on Wednesday."),
+        ("Stocks rally as the Fed holds interest rates steady", "Markets cheered the decision on Wednesday!"),
+        ("Oil prices slump on weak demand from China", "Brent fell for a third session."),
+    ])
+
+    stats = cluster_news_data(CONFIG, logger, db.db_path)
+
+    first, second, third = clusters(db.db_path)
+    assert second == first
+    assert third not in (first, second)
+    assert stats == {"clustered": 3, "duplicates": 1, "comparisons": stats["comparisons"]}
+
+
+def test_articles_without_words_get_singleton_clusters(tmp_path):
+    db = Database(str(tmp_path / "news.db"), logger)
+    rows = store_articles(db.db_path, [(None, None), ("", "..."), (None, None)])
+
+    stats = cluster_news_data(CONFIG, logger, db.db_path)
+
+    assert clusters(db.db_path) == [news_id for news_id, _ in rows]
+    assert stats == {"clustered": 3, "duplicates": 0, "comparisons": 0}
+    conn = sqlite3.connect(db.db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM news_lsh_buckets").fetchone() == (0,)
+        assert conn.execute("SELECT COUNT(*) FROM news_signatures").fetchone() == (0,)
+    finally:
+        conn.close()
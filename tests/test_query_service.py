@@ -0,0 +1,128 @@
+import json
+import logging
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from internal_data_automation.storage import query_service
+from internal_data_automation.storage.database import Database
+from internal_data_automation.storage.query_service import LRUCache, QueryError, QueryService, make_server
+
+logger = logging.getLogger("test_query_service")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(query_service.time, "monotonic", clock)
+    return clock
+
+
+def bar(date, close):
+    return {"symbol": "SPY", "date": date, "open": close, "high": close, "low": close, "close": close,
+            "volume": 100}
+
+
+def test_lru_cache_evicts_least_recently_used(clock):
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.put(("market_data", 1), "a")
+    cache.put(("market_data", 2), "b")
+    assert cache.get(("market_data", 1)) == "a"
+
+    cache.put(("news_data", 3), "c")
+
+    assert cache.get(("market_data", 2)) is None
+    assert cache.get(("market_data", 1)) == "a"
+    assert cache.get(("news_data", 3)) == "c"
+    assert cache.stats()["entries"] == 2
+
+
+def test_lru_cache_entries_expire_after_ttl(clock):
+    cache = LRUCache(max_entries=10, ttl_seconds=5)
+    cache.put(("market_data", 1), "a")
+    clock.now += 4
+    assert cache.get(("market_data", 1)) == "a"
+    clock.now += 2
+    assert cache.get(("market_data", 1)) is None
+    assert cache.stats()["entries"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_cache_invalidates_one_table():
+    cache = LRUCache()
+    cache.put(("market_data", 1), "a")
+    cache.put(("market_data", 2), "b")
+    cache.put(("news_data", 1), "c")
+
+    assert cache.invalidate("market_data") == 2
+    assert cache.get(("market_data", 1)) is None
+    assert cache.get(("news_data", 1)) == "c"
+
+
+def test_first_generation_invalidates_cached_results(tmp_path):
+    # Fresh database: no data_generations rows until the pipeline's first bump
+    db = Database(str(tmp_path / "internal_data.db"), logger)
+    service = QueryService(db.db_path, logger, cache_ttl_seconds=3600, generation_check_seconds=0)
+    assert service.market({"symbol": "SPY"}) == []
+
+    db.insert_market_data([bar("2026-01-02", 100.0)])
+    assert service.market({"symbol": "SPY"}) == []  # cached until the generation moves
+
+    db.bump_data_generation("market_data")
+    assert [row["close"] for row in service.market({"symbol": "SPY"})] == [100.0]
+    assert service.health()["generations"] == {"market_data": 1, "news_data": 0}
+
+
+def test_later_generations_invalidate_only_their_table(tmp_path):
+    db = Database(str(tmp_path / "internal_data.db"), logger)
+    db.insert_market_data([bar("2026-01-02", 100.0)])
+    db.bump_data_generation("market_data")
+    service = QueryService(db.db_path, logger, cache_ttl_seconds=3600, generation_check_seconds=0)
+    assert len(service.market({"symbol": "SPY"})) == 1
+    service.news({})
+
+    db.insert_market_data([bar("2026-01-05", 101.0)])
+    db.bump_data_generation("market_data")
+
+    assert len(service.market({"symbol": "SPY"})) == 2
+    stats = service.cache.stats()
+    assert stats["entries"] == 2  # news result kept, market result replaced
+
+
+def test_invalid_parameters_are_query_errors(tmp_path):
+    db = Database(str(tmp_path / "internal_data.db"), logger)
+    service = QueryService(db.db_path, logger)
+    with pytest.raises(QueryError):
+        service.market({})
+    with pytest.raises(QueryError):
+        service.market({"symbol": "SPY", "start": "02/01/2026"})
+    with pytest.raises(QueryError):
+        service.news({"limit": "many"})
+
+
+def test_http_routes(tmp_path):
+    db = Database(str(tmp_path / "internal_data.db"), logger)
+    db.insert_market_data([bar("2026-01-02", 100.0)])
+    server = make_server(QueryService(db.db_path, logger), "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/market?symbol=SPY") as response:
+            assert json.loads(response.read())["count"] == 1
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base}/market")
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,131 @@
+import logging
+import os
+import tarfile
+import time
+from datetime import date
+
+from internal_data_automation.storage.database import Database
+from internal_data_automation.utils.retention import clean_logs, plan_bundles, run_retention, write_bundle
+
+logger = logging.getLogger("test_retention")
+
+TODAY = date(2026, 10, 19)
+
+
+def touch(path, content="x", age_days=0):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    mtime = time.time() - age_days * 86400
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def log_config(log_dir):
+    return {
+        "logging": {"file": os.path.join(log_dir, "pipeline.log")},
+        "retention": {"logs": {"path": log_dir, "keep_days": 30}},
+    }
+
+
+def test_clean_logs_deletes_only_known_artifacts(tmp_path):
+    log_dir = str(tmp_path / "logs")
+    keep = [
+        touch(os.path.join(log_dir, "pipeline.log"), age_days=90),         # active log file
+        touch(os.path.join(log_dir, "notes.txt"), age_days=90),            # not a log artifact
+        touch(os.path.join(log_dir, "internal_data.db"), age_days=90),
+        touch(os.path.join(log_dir, "pipeline.log.2"), age_days=1),        # rotated, but recent
+        touch(os.path.join(log_dir, "profiles", "recent", "a.pstats"), age_days=90),
+        touch(os.path.join(log_dir, "profiles", "recent", "b.pstats"), age_days=1),
+    ]
+    delete = [
+        touch(os.path.join(log_dir, "pipeline.log.1"), age_days=90),
+        touch(os.path.join(log_dir, "cron_run_2026-08-01.log"), age_days=90),
+        touch(os.path.join(log_dir, "profiles", "old", "a.pstats"), age_days=90),
+    ]
+
+    summary = clean_logs(log_config(log_dir), logger, 30, TODAY)
+
+    assert summary["files"] == len(delete)
+    assert all(os.path.exists(path) for path in keep)
+    assert not any(os.path.exists(path) for path in delete)
+    assert not os.path.exists(os.path.join(log_dir, "profiles", "old"))
+
+
+def test_clean_logs_dry_run_deletes_nothing(tmp_path):
+    log_dir = str(tmp_path / "logs")
+    rotated = touch(os.path.join(log_dir, "pipeline.log.1"), content="x" * 100, age_days=90)
+
+    summary = clean_logs(log_config(log_dir), logger, 30, TODAY, dry_run=True)
+
+    assert summary == {"files": 1, "bytes": 100}
+    assert os.path.exists(rotated)
+
+
+def test_clean_logs_requires_explicit_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stale = touch("pipeline.log.1", age_days=90)
+    config = {"logging": {"file": "pipeline.log"}, "retention": {"logs": {"keep_days": 30}}}
+
+    assert clean_logs(config, logger, 30, TODAY) == {}
+    assert os.path.exists(stale)
+
+
+def test_clean_logs_refuses_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stale = touch("pipeline.log.1", age_days=90)
+    config = {"logging": {"file": "pipeline.log"}, "retention": {"logs": {"path": ".", "keep_days": 30}}}
+
+    assert clean_logs(config, logger, 30, TODAY) == {}
+    assert os.path.exists(stale)
+
+
+def test_plan_bundles_waits_for_whole_month(tmp_path):
+    raw_dir = str(tmp_path / "raw")
+    for day in ("2026-08-01", "2026-08-31", "2026-09-01", "2026-09-30"):
+        touch(os.path.join(raw_dir, f"market_{day}.json"))
+
+    months = plan_bundles(raw_dir, 30, TODAY)
+
+    # September ends within the last 30 days, so it stays loose
+    assert list(months) == ["2026-08"]
+    assert len(months["2026-08"]) == 2
+
+
+def test_write_bundle_merges_into_existing_bundle(tmp_path):
+    bundle = str(tmp_path / "raw_2026-08.tar.gz")
+    first = touch(str(tmp_path / "market_2026-08-01.json"), content="old")
+    write_bundle(bundle, [first])
+    replaced = touch(str(tmp_path / "market_2026-08-01.json"), content="new")
+    late = touch(str(tmp_path / "news_2026-08-02.json"))
+
+    write_bundle(bundle, [replaced, late])
+
+    with tarfile.open(bundle, "r:gz") as archive:
+        assert sorted(archive.getnames()) == ["market_2026-08-01.json", "news_2026-08-02.json"]
+        assert archive.extractfile("market_2026-08-01.json").read() == b"new"
+
+
+def test_reclaimed_bytes_never_negative(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = Database(str(tmp_path / "data" / "test.db"), logger)
+    config = {
+        "logging": {"file": "logs/pipeline.log"},
+        "retention": {
+            "archive_dir": "data/archive",
+            "raw": {"path": "data/raw", "keep_days": 30},
+            "reports": {"path": "reports", "keep_days": None},
+            "logs": {"path": "logs", "keep_days": 30},
+            "database": {"prune_runs_after_days": None, "vacuum_every_days": None, "analyze_every_days": None},
+        },
+    }
+    touch("data/raw/market_2026-08-01.json", content="x" * 5000)
+    run_retention(config, logger, db, today=TODAY)
+
+    # A tiny straggler grows the bundle by more than the file itself
+    touch("data/raw/market_2026-08-02.json", content="{}")
+    summary = run_retention(config, logger, db, today=TODAY)
+
+    assert summary["raw"]["files"] == 1
+    assert summary["reclaimed_bytes"] == 0
+    assert not os.path.exists("data/raw/market_2026-08-02.json")
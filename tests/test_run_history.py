@@ -0,0 +1,65 @@
+import hashlib
+import json
+import logging
+import sqlite3
+
+from internal_data_automation.reporting.run_history import main
+from internal_data_automation.storage.database import Database
+
+logger = logging.getLogger("test_run_history")
+
+
+def digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def test_reads_current_schema(tmp_path, capsys):
+    db = Database(str(tmp_path / "internal_data.db"), logger)
+    db.start_pipeline_run("run-1", "2026-01-02", "development", "2026-01-02T06:00:00")
+    db.mark_pipeline_success("run-1", "2026-01-02T06:01:30")
+    before = digest(db.db_path)
+
+    assert main(["latest", "--db", db.db_path, "--format", "json"]) == 0
+
+    rows = json.loads(capsys.readouterr().out)
+    assert [(row["run_id"], row["status"]) for row in rows] == [("run-1", "SUCCESS")]
+    assert digest(db.db_path) == before
+
+
+def test_old_schema_fails_without_migrating(tmp_path, capsys):
+    db_path = str(tmp_path / "internal_data.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE pipeline_runs (run_id TEXT PRIMARY KEY, run_date TEXT, mode TEXT, status TEXT, "
+                 "started_at TEXT, finished_at TEXT, error_message TEXT)")
+    conn.commit()
+    conn.close()
+    before = digest(db_path)
+
+    assert main(["stats", "--db", db_path]) == 1
+
+    assert "out of date" in capsys.readouterr().out
+    assert digest(db_path) == before
+
+
+def test_streaks_respect_the_date_window(tmp_path, capsys):
+    db = Database(str(tmp_path / "internal_data.db"), logger)
+    runs = [("2026-01-01", "SUCCESS"), ("2026-01-02", "FAILED"), ("2026-01-03", "FAILED"),
+            ("2026-01-04", "SUCCESS"), ("2026-01-05", "FAILED")]
+    for n, (day, status) in enumerate(runs):
+        db.start_pipeline_run(f"run-{n}", day, "production", f"{day}T06:00:00")
+        if status == "SUCCESS":
+            db.mark_pipeline_success(f"run-{n}", f"{day}T06:01:00")
+        else:
+            db.mark_pipeline_failure(f"run-{n}", f"{day}T06:01:00", "boom")
+
+    def streaks(*options):
+        assert main(["streak", "--db", db.db_path, "--format", "json", *options]) == 0
+        return {row["streak"]: row["failed_runs"] for row in json.loads(capsys.readouterr().out)}
+
+    assert streaks() == {"current": 1, "longest": 2}
+    # The range ends with the two failures of Jan 2-3
+    assert streaks("--until", "2026-01-03") == {"current": 2, "longest": 2}
+    # Only Jan 3 of that streak is inside the range
+    assert streaks("--since", "2026-01-03", "--until", "2026-01-03") == {"current": 1, "longest": 1}
+    assert streaks("--since", "2026-01-04", "--until", "2026-01-04") == {"current": 0, "longest": 0}
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+
+from internal_data_automation.utils.scheduler import CronSchedule
+
+
+def upcoming(expression, start, count):
+    schedule, times = CronSchedule(expression), []
+    for _ in range(count):
+        start = schedule.next_after(start)
+        times.append(start)
+    return times
+
+
+def test_fields_ranges_steps_and_lists():
+    schedule = CronSchedule("*/15 9-17/4 1,15 * 1-5")
+    assert schedule.minutes == {0, 15, 30, 45}
+    assert schedule.hours == {9, 13, 17}
+    assert schedule.days == {1, 15}
+    assert schedule.weekdays == {1, 2, 3, 4, 5}
+    assert CronSchedule("0 0 * * 5-7").weekdays == {0, 5, 6}
+    assert CronSchedule("0 0 * * 7").weekdays == {0}
+    assert CronSchedule("0 0 * * 1-7").weekdays == {0, 1, 2, 3, 4, 5, 6}
+
+
+def test_weekday_seven_only_when_the_step_reaches_it():
+    assert CronSchedule("0 0 * * 2-7/2").weekdays == {2, 4, 6}
+    assert CronSchedule("0 0 * * 1-7/2").weekdays == {0, 1, 3, 5}
+    assert CronSchedule("0 0 * * 6-7").weekdays == {0, 6}
+    assert CronSchedule("0 0 10/10 * *").days == {10, 20, 30}
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* * * * 8", "* * 1-32 * *", "* 24 * * *", "* * 0 * *",
+                                        "* * * 13 *", "*/0 * * * *", "5-1 * * * *", "a * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_next_after_is_strictly_later():
+    start = datetime(2026, 10, 19, 6, 0, 30)
+    assert upcoming("0 6 * * *", start, 2) == [datetime(2026, 10, 20, 6, 0), datetime(2026, 10, 21, 6, 0)]
+    assert upcoming("*/5 * * * *", datetime(2026, 10, 19, 6, 4, 59), 1) == [datetime(2026, 10, 19, 6, 5)]
+
+
+def test_next_after_crosses_month_and_year():
+    assert upcoming("30 2 1 * *", datetime(2026, 12, 15), 2) == [datetime(2027, 1, 1, 2, 30),
+                                                                 datetime(2027, 2, 1, 2, 30)]
+    assert upcoming("0 0 29 2 *", datetime(2026, 3, 1), 1) == [datetime(2028, 2, 29)]
+
+
+def test_day_of_month_or_day_of_week_when_both_restricted():
+    # The 1st of the month or any Monday
+    times = upcoming("0 0 1 * 1", datetime(2026, 10, 19), 4)
+    assert times == [datetime(2026, 10, 26), datetime(2026, 11, 1), datetime(2026, 11, 2), datetime(2026, 11, 9)]
+
+
+def test_star_step_day_of_month_is_not_restricted():
+    # As in cron, */2 starts with * and is ANDed with the weekday: odd days that are Mondays
+    times = upcoming("0 0 */2 * 1", datetime(2026, 10, 19), 3)
+    assert times == [datetime(2026, 11, 9), datetime(2026, 11, 23), datetime(2026, 12, 7)]
+    assert all(t.weekday() == 0 and t.day % 2 == 1 for t in times)
+    # A restricted day-of-month with a step still uses OR
+    assert CronSchedule("0 0 1-31/2 * 1").matches(datetime(2026, 10, 26))
+
+
+def test_star_step_day_of_week_is_not_restricted():
+    # The 1st of the month, only when it falls on an even weekday (Sunday, Tuesday, Thursday, Saturday)
+    times = upcoming("0 0 1 * */2", datetime(2026, 10, 19), 3)
+    assert times == [datetime(2026, 11, 1), datetime(2026, 12, 1), datetime(2027, 4, 1)]
+
+
+def test_never_matching_expression():
+    with pytest.raises(ValueError, match="never matches"):
+        CronSchedule("0 0 31 2 *").next_after(datetime(2026, 1, 1))
@@ -0,0 +1,283 @@
+import logging
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+import yaml
+from botocore.exceptions import ClientError
+
+from internal_data_automation.ingestion import work_queue
+from internal_data_automation.ingestion.work_queue import DynamoDBWorkQueue, WorkQueue, make_work_queue
+from internal_data_automation.storage.database import Database
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+
+from mock_api import MockApiServer, FaultProfile  # noqa: E402
+
+logger = logging.getLogger("test_work_queue")
+
+RUN_DATE = "2026-01-02"
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"]
+
+
+@pytest.fixture
+def mock_api():
+    # Slow enough responses that a worker is reliably caught holding a lease
+    server = MockApiServer(FaultProfile(latency="300"), market_years=0.5).start()
+    yield server
+    server.stop()
+
+
+def write_config(workdir, base_url):
+    with open(os.path.join(REPO_ROOT, "config.yaml")) as f:
+        config = yaml.safe_load(f)
+    config["alpha_vantage"]["base_url"] = f"{base_url}/query"
+    config["api"]["backoff_base_seconds"] = 0.1
+    config["logging"]["queue"] = False
+    config["work_queue"] = {
+        "symbols": SYMBOLS, "batch_size": 2, "lease_seconds": 2, "heartbeat_seconds": 0.5,
+        "max_attempts": 3, "poll_seconds": 0.5,
+    }
+    with open(os.path.join(workdir, "config.yaml"), 'w') as f:
+        yaml.safe_dump(config, f)
+
+
+def start_worker(workdir, worker_id):
+    env = dict(os.environ, ALPHA_VANTAGE_API_KEY="test")
+    return subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "run_pipeline.py"), "--worker", "--worker-id", worker_id,
+         "--date", RUN_DATE],
+        cwd=workdir, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+
+
+def leases(db_path):
+    if not os.path.exists(db_path):
+        return []
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        return conn.execute(
+            "SELECT symbol, status, worker_id, attempts FROM ingestion_leases WHERE run_date = ?", (RUN_DATE,)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+
+def test_workers_finish_every_symbol_once_after_a_worker_is_killed(tmp_path, mock_api):
+    workdir = str(tmp_path)
+    write_config(workdir, mock_api.url)
+    db_path = os.path.join(workdir, "data", "internal_data.db")
+
+    victim = start_worker(workdir, "victim")
+    deadline = time.time() + 30
+    while not any(status == "LEASED" and worker == "victim" for _, status, worker, _ in leases(db_path)):
+        assert time.time() < deadline, "victim never claimed a lease"
+        assert victim.poll() is None, victim.stdout.read()
+        time.sleep(0.02)
+    victim.kill()
+    victim.wait()
+
+    survivors = [start_worker(workdir, f"worker{n}") for n in (1, 2)]
+    completed = 0
+    for worker in survivors:
+        output, _ = worker.communicate(timeout=120)
+        assert worker.returncode == 0, output
+        completed += sum(int(n) for n in re.findall(r"Worker worker\d finished: (\d+) completed", output))
+
+    rows = leases(db_path)
+    assert sorted(symbol for symbol, _, _, _ in rows) == SYMBOLS
+    assert all(status == "DONE" for _, status, _, _ in rows)
+    # The victim's lease was taken over after it expired
+    assert any(attempts >= 2 and worker != "victim" for _, _, worker, attempts in rows)
+    # No symbol was completed twice: survivors did exactly what the victim hadn't finished
+    done_by_victim = sum(1 for _, _, worker, _ in rows if worker == "victim")
+    assert completed + done_by_victim == len(SYMBOLS)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        stored = {symbol for (symbol,) in conn.execute("SELECT DISTINCT symbol FROM market_data")}
+    finally:
+        conn.close()
+    assert stored == set(SYMBOLS)
+
+
+def test_worker_refuses_sqlite_queue_on_network_filesystem(tmp_path, monkeypatch):
+    db = Database(str(tmp_path / "internal_data.db"), logger)
+    monkeypatch.setattr(work_queue, "filesystem_type", lambda path: "nfs4")
+
+    with pytest.raises(RuntimeError, match="network filesystem"):
+        work_queue.run_market_worker({"work_queue": {"symbols": SYMBOLS}}, logger, db, RUN_DATE)
+    assert leases(db.db_path) == []
+
+
+def test_make_work_queue_backends(tmp_path):
+    db = Database(str(tmp_path / "internal_data.db"), logger)
+    assert isinstance(make_work_queue({}, logger, db, "w1"), WorkQueue)
+    with pytest.raises(ValueError, match="dynamodb_table"):
+        make_work_queue({"work_queue": {"backend": "dynamodb"}}, logger, db, "w1")
+    with pytest.raises(ValueError, match="backend"):
+        make_work_queue({"work_queue": {"backend": "redis"}}, logger, db, "w1")
+
+
+def test_lost_lease_is_not_counted_as_completed(tmp_path, monkeypatch):
+    db = Database(str(tmp_path / "internal_data.db"), logger)
+
+    stolen = []
+
+    def fetch_and_lose_lease(config, logger, date_str, symbol):
+        if symbol == "AAA" and not stolen:
+            stolen.append(symbol)
+            # Another worker took over the expired lease while this one was fetching
+            conn = sqlite3.connect(db.db_path)
+            with conn:
+                conn.execute("UPDATE ingestion_leases SET worker_id = 'other' WHERE symbol = 'AAA'")
+            conn.close()
+
+    def clean(logger, date_str, symbol):
+        return [{"symbol": symbol, "date": RUN_DATE, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0,
+                 "volume": 10}]
+
+    monkeypatch.setattr(work_queue, "fetch_market_data", fetch_and_lose_lease)
+    monkeypatch.setattr(work_queue, "clean_market_data", clean)
+    config = {"work_queue": {"symbols": ["AAA", "BBB"], "poll_seconds": 0.1, "lease_seconds": 0.5},
+              "data_quality": {"enabled": False}}
+
+    # The stolen lease expires and this worker re-claims it to finish the run
+    summary = work_queue.run_market_worker(config, logger, db, RUN_DATE, worker_id="w1")
+
+    assert summary["lost_leases"] == 1
+    assert summary["completed"] == 2  # BBB, and AAA on its second claim
+    assert summary["progress"] == {"DONE": 2}
+
+
+class FakeDynamoDB:
+    """In-memory DynamoDB client with the conditional-write semantics the queue relies on."""
+    def __init__(self, page_size=3):
+        self.items = {}
+        self.page_size = page_size
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _value(typed):
+        return typed["S"] if "S" in typed else float(typed["N"])
+
+    @staticmethod
+    def _failed(operation):
+        return ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, operation)
+
+    def put_item(self, TableName, Item, ConditionExpression, ExpressionAttributeNames):
+        assert ConditionExpression == "attribute_not_exists(#sk)"
+        key = (Item["run_date"]["S"], Item["symbol"]["S"])
+        with self.lock:
+            if key in self.items:
+                raise self._failed("PutItem")
+            self.items[key] = dict(Item)
+
+    def update_item(self, TableName, Key, UpdateExpression, ConditionExpression, ExpressionAttributeNames,
+                    ExpressionAttributeValues):
+        names, values = ExpressionAttributeNames, ExpressionAttributeValues
+        operators = {"=": lambda a, b: a == b, "<": lambda a, b: a < b, ">=": lambda a, b: a >= b}
+        with self.lock:
+            item = self.items[(Key["run_date"]["S"], Key["symbol"]["S"])]
+            for condition in ConditionExpression.split(" AND "):
+                name, operator, value = condition.split()
+                if not operators[operator](self._value(item[names[name]]), self._value(values[value])):
+                    raise self._failed("UpdateItem")
+            assert UpdateExpression.startswith("SET ")
+            for assignment in UpdateExpression[4:].split(", "):
+                name, value = assignment.split(" = ")
+                item[names[name]] = values[value]
+
+    def query(self, TableName, KeyConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues,
+              ConsistentRead, ExclusiveStartKey=None):
+        run_date = ExpressionAttributeValues[":pk"]["S"]
+        with self.lock:
+            keys = sorted(key for key in self.items if key[0] == run_date)
+            if ExclusiveStartKey:
+                keys = [key for key in keys if key > (run_date, ExclusiveStartKey["symbol"]["S"])]
+            page = keys[:self.page_size]
+            response = {"Items": [dict(self.items[key]) for key in page]}
+            if len(keys) > self.page_size:
+                response["LastEvaluatedKey"] = {"run_date": {"S": run_date}, "symbol": {"S": page[-1][1]}}
+            return response
+
+
+def dynamodb_queue(client, worker_id, lease_seconds=60, max_attempts=3):
+    return DynamoDBWorkQueue("leases", logger, worker_id, lease_seconds, max_attempts, client=client)
+
+
+def test_dynamodb_workers_claim_every_symbol_once():
+    client = FakeDynamoDB()
+    symbols = [f"S{n:02d}" for n in range(40)]
+    claims = {}
+
+    def worker(worker_id):
+        queue = dynamodb_queue(client, worker_id)
+        queue.enqueue(RUN_DATE, symbols)
+        while True:
+            batch = queue.claim(RUN_DATE, 3)
+            if not batch:
+                return
+            for symbol in batch:
+                claims.setdefault(symbol, []).append(worker_id)
+                assert queue.complete(RUN_DATE, symbol, 1)
+
+    threads = [threading.Thread(target=worker, args=(f"host{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claims) == symbols
+    assert all(len(workers) == 1 for workers in claims.values())
+    assert dynamodb_queue(client, "observer").progress(RUN_DATE) == {"DONE": len(symbols)}
+
+
+def test_dynamodb_expired_lease_is_reclaimed_and_lost_by_its_holder():
+    client = FakeDynamoDB()
+    crashed, survivor = dynamodb_queue(client, "crashed", lease_seconds=-1), dynamodb_queue(client, "survivor")
+    assert crashed.enqueue(RUN_DATE, ["AAA", "BBB"]) == 2
+    assert survivor.enqueue(RUN_DATE, ["AAA", "BBB"]) == 0
+
+    assert crashed.claim(RUN_DATE, 1) == ["AAA"]  # lease already expired
+    assert survivor.claim(RUN_DATE, 5) == ["BBB", "AAA"]
+
+    assert crashed.heartbeat(RUN_DATE, ["AAA"]) == 0
+    assert not crashed.complete(RUN_DATE, "AAA", 10)
+    assert not crashed.release(RUN_DATE, "AAA", "boom")
+    assert survivor.heartbeat(RUN_DATE, ["AAA", "BBB"]) == 2
+    assert survivor.complete(RUN_DATE, "AAA", 10)
+    assert survivor.progress(RUN_DATE) == {"DONE": 1, "LEASED": 1}
+
+
+def test_dynamodb_release_fails_symbol_after_max_attempts():
+    client = FakeDynamoDB()
+    queue = dynamodb_queue(client, "w1", max_attempts=2)
+    queue.enqueue(RUN_DATE, ["AAA"])
+
+    assert queue.claim(RUN_DATE, 1) == ["AAA"]
+    assert queue.release(RUN_DATE, "AAA", "timeout")
+    assert queue.progress(RUN_DATE) == {"PENDING": 1}
+    assert queue.claim(RUN_DATE, 1) == ["AAA"]
+    assert queue.release(RUN_DATE, "AAA", "timeout")
+
+    assert queue.progress(RUN_DATE) == {"FAILED": 1}
+    assert queue.claim(RUN_DATE, 1) == []
+
+
+def test_dynamodb_final_expired_lease_is_given_up():
+    client = FakeDynamoDB()
+    queue = dynamodb_queue(client, "w1", lease_seconds=-1, max_attempts=1)
+    queue.enqueue(RUN_DATE, ["AAA"])
+    assert queue.claim(RUN_DATE, 1) == ["AAA"]
+
+    assert queue.claim(RUN_DATE, 1) == []
+    assert queue.progress(RUN_DATE) == {"FAILED": 1}